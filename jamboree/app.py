@@ -2,17 +2,20 @@
 from __future__ import annotations
 
 import atexit
+import json
 import logging
 import os
 import socket
 import time
 from collections.abc import Mapping
 
-from flask import Flask, current_app, jsonify, request, send_from_directory
+from flask import Flask, Response, current_app, jsonify, request, send_from_directory
 from werkzeug.exceptions import HTTPException
 
-from . import frame_provider, ip_recovery, sgs_autopair
+from . import frame_provider, ip_recovery, ip_watch, neighbors, sgs_autopair, sgs_bridge, sgs_lib
 from .controller import Controller
+from .dart_scheduler import press_scheduler
+from .sequences import normalize_steps
 from .core.logging_config import setup_logging
 from .paths import STATIC_DIR
 from .routes_recovery import bp_recovery, set_controller
@@ -122,6 +125,11 @@ def health():
         stbs=len(store.all()),
         config=store.status(),
         frame=frame_provider.status(),
+        sgs=sgs_bridge.status(),
+        receiver=sgs_lib.receiver_identity_status(),
+        neighbors=neighbors.neighbor_table.status(),
+        ip_watch=ip_watch.ip_change_watcher.status(),
+        dart_scheduler=press_scheduler.status(),
         background_autopair=str(os.getenv("JAMBOREE_AUTOPAIR", "1")).lower()
         not in {"0", "false", "no", "off"},
     )
@@ -143,6 +151,35 @@ def save_stb_list():
     return jsonify(ok=True, success=True, stbs=store.all())
 
 
+@app.route("/auto/batch", methods=["POST"])
+def auto_batch_route():
+    """Press one button on many STBs concurrently with per-alias results."""
+    body = request.get_json(silent=True) or {}
+    aliases = body.get("stbs") or body.get("aliases")
+    if not isinstance(aliases, list) or not aliases:
+        return jsonify(ok=False, error="stbs must be a non-empty list of aliases"), 400
+    try:
+        duration = int(body.get("delay", 120))
+    except (TypeError, ValueError):
+        return jsonify(ok=False, error="delay must be an integer duration in milliseconds"), 400
+    if duration < 0:
+        return jsonify(ok=False, error="delay must be non-negative"), 400
+    button = str(body.get("button") or "").strip()
+    if not button:
+        return jsonify(ok=False, error="button is required"), 400
+    allow_fallback = str(body.get("allow_rf_fallback", "true")).lower() not in {"0", "false", "no", "off"}
+    recover = str(body.get("recover_ip", "true")).lower() not in {"0", "false", "no", "off"}
+    result = ctl.handle_auto_batch(
+        [str(alias) for alias in aliases],
+        button,
+        duration,
+        force=body.get("force"),
+        allow_rf_fallback=allow_fallback,
+        recover_ip=recover,
+    )
+    return jsonify(result)
+
+
 @app.route("/auto/<remote>/<path:stb>/<button>/<delay>", methods=["GET", "POST"])
 def auto_route(remote: str, stb: str, button: str, delay: str):
     """Send one duration-based Auto command.
@@ -201,14 +238,87 @@ def auto_route(remote: str, stb: str, button: str, delay: str):
     return jsonify(result)
 
 
+def _wait_arg(default: str = "true") -> bool:
+    return str(request.args.get("wait", default)).lower() not in {"0", "false", "no", "off"}
+
+
+@app.route("/dart/bulk", methods=["POST"])
+def dart_bulk_route():
+    """Queue timed presses for many STBs; returns receipts without waiting."""
+    body = request.get_json(silent=True) or {}
+    presses = body.get("presses")
+    if not isinstance(presses, list) or not presses:
+        return jsonify(ok=False, error="presses must be a non-empty list"), 400
+    wait = str(body.get("wait", request.args.get("wait", "false"))).lower() not in {"0", "false", "no", "off"}
+    return jsonify(ctl.press_bulk(presses, wait=wait))
+
+
+@app.route("/dart/receipt/<receipt_id>", methods=["GET"])
+def dart_receipt_route(receipt_id: str):
+    return jsonify(ctl.press_status(receipt_id))
+
+
 @app.route("/dart/<path:stb>/<button>/<action>", methods=["GET", "POST"])
 def dart_route(stb: str, button: str, action: str):
-    return jsonify(ctl.dart(stb, button, action))
+    return jsonify(ctl.dart(stb, button, action, wait=_wait_arg()))
+
+
+@app.route("/sequence/<path:stb>", methods=["POST"])
+def sequence_route(stb: str):
+    """Run ``{"steps": [...]}`` or ``{"macro": name}`` server-side.
+
+    ``?stream=1`` streams newline-delimited JSON progress events; otherwise the
+    call waits for completion unless ``?wait=0``.
+    """
+    body = request.get_json(silent=True) or {}
+    if not body.get("steps") and not body.get("macro"):
+        return jsonify(ok=False, error="steps or macro is required"), 400
+    allow_fallback = str(body.get("allow_rf_fallback", "true")).lower() not in {"0", "false", "no", "off"}
+    stop_on_error = str(body.get("stop_on_error", "true")).lower() not in {"0", "false", "no", "off"}
+    try:
+        run = ctl.run_sequence(
+            stb,
+            steps=body.get("steps"),
+            macro=body.get("macro"),
+            stop_on_error=stop_on_error,
+            allow_rf_fallback=allow_fallback,
+        )
+    except ValueError as exc:
+        return jsonify(ok=False, error=str(exc)), 400
+    if str(request.args.get("stream", "0")).lower() in {"1", "true", "yes", "on"}:
+        return Response(
+            (json.dumps(event) + "\n" for event in run.stream()),
+            mimetype="application/x-ndjson",
+        )
+    if _wait_arg():
+        run.wait()
+    return jsonify(ok=run.state != "failed", sequence=run.as_dict())
+
+
+@app.route("/sequences/<run_id>", methods=["GET"])
+def sequence_status_route(run_id: str):
+    return jsonify(ctl.sequence_status(run_id))
+
+
+@app.route("/macros", methods=["GET"])
+def macros_route():
+    return jsonify(ok=True, macros=store.macros())
+
+
+@app.route("/macros/<name>", methods=["POST", "PUT"])
+def save_macro_route(name: str):
+    body = request.get_json(silent=True) or {}
+    try:
+        steps = normalize_steps(body.get("steps"))
+    except ValueError as exc:
+        return jsonify(ok=False, error=str(exc)), 400
+    store.save_macro(name, [{k: v for k, v in step.items() if v is not None} for step in steps])
+    return jsonify(ok=True, macro=name, steps=len(steps))
 
 
 @app.route("/unpair/<path:stb>", methods=["POST", "GET"])
 def unpair_route(stb: str):
-    return jsonify(ctl.unpair(stb))
+    return jsonify(ctl.unpair(stb, wait=_wait_arg()))
 
 
 @app.route("/whodis", methods=["POST", "GET"])
@@ -217,7 +327,14 @@ def whodis_route():
 
 
 init_serial_from_base({"stbs": store.all()})
+sgs_lib.start_interface_watcher()
+neighbors.neighbor_table.start_watcher()
+if str(os.getenv("JAMBOREE_IP_WATCH", "1")).lower() not in {"0", "false", "no", "off"}:
+    ip_watch.ip_change_watcher.start()
+sgs_lib.sgs_get_receiver_id()
 atexit.register(serial_mgr.stop_all)
+atexit.register(press_scheduler.stop_all)
+atexit.register(store.flush)
 
 if __name__ == "__main__":
     os.environ.setdefault("FLASK_ENV", "production")
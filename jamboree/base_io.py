@@ -3,6 +3,8 @@
 The file mixes stable receiver identity, mutable network information, DART wiring,
 and optional legacy SGS credentials.  Writes are serialized across threads and
 processes, written through a temporary file, and backed up before replacement.
+``update_stb_batch`` applies several row patches under one lock/read/backup/
+rewrite cycle so coalesced writers pay for a single physical rewrite.
 """
 from __future__ import annotations
 
@@ -13,7 +15,7 @@ import tempfile
 import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 try:  # POSIX
     import fcntl  # type: ignore
@@ -47,6 +49,8 @@ PROTECTED_STB_FIELDS = (
 )
 
 _thread_lock = threading.RLock()
+# Physical write counters for write-amplification diagnostics.
+_WRITE_STATS = {"rewrites": 0, "bytes_written": 0, "backup_bytes": 0}
 
 
 class _FileLock:
@@ -184,6 +188,7 @@ def write_document(path: Path, document: Mapping[str, Any]) -> None:
     normalized = dict(document)
     payload = json.dumps(normalized, indent=4, ensure_ascii=False) + "\n"
     _parse_document(payload, path)
+    backup_bytes = 0
     if path.is_file():
         try:
             current = path.read_text(encoding="utf-8")
@@ -191,10 +196,20 @@ def write_document(path: Path, document: Mapping[str, Any]) -> None:
         except (OSError, BaseFileCorruptError):
             current = ""
         if current:
-            _atomic_write(
-                Path(f"{path}.bak"), current if current.endswith("\n") else current + "\n"
-            )
+            backup = current if current.endswith("\n") else current + "\n"
+            _atomic_write(Path(f"{path}.bak"), backup)
+            backup_bytes = len(backup.encode("utf-8"))
     _atomic_write(path, payload)
+    with _thread_lock:
+        _WRITE_STATS["rewrites"] += 1
+        _WRITE_STATS["bytes_written"] += len(payload.encode("utf-8"))
+        _WRITE_STATS["backup_bytes"] += backup_bytes
+
+
+def write_stats() -> Dict[str, int]:
+    """Return process-wide counters for physical ``write_document`` calls."""
+    with _thread_lock:
+        return dict(_WRITE_STATS)
 
 
 def merge_document(path: Path, patch: Mapping[str, Any]) -> Dict[str, Any]:
@@ -213,22 +228,46 @@ def update_stb_fields(
     create: bool = True,
 ) -> Dict[str, Any]:
     alias = str(alias).strip()
-    if not alias:
-        raise ValueError("alias is required")
-    if not isinstance(fields, Mapping):
-        raise TypeError("fields must be a mapping")
+    document, missing = update_stb_batch(path, [(alias, fields, create)])
+    if missing:
+        raise KeyError(f"alias {alias!r} not present in {path}")
+    return document
+
+
+def update_stb_batch(
+    path: Path,
+    updates: Sequence[Tuple[str, Mapping[str, Any], bool]],
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Apply ``(alias, fields, create)`` patches in order with one rewrite.
+
+    Returns the written document and the aliases skipped because they were
+    absent and ``create`` was false.  Nothing is written if every patch was
+    skipped.
+    """
+    checked = []
+    for alias, fields, create in updates:
+        alias = str(alias).strip()
+        if not alias:
+            raise ValueError("alias is required")
+        if not isinstance(fields, Mapping):
+            raise TypeError("fields must be a mapping")
+        checked.append((alias, fields, bool(create)))
     with _thread_lock, _FileLock(path):
         document = read_document(path)
         stbs = document.setdefault("stbs", {})
-        if alias not in stbs:
-            if not create:
-                raise KeyError(f"alias {alias!r} not present in {path}")
-            stbs[alias] = {}
-        if not isinstance(stbs[alias], dict):
-            raise BaseFileCorruptError(f"STB entry {alias!r} is not an object")
-        deep_merge(stbs[alias], fields)
-        write_document(path, document)
-        return document
+        missing: List[str] = []
+        for alias, fields, create in checked:
+            if alias not in stbs:
+                if not create:
+                    missing.append(alias)
+                    continue
+                stbs[alias] = {}
+            if not isinstance(stbs[alias], dict):
+                raise BaseFileCorruptError(f"STB entry {alias!r} is not an object")
+            deep_merge(stbs[alias], fields)
+        if len(missing) < len(checked):
+            write_document(path, document)
+        return document, missing
 
 
 def replace_stb_table(
@@ -0,0 +1,191 @@
+"""Cheap change detection for ``base.txt``.
+
+``STBStore`` used to ``stat()`` the configuration file on every read while
+holding its lock.  A watcher answers "might the file have changed?" without
+touching the filesystem, and the store only stats/rereads when it says yes.
+
+* ``inotify`` (Linux): a non-blocking inotify descriptor on the config
+  directory.  Events are queued by the kernel inside the writer's syscall, so
+  a change made by another process is visible on the very next read.
+* ``poll``: answer yes at most once per bounded interval
+  (``JAMBOREE_CONFIG_POLL_S``, default 1 s).  Used where inotify is unavailable.
+* ``stat``: no watcher; stat on every read (the previous behavior).
+
+``JAMBOREE_CONFIG_WATCH`` selects ``auto`` (default), ``inotify``, ``poll`` or
+``stat``.  inotify does not see writes made on another host over a network
+filesystem, so ``auto`` checks the directory's ``statfs`` type and polls on
+NFS, SMB/CIFS and similar mounts.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+LOG = logging.getLogger(__name__)
+DEFAULT_POLL_S = 1.0
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+# statfs(2) f_type values of filesystems whose remote writes raise no inotify
+# events on this host.
+_NETWORK_FS_MAGIC = {
+    0x6969: "nfs",
+    0x517B: "smb",
+    0xFF534D42: "cifs",
+    0xFE534D42: "smb2",
+    0x73757245: "coda",
+    0x5346414F: "afs",
+    0x00C36400: "ceph",
+    0x01021997: "9p",
+    0x01161970: "gfs2",
+    0x7461636F: "ocfs2",
+}
+
+
+class PollingWatcher:
+    mode = "poll"
+
+    def __init__(self, path: Path, interval_s: float = DEFAULT_POLL_S) -> None:
+        self.path = Path(path)
+        self.interval_s = max(float(interval_s), 0.0)
+        self._last = time.monotonic()
+
+    def changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._last < self.interval_s:
+            return False
+        self._last = now
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    mode = "inotify"
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._name = os.fsencode(self.path.name)
+        self._broken = False
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.fsencode(str(self.path.parent.resolve()))
+        if libc.inotify_add_watch(fd, directory, _WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {self.path.parent}")
+        self._fd: Optional[int] = fd
+
+    def changed(self) -> bool:
+        if self._broken or self._fd is None:
+            return True
+        hit = False
+        while True:
+            try:
+                chunk = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return hit
+            except OSError as exc:
+                LOG.warning("config watcher read failed, falling back to stat: %s", exc)
+                self._broken = True
+                return True
+            if not chunk:
+                return hit
+            offset = 0
+            while offset + _EVENT.size <= len(chunk):
+                _wd, mask, _cookie, length = _EVENT.unpack_from(chunk, offset)
+                name = chunk[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    # The watched directory went away; stat on every read.
+                    self._broken = True
+                    hit = True
+                elif mask & IN_Q_OVERFLOW or name == self._name:
+                    hit = True
+
+    def close(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def _fs_magic(directory: Path) -> Optional[int]:
+    """Return the ``statfs`` f_type of ``directory`` or ``None`` if unknown."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        # struct statfs starts with f_type (__fsword_t, a C long); the buffer
+        # is larger than the whole struct on every Linux ABI.
+        buf = ctypes.create_string_buffer(256)
+        if libc.statfs(os.fsencode(str(directory)), buf) != 0:
+            return None
+    except (OSError, AttributeError, TypeError):
+        return None
+    return ctypes.c_long.from_buffer(buf).value & 0xFFFFFFFF
+
+
+def network_filesystem(path: Path) -> Optional[str]:
+    """Return the network filesystem type holding ``path``'s directory, if any."""
+    magic = _fs_magic(Path(path).parent)
+    return _NETWORK_FS_MAGIC.get(magic) if magic is not None else None
+
+
+def create_watcher(path: Path, mode: Optional[str] = None) -> Optional[Watcher]:
+    """Return the configured watcher for ``path`` or ``None`` for stat mode."""
+    selected = str(mode or os.getenv("JAMBOREE_CONFIG_WATCH", "auto")).strip().lower()
+    if selected == "stat":
+        return None
+    if selected == "auto":
+        remote = network_filesystem(path)
+        if remote:
+            LOG.info("%s is on %s; polling instead of inotify", path, remote)
+            selected = "poll"
+    if selected in {"auto", "inotify"}:
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError, TypeError) as exc:
+            log = LOG.warning if selected == "inotify" else LOG.debug
+            log("inotify unavailable for %s, polling instead: %s", path, exc)
+    try:
+        interval = float(os.getenv("JAMBOREE_CONFIG_POLL_S", DEFAULT_POLL_S))
+    except ValueError:
+        interval = DEFAULT_POLL_S
+    return PollingWatcher(path, interval)
@@ -14,22 +14,32 @@ from __future__ import annotations
 
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from . import ip_recovery
 from .core.credentials import CredentialManager
+from .dart_scheduler import PressReceipt, press_scheduler
+from .sequences import SequenceRun, normalize_steps, sequence_runner
 from .serial_bridge import (
+    DART_ACK_BUDGET_S,
+    quick_line,
     rf_available,
+    rf_line,
     rf_status,
     send_quick_dart,
-    send_rf,
+    send_rf_many,
     send_rf_strict,
+    wait_ack_default,
 )
-from .sgs_bridge import send_sgs
-from .stb_store import store
+from .serial_hub import serial_mgr
+from .sgs_bridge import endpoint_status, send_sgs
+from .stb_store import credential_source, store
 
 LOG = logging.getLogger(__name__)
+RECEIPT_GRACE_S = 5.0
+BATCH_MAX_WORKERS = 32
 
 classify_sgs_failure = ip_recovery.classify_sgs_failure
 
@@ -165,7 +175,9 @@ class Controller:
         except ValueError:
             host_alias = canonical
         host = store.get(host_alias) or entry
-        paired = CredentialManager.has_stored_credentials(host_alias, store.document())
+        paired = CredentialManager.has_stored_credentials(
+            host_alias, credential_source(store, host_alias)
+        )
         return {
             "alias": canonical,
             "configured_protocol": str(entry.get("protocol") or "").upper(),
@@ -175,6 +187,7 @@ class Controller:
                 "configured": bool(entry.get("stb") and host.get("ip")),
                 "ip": host.get("ip"),
                 "paired": paired,
+                "endpoint": endpoint_status(str(host.get("ip") or "")),
             },
             "rf": {
                 **rf_status(canonical),
@@ -338,6 +351,168 @@ class Controller:
                     ) from rf_exc
             raise RuntimeError(first_text) from first_exc
 
+    def handle_auto_batch(
+        self,
+        aliases: Sequence[str],
+        button_id: str,
+        delay: int,
+        *,
+        force: Optional[str] = None,
+        allow_rf_fallback: bool = True,
+        recover_ip: bool = True,
+    ) -> Dict[str, Any]:
+        """Press one button on many STBs at once.
+
+        SGS aliases are grouped by receiver IP (a Hopper and its Joeys share a
+        pooled session) and the groups run concurrently.  RF aliases are
+        grouped by DART serial port and each group is one coalesced write.
+        Per-alias failures are reported rather than aborting the batch.
+        """
+        button = str(button_id or "").strip()
+        if not button:
+            raise ValueError("button_id is required")
+        duration = int(delay)
+        forced = str(force or "").strip().upper()
+        if forced == "DART":
+            forced = "RF"
+        results: Dict[str, Dict[str, Any]] = {}
+        groups: Dict[tuple, List[str]] = {}
+        for raw in aliases:
+            try:
+                alias = self._canonical_alias(raw)
+                entry = self._entry(alias)
+            except ValueError as exc:
+                results[str(raw)] = {"ok": False, "error": str(exc)}
+                continue
+            if alias in results or any(alias in members for members in groups.values()):
+                continue
+            protocol = forced or str(entry.get("protocol") or "").upper()
+            quick = button.lower() in {"reset", "rst", "allup", "all_up", "release"}
+            if protocol == "RF":
+                port = serial_mgr.port_for(alias) or str(entry.get("com_port") or "") or alias
+                key = ("auto" if quick else "rf", port)
+            else:
+                _target_alias, target = self._sgs_target(alias)
+                key = ("auto", str(target.get("ip") or alias))
+            groups.setdefault(key, []).append(alias)
+
+        batch_start = time.monotonic()
+        started: Dict[str, float] = {}
+        finished: Dict[str, float] = {}
+
+        def run_auto_group(members: List[str]) -> None:
+            # One receiver (or port) at a time; groups run concurrently.
+            for alias in members:
+                started[alias] = time.monotonic()
+                try:
+                    results[alias] = self.handle_auto_remote(
+                        str(self._entry(alias).get("remote") or ""),
+                        alias,
+                        button,
+                        duration,
+                        force=force,
+                        allow_rf_fallback=allow_rf_fallback,
+                        recover_ip=recover_ip,
+                    )
+                except Exception as exc:
+                    results[alias] = {"ok": False, "error": str(exc)}
+                finished[alias] = time.monotonic()
+
+        def run_rf_group(members: List[str]) -> None:
+            now = time.monotonic()
+            for alias in members:
+                started[alias] = now
+            try:
+                entries = {alias: self._entry(alias) for alias in members}
+                lines = send_rf_many(
+                    members[0],
+                    [(entries[alias].get("remote"), button, duration) for alias in members],
+                )
+                by_remote = {line.split()[0]: line for line in lines}
+                for alias in members:
+                    results[alias] = {
+                        "ok": True,
+                        "via": "rf",
+                        "rf_line": by_remote.get(str(int(entries[alias].get("remote")))),
+                        "delivery": "serial_flushed",
+                        "coalesced": len(lines),
+                        "ts": _ts(),
+                    }
+            except Exception as exc:
+                for alias in members:
+                    results[alias] = {"ok": False, "error": str(exc)}
+            done = time.monotonic()
+            for alias in members:
+                finished[alias] = done
+
+        if groups:
+            workers = max(1, min(len(groups), BATCH_MAX_WORKERS))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-batch") as pool:
+                for (kind, _key), members in groups.items():
+                    pool.submit(run_rf_group if kind == "rf" else run_auto_group, members)
+
+        for alias, t0 in started.items():
+            results[alias]["start_offset_ms"] = round((t0 - batch_start) * 1000.0, 3)
+            results[alias]["elapsed_ms"] = round((finished[alias] - t0) * 1000.0, 3)
+        offsets = [r["start_offset_ms"] for r in results.values() if "start_offset_ms" in r]
+        return {
+            "ok": bool(results) and all(r.get("ok") for r in results.values()),
+            "button": button,
+            "results": results,
+            "groups": [
+                {"transport": kind, "target": key, "aliases": members}
+                for (kind, key), members in groups.items()
+            ],
+            "skew_ms": round(max(offsets) - min(offsets), 3) if offsets else 0.0,
+            "ts": _ts(),
+        }
+
+    def _macro_steps(self, name: str) -> List[Dict[str, Any]]:
+        reader = getattr(store, "macros", None)
+        macros = reader() if callable(reader) else (store.document().get("macros") or {})
+        steps = macros.get(str(name or "").strip()) if isinstance(macros, Mapping) else None
+        if steps is None:
+            raise ValueError(f"macro {name!r} not found")
+        return normalize_steps(steps)
+
+    def run_sequence(
+        self,
+        stb_name: str,
+        *,
+        steps: Optional[Sequence[Mapping[str, Any]]] = None,
+        macro: Optional[str] = None,
+        stop_on_error: bool = True,
+        allow_rf_fallback: bool = True,
+    ) -> SequenceRun:
+        """Start a server-timed keypress sequence (explicit steps or a macro)."""
+        stb_name = self._canonical_alias(stb_name)
+        self._entry(stb_name)
+        if macro:
+            planned = self._macro_steps(macro)
+        else:
+            planned = normalize_steps(steps)
+
+        def press(alias: str, button: str, hold_ms: int, force: Optional[str]):
+            return self.handle_auto_remote(
+                "",
+                alias,
+                button,
+                hold_ms,
+                force=force,
+                allow_rf_fallback=allow_rf_fallback,
+            )
+
+        return sequence_runner.start(
+            press, stb_name, planned, macro=macro, stop_on_error=stop_on_error
+        )
+
+    @staticmethod
+    def sequence_status(run_id: str) -> Dict[str, Any]:
+        run = sequence_runner.get(str(run_id))
+        if run is None:
+            raise ValueError(f"unknown sequence {run_id!r}")
+        return {"ok": True, "sequence": run.as_dict()}
+
     def sgs_remote(
         self,
         stb_name: str,
@@ -352,12 +527,40 @@ class Controller:
         ip_recovery.note_sgs_success(target_alias)
         return {"ok": True, "via": "sgs", "stdout": response, "ts": _ts()}
 
-    def dart(self, stb_name: str, button_id: str, action: str) -> Dict[str, Any]:
+    @staticmethod
+    def _await_receipt(receipt: PressReceipt, timeout_s: float) -> None:
+        # A press starts only after earlier presses to its remote released, and
+        # in firmware-ack mode each line may retry for up to the ack budget.
+        timeout_s += max(receipt.scheduled_delay_ms, 0.0) / 1000.0
+        if wait_ack_default():
+            timeout_s += DART_ACK_BUDGET_S * len(receipt.lines)
+        if not receipt.wait(timeout_s + RECEIPT_GRACE_S):
+            raise RuntimeError(f"DART press {receipt.id} did not release in time")
+        if not receipt.ok:
+            raise RuntimeError(receipt.error or f"DART press {receipt.id} failed")
+
+    def dart(
+        self, stb_name: str, button_id: str, action: str, *, wait: bool = True
+    ) -> Dict[str, Any]:
         stb_name = self._canonical_alias(stb_name)
         entry = self._entry(stb_name)
         normalized = str(action or "").lower().strip()
         if normalized.isdigit():
-            line = send_rf(stb_name, entry.get("remote"), button_id, int(normalized))
+            # Hold timing is owned by the port scheduler; without ``wait`` the
+            # request thread returns as soon as the press is queued.
+            receipt = press_scheduler.press(
+                stb_name, entry.get("remote"), button_id, int(normalized)
+            )
+            if wait:
+                self._await_receipt(receipt, int(normalized) / 1000.0)
+            return {
+                "ok": True,
+                "via": "dart",
+                "dart_line": receipt.lines[0].rstrip(),
+                "delivery": "serial_flushed" if wait else "scheduled",
+                "receipt": receipt.as_dict(),
+                "ts": _ts(),
+            }
         else:
             line = send_quick_dart(
                 stb_name, entry.get("remote"), button_id, normalized
@@ -370,19 +573,78 @@ class Controller:
             "ts": _ts(),
         }
 
-    def unpair(self, stb_name: str) -> Dict[str, Any]:
+    def unpair(self, stb_name: str, *, wait: bool = True) -> Dict[str, Any]:
         stb_name = self._canonical_alias(stb_name)
-        try:
-            self.dart(stb_name, "sat", "down")
-            time.sleep(3.10)
-            self.dart(stb_name, "sat", "up")
-            time.sleep(0.20)
-            self.dart(stb_name, "dvr", "down")
-            self.dart(stb_name, "guide", "down")
-            time.sleep(3.50)
-        finally:
-            try:
-                self.dart(stb_name, "allup", "allup")
-            except Exception:
-                LOG.exception("failed to release all buttons after unpair sequence")
-        return {"ok": True, "unpaired": stb_name, "ts": _ts()}
+        remote = self._entry(stb_name).get("remote")
+        # SAT held 3.1 s, then DVR+GUIDE held 3.5 s; ALLUP is always sent at
+        # release, even when an earlier step failed.
+        receipt = press_scheduler.sequence(
+            stb_name,
+            remote,
+            [
+                (0, quick_line(remote, "sat", "down")),
+                (3100, quick_line(remote, "sat", "up")),
+                (3300, quick_line(remote, "dvr", "down")),
+                (3300, quick_line(remote, "guide", "down")),
+            ],
+            hold_ms=3500,
+            cleanup=quick_line(remote, "allup", "allup"),
+        )
+        if wait:
+            self._await_receipt(receipt, 6.85)
+        return {"ok": True, "unpaired": stb_name, "receipt": receipt.as_dict(), "ts": _ts()}
+
+    def press_bulk(
+        self, presses: Sequence[Mapping[str, Any]], *, wait: bool = False
+    ) -> Dict[str, Any]:
+        """Schedule timed presses across many STBs from one request.
+
+        Each item is ``{"stb", "button", "delay" | "hold_ms", "at_ms"?}``.  All
+        items are validated before any is queued.
+        """
+        planned = []
+        for index, item in enumerate(presses):
+            if not isinstance(item, Mapping):
+                raise ValueError(f"press {index} must be an object")
+            alias = self._canonical_alias(str(item.get("stb") or item.get("alias") or ""))
+            entry = self._entry(alias)
+            button = str(item.get("button") or "").strip()
+            hold = int(item.get("hold_ms", item.get("delay", 120)))
+            at_ms = float(item.get("at_ms", 0) or 0)
+            if hold < 0 or at_ms < 0:
+                raise ValueError(f"press {index}: hold_ms and at_ms must be non-negative")
+            if not entry.get("remote"):
+                raise ValueError(f"press {index}: STB {alias!r} has no DART remote")
+            rf_line(entry.get("remote"), button, hold)  # validate before queueing
+            planned.append((alias, entry.get("remote"), button, hold, at_ms))
+        receipts: List[PressReceipt] = [
+            press_scheduler.press(alias, remote, button, hold, at_ms=at_ms)
+            for alias, remote, button, hold, at_ms in planned
+        ]
+        if wait and receipts:
+            longest_ms = max(
+                r.scheduled_delay_ms + plan[3] for r, plan in zip(receipts, planned)
+            )
+            if wait_ack_default():
+                # Acked presses to one remote run back to back, each within
+                # the budget for its DOWN and UP keys.
+                per_remote: Dict[Tuple[str, str], int] = {}
+                for alias, remote, *_rest in planned:
+                    key = (serial_mgr.port_for(alias) or alias, str(remote))
+                    per_remote[key] = per_remote.get(key, 0) + 1
+                longest_ms += 2 * DART_ACK_BUDGET_S * 1000.0 * max(per_remote.values())
+            deadline = time.monotonic() + longest_ms / 1000.0 + RECEIPT_GRACE_S
+            for receipt in receipts:
+                receipt.wait(max(deadline - time.monotonic(), 0.0))
+        return {
+            "ok": all(r.ok for r in receipts) if wait else True,
+            "receipts": [r.as_dict() for r in receipts],
+            "ts": _ts(),
+        }
+
+    @staticmethod
+    def press_status(receipt_id: str) -> Dict[str, Any]:
+        receipt = press_scheduler.receipt(str(receipt_id))
+        if receipt is None:
+            raise ValueError(f"unknown DART receipt {receipt_id!r}")
+        return {"ok": True, "receipt": receipt.as_dict()}
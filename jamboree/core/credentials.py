@@ -6,6 +6,13 @@ Windows a failed keyring operation falls back to a DPAPI-protected local file.
 When keyring is unusable, new fallback records deliberately use machine-scoped
 DPAPI so they survive logon-session changes on the same host. Plaintext
 ``base.txt`` credentials remain explicit opt-in compatibility only.
+
+Successful and negative lookups are cached in process memory so remote keys do
+not pay a Secret Service/Credential Manager round trip each time. The cache is
+invalidated explicitly by ``store_credentials``/``clear_credentials`` and by
+callers that observe an authentication failure or a configuration change, and
+entries also expire after ``CREDENTIAL_CACHE_TTL_S`` so a keyring edited by
+another process is eventually observed.
 """
 from __future__ import annotations
 
@@ -18,7 +25,8 @@ import os
 from pathlib import Path
 import tempfile
 import threading
-from typing import Optional, Tuple
+import time
+from typing import Any, Callable, Optional, Tuple, Union
 
 LOG = logging.getLogger(__name__)
 try:
@@ -34,6 +42,17 @@ _DPAPI_LOCK = threading.RLock()
 # the same warning. Re-pairing overwrites the record and clears this cache.
 _DPAPI_BAD_RECORDS: dict[str, str] = {}
 
+CREDENTIAL_CACHE_TTL_S = 300.0
+_CACHE_LOCK = threading.RLock()
+# alias -> (username, password, backend, monotonic timestamp)
+_CREDENTIAL_CACHE: dict[str, tuple[Optional[str], Optional[str], Optional[str], float]] = {}
+_CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+# Bumped by every invalidation (``None`` counts whole-cache invalidations), so a
+# backend read that raced a store/clear does not re-cache what it read.
+_CACHE_VERSIONS: dict[Optional[str], int] = {}
+
+BaseSource = Union[dict, Callable[[], Optional[dict]], None]
+
 
 class _DATA_BLOB(ctypes.Structure):
     _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_ubyte))]
@@ -293,8 +312,39 @@ class CredentialManager:
         alias = str(alias).strip()
         return f"{alias}_username", f"{alias}_password"
 
+    @classmethod
+    def invalidate_cache(cls, alias: Optional[str] = None) -> None:
+        """Drop cached credentials for ``alias``, or for every alias."""
+        key = None if alias is None else str(alias).strip()
+        with _CACHE_LOCK:
+            _CACHE_VERSIONS[key] = _CACHE_VERSIONS.get(key, 0) + 1
+            if key is None:
+                if _CREDENTIAL_CACHE:
+                    _CACHE_STATS["invalidations"] += 1
+                _CREDENTIAL_CACHE.clear()
+            elif _CREDENTIAL_CACHE.pop(key, None) is not None:
+                _CACHE_STATS["invalidations"] += 1
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        with _CACHE_LOCK:
+            return {
+                "entries": len(_CREDENTIAL_CACHE),
+                "ttl_s": CREDENTIAL_CACHE_TTL_S,
+                **_CACHE_STATS,
+            }
+
     @classmethod
     def store_credentials(cls, alias: str, username: str, password: str) -> bool:
+        # Invalidate after the write as well: a concurrent key could otherwise
+        # re-cache the previous credentials while the backend is being updated.
+        try:
+            return cls._store_credentials(alias, username, password)
+        finally:
+            cls.invalidate_cache(str(alias).strip())
+
+    @classmethod
+    def _store_credentials(cls, alias: str, username: str, password: str) -> bool:
         alias, username, password = str(alias).strip(), str(username or ""), str(password or "")
         if not alias or not username or not password:
             LOG.error("refusing to store incomplete SGS credentials for %r", alias)
@@ -377,16 +427,49 @@ class CredentialManager:
                 return str(username), str(password), "plaintext-opt-in"
         return None, None, None
 
+    @classmethod
+    def _cached_with_backend(
+        cls, alias: str, base_dict: BaseSource = None, *, refresh: bool = False
+    ) -> tuple[Optional[str], Optional[str], Optional[str]]:
+        key = str(alias).strip()
+        now = time.monotonic()
+        with _CACHE_LOCK:
+            version = (_CACHE_VERSIONS.get(None, 0), _CACHE_VERSIONS.get(key, 0))
+            if not refresh:
+                cached = _CREDENTIAL_CACHE.get(key)
+                if cached is not None and now - cached[3] < CREDENTIAL_CACHE_TTL_S:
+                    _CACHE_STATS["hits"] += 1
+                    return cached[0], cached[1], cached[2]
+                _CACHE_STATS["misses"] += 1
+        document: Any = base_dict() if callable(base_dict) else base_dict
+        username, password, backend = cls._get_with_backend(key, document)
+        if key:
+            with _CACHE_LOCK:
+                # Only cache what was read if nothing invalidated the alias
+                # meanwhile; otherwise the next lookup reads the backend again.
+                if version == (_CACHE_VERSIONS.get(None, 0), _CACHE_VERSIONS.get(key, 0)):
+                    _CREDENTIAL_CACHE[key] = (username, password, backend, now)
+        return username, password, backend
+
     @classmethod
     def get_credentials(
-        cls, alias: str, base_dict: Optional[dict] = None
+        cls, alias: str, base_dict: BaseSource = None
     ) -> Tuple[Optional[str], Optional[str]]:
-        username, password, _backend = cls._get_with_backend(alias, base_dict)
+        """Return cached ``(username, password)`` for ``alias``.
+
+        ``base_dict`` may be a zero-argument callable so callers only build the
+        configuration document when the cache misses.
+        """
+        username, password, _backend = cls._cached_with_backend(alias, base_dict)
         return username, password
 
     @classmethod
-    def status(cls, alias: str, base_dict: Optional[dict] = None) -> dict:
-        username, password, backend = cls._get_with_backend(alias, base_dict)
+    def status(cls, alias: str, base_dict: BaseSource = None) -> dict:
+        # Diagnostics always reread the backend (and refresh the cache) so a
+        # status page never reports a stale cached verdict.
+        username, password, backend = cls._cached_with_backend(
+            alias, base_dict, refresh=True
+        )
         stored = bool(username and password)
         secure = bool(stored and backend not in {None, "plaintext-opt-in"})
         return {
@@ -399,12 +482,19 @@ class CredentialManager:
         }
 
     @classmethod
-    def has_stored_credentials(cls, alias: str, base_dict: Optional[dict] = None) -> bool:
+    def has_stored_credentials(cls, alias: str, base_dict: BaseSource = None) -> bool:
         username, password = cls.get_credentials(alias, base_dict)
         return bool(username and password)
 
     @classmethod
     def clear_credentials(cls, alias: str) -> bool:
+        try:
+            return cls._clear_credentials(alias)
+        finally:
+            cls.invalidate_cache(alias)
+
+    @classmethod
+    def _clear_credentials(cls, alias: str) -> bool:
         keyring_ok = True
         if keyring is not None:
             for key in cls._keys(alias):
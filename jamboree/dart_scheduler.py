@@ -0,0 +1,300 @@
+"""Asynchronous DART press scheduling, one timing thread per serial port.
+
+``send_rf`` pads every Format-A write with ``time.sleep(delay + 50 ms)`` in the
+calling thread.  The scheduler owns that hold timing instead: a press or timed
+sequence is queued on its port's scheduler thread and a ``PressReceipt`` is
+returned immediately.  Callers may block on the receipt until release, or poll
+it later by id.
+
+Presses for the same remote are serialized (the sketch defers a DOWN while an
+UP is still pending), while different remotes on one port are interleaved.
+The next press for a remote is started by the previous press's release, which
+is timed from when its last line actually completed, not from its planned
+start: a port thread running late must not send two presses back to back.
+
+Lines go through ``serial_bridge.send_line``, so the ``JAMBOREE_DART_ACK`` mode
+applies here too.  In that mode a Format-A step completes on the firmware's
+acknowledgement of the UP, which already includes the hold.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from . import serial_bridge
+from .serial_hub import serial_mgr
+
+LOG = logging.getLogger(__name__)
+RELEASE_PAD_MS = 50
+MAX_RECEIPTS = 512
+
+# (offset_ms from the start of the sequence, DART line)
+Step = Tuple[float, str]
+
+
+def _ts() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class PressReceipt:
+    alias: str
+    remote: str
+    lines: List[str]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    done: threading.Event = field(default_factory=threading.Event)
+    ok: bool = False
+    error: Optional[str] = None
+    sent: List[str] = field(default_factory=list)
+    queued_ts: str = field(default_factory=_ts)
+    scheduled_delay_ms: float = 0.0
+    started: Optional[float] = None
+    released: Optional[float] = None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def as_dict(self) -> dict:
+        state = "pending"
+        if self.done.is_set():
+            state = "released" if self.ok else "failed"
+        elif self.started is not None:
+            state = "holding"
+        return {
+            "id": self.id,
+            "alias": self.alias,
+            "remote": self.remote,
+            "state": state,
+            "ok": self.ok if self.done.is_set() else None,
+            "error": self.error,
+            "dart_lines": [line.rstrip() for line in self.sent],
+            "queued_ts": self.queued_ts,
+            "scheduled_delay_ms": round(self.scheduled_delay_ms, 1),
+            "held_ms": round((self.released - self.started) * 1000.0, 1)
+            if self.started is not None and self.released is not None
+            else None,
+        }
+
+
+class _PortScheduler(threading.Thread):
+    """Run timed DART writes for one serial port from a single timer heap."""
+
+    def __init__(self, port: str) -> None:
+        super().__init__(name=f"dart-sched-{port}", daemon=True)
+        self.port = port
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._seq = itertools.count()
+        self._free_at: Dict[str, float] = {}
+        self._waiting: Dict[str, Deque[Tuple[float, Callable[[], None]]]] = {}
+        self._busy: Set[str] = set()
+        self._stop_event = threading.Event()
+
+    def reserve(self, remote: str, earliest: float, duration_s: float) -> float:
+        """Return the planned start for ``remote`` and hold it for ``duration_s``.
+
+        This is only the estimate reported to callers; the press actually starts
+        when :meth:`finish` releases the one before it.
+        """
+        with self._cond:
+            start = max(earliest, self._free_at.get(remote, 0.0))
+            self._free_at[remote] = start + duration_s
+            return start
+
+    def start_when_free(self, remote: str, earliest: float, fn: Callable[[], None]) -> None:
+        """Run ``fn`` at ``earliest`` once every earlier job for ``remote`` finished."""
+        with self._cond:
+            if remote in self._busy:
+                self._waiting.setdefault(remote, deque()).append((earliest, fn))
+                return
+            self._busy.add(remote)
+            heapq.heappush(self._heap, (earliest, next(self._seq), fn))
+            self._cond.notify()
+
+    def finish(self, remote: str) -> None:
+        """Mark the running job for ``remote`` done and start the next one."""
+        with self._cond:
+            waiting = self._waiting.get(remote)
+            if not waiting:
+                self._waiting.pop(remote, None)
+                self._busy.discard(remote)
+                return
+            earliest, fn = waiting.popleft()
+            heapq.heappush(self._heap, (max(earliest, time.monotonic()), next(self._seq), fn))
+            self._cond.notify()
+
+    def call_at(self, due: float, fn: Callable[[], None]) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), fn))
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) + sum(len(q) for q in self._waiting.values())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due = self._heap[0][0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                _due, _seq, fn = heapq.heappop(self._heap)
+            try:
+                fn()
+            except Exception:
+                LOG.exception("[%s] scheduled DART step failed", self.port)
+
+
+class PressScheduler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ports: Dict[str, _PortScheduler] = {}
+        self._receipts: "OrderedDict[str, PressReceipt]" = OrderedDict()
+
+    def _port(self, alias: str) -> _PortScheduler:
+        key = serial_mgr.port_for(alias) or alias
+        with self._lock:
+            worker = self._ports.get(key)
+            if worker is None or not worker.is_alive():
+                worker = _PortScheduler(key)
+                self._ports[key] = worker
+                worker.start()
+            return worker
+
+    def _remember(self, receipt: PressReceipt) -> None:
+        with self._lock:
+            self._receipts[receipt.id] = receipt
+            while len(self._receipts) > MAX_RECEIPTS:
+                self._receipts.popitem(last=False)
+
+    def receipt(self, receipt_id: str) -> Optional[PressReceipt]:
+        with self._lock:
+            return self._receipts.get(receipt_id)
+
+    def press(
+        self,
+        alias: str,
+        remote: Union[str, int],
+        button_id: str,
+        hold_ms: Union[str, int],
+        *,
+        at_ms: float = 0.0,
+    ) -> PressReceipt:
+        """Queue one Format-A press; the receipt releases after the hold."""
+        line = serial_bridge.rf_line(remote, button_id, hold_ms)
+        hold = int(line.split()[-1])
+        return self.sequence(alias, remote, [(0.0, line)], hold_ms=hold, at_ms=at_ms)
+
+    def sequence(
+        self,
+        alias: str,
+        remote: Union[str, int],
+        steps: Sequence[Step],
+        *,
+        hold_ms: float = 0.0,
+        at_ms: float = 0.0,
+        cleanup: Optional[str] = None,
+    ) -> PressReceipt:
+        """Queue timed DART lines for one remote.
+
+        ``steps`` are ``(offset_ms, line)`` pairs relative to the sequence start.
+        The receipt releases ``hold_ms`` after the last step.  ``cleanup`` (for
+        example an ``allup``) is written at release even if a step failed.
+        """
+        remote_key = str(remote)
+        ordered = sorted(((float(offset), line) for offset, line in steps), key=lambda s: s[0])
+        if not ordered:
+            raise ValueError("sequence requires at least one step")
+        wait_ack = serial_bridge.wait_ack_default()
+        hold_s = max(float(hold_ms), 0.0) / 1000.0
+        # Time from the last line's completion to release.  An acked Format-A
+        # line only completes after its UP, i.e. after the hold.
+        acked_hold = wait_ack and len(ordered[-1][1].split()) == 4
+        tail_s = (0.0 if acked_hold else hold_s) + RELEASE_PAD_MS / 1000.0
+        receipt = PressReceipt(str(alias), remote_key, [line for _o, line in ordered])
+        worker = self._port(str(alias))
+        now = time.monotonic()
+        earliest = now + max(float(at_ms), 0.0) / 1000.0
+        planned = ordered[-1][0] / 1000.0 + hold_s + RELEASE_PAD_MS / 1000.0
+        receipt.scheduled_delay_ms = (worker.reserve(remote_key, earliest, planned) - now) * 1000.0
+        self._remember(receipt)
+
+        def release() -> None:
+            try:
+                if cleanup:
+                    try:
+                        receipt.sent.append(
+                            serial_bridge.send_line(alias, cleanup, wait_ack=wait_ack)
+                        )
+                    except Exception as exc:
+                        LOG.warning(
+                            "DART cleanup %r for %s failed: %s", cleanup.strip(), alias, exc
+                        )
+                        receipt.error = receipt.error or str(exc)
+                receipt.released = time.monotonic()
+                receipt.ok = receipt.error is None
+                receipt.done.set()
+            finally:
+                worker.finish(remote_key)
+
+        def write(line: str, last: bool) -> Callable[[], None]:
+            def step() -> None:
+                try:
+                    if receipt.error is None:
+                        receipt.sent.append(
+                            serial_bridge.send_line(alias, line, wait_ack=wait_ack)
+                        )
+                except Exception as exc:
+                    receipt.error = str(exc)
+                finally:
+                    if last:
+                        worker.call_at(time.monotonic() + tail_s, release)
+
+            return step
+
+        def begin() -> None:
+            # Offsets are relative to when the press really started.
+            receipt.started = time.monotonic()
+            for index, (offset, line) in enumerate(ordered):
+                last = index == len(ordered) - 1
+                if index == 0 and offset <= 0:
+                    write(line, last)()
+                else:
+                    worker.call_at(receipt.started + offset / 1000.0, write(line, last))
+
+        worker.start_when_free(remote_key, earliest, begin)
+        return receipt
+
+    def status(self) -> dict:
+        with self._lock:
+            ports = {key: worker.pending() for key, worker in self._ports.items()}
+            pending = sum(1 for r in self._receipts.values() if not r.done.is_set())
+        return {"ports": ports, "receipts_pending": pending}
+
+    def stop_all(self) -> None:
+        with self._lock:
+            workers = list(self._ports.values())
+            self._ports.clear()
+        for worker in workers:
+            worker.stop()
+
+
+press_scheduler = PressScheduler()
@@ -12,18 +12,20 @@ import ipaddress
 import json
 import logging
 import os
-import platform
 import re
-import socket
-import subprocess
 import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict, dataclass, field
 from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence
 
 import requests
 
+from . import neighbors, net_sweep
+from .ocr_cache import fingerprint, ocr_cache
+from .ocr_engine import ocr_engine
+
 LOG = logging.getLogger(__name__)
 _RXID_RE = re.compile(r"R\d{10}(?:-\d{2})?", re.I)
 _OCTET = r"(?:25[0-5]|2[0-4]\d|1\d{2}|[1-9]?\d)"
@@ -106,6 +108,7 @@ class _AliasState:
     known_mac: Optional[str] = None
     autopair_last_ts: float = 0.0
     autopair_last: dict = field(default_factory=dict)
+    last_sweep: dict = field(default_factory=dict)
 
 
 _store: Any = None
@@ -114,6 +117,7 @@ _get_frame: Optional[Callable[[], Any]] = None
 _get_status: Optional[Callable[[], Dict[str, Any]]] = None
 _CFG: Dict[str, Any] = {}
 _state_lock = threading.RLock()
+_screen_lock = threading.Lock()
 _states: Dict[str, _AliasState] = {}
 
 
@@ -283,87 +287,94 @@ def _all_strings(value: Any) -> Iterable[str]:
         yield str(value)
 
 
+# (URL template, TLS) pairs tried by ``probe_device_identity``.
+PROBE_ENDPOINTS = (
+    ("http://{ip}:8080/sgs_noauth", False),
+    ("http://{ip}:8080/www/sgs", False),
+    ("http://{ip}/www/sgs", False),
+    ("https://{ip}/www/sgs", True),
+)
+PROBE_COMMANDS = ("get_stb_information", "get_receiver_id", "get_version")
+PROBE_DEADLINE_S = 5.0
+
+
+def _non_stb_marker(headers: Mapping[str, str], body: str, server: str) -> Optional[str]:
+    for marker in NON_STB_HEADER_MARKERS:
+        if marker in headers:
+            return f"header:{marker}"
+    for marker in NON_STB_BODY_MARKERS:
+        if marker in body:
+            return f"body:{marker}"
+    for marker in NON_STB_SERVER_MARKERS:
+        if marker in server:
+            return f"server:{marker}"
+    return None
+
+
 def probe_device_identity(
     ip: str,
     expected_rxid: str = "",
     *,
     timeout: float = 2.0,
+    deadline_s: float = PROBE_DEADLINE_S,
+    endpoints: Sequence[tuple[str, bool]] = PROBE_ENDPOINTS,
     request_post: Callable[..., Any] = requests.post,
 ) -> Dict[str, Any]:
-    """Fingerprint an address and collect any receiver IDs it exposes."""
+    """Fingerprint an address and collect any receiver IDs it exposes.
+
+    Endpoints are probed concurrently, each running the commands in order.  The
+    probe stops as soon as a non-STB marker or the expected RxID is seen, an
+    endpoint whose port refused a connection is not retried for the remaining
+    commands, and the whole probe is bounded by ``deadline_s``.
+    """
     expected = normalize_rxid(expected_rxid)
-    server = ""
-    saw_response = False
-    positive = False
+    deadline = time.monotonic() + max(float(deadline_s), 0.0)
+    cond = threading.Condition()
+    stop = threading.Event()
+    state: Dict[str, Any] = {
+        "server": "",
+        "saw_response": False,
+        "positive": False,
+        "verdict": None,
+        "running": 0,
+    }
     rxids: set[str] = set()
     observations: list[dict] = []
-    endpoints = (
-        (f"http://{ip}:8080/sgs_noauth", False),
-        (f"http://{ip}:8080/www/sgs", False),
-        (f"http://{ip}/www/sgs", False),
-        (f"https://{ip}/www/sgs", True),
-    )
-    commands = ("get_stb_information", "get_receiver_id", "get_version")
-    for url, secure in endpoints:
-        for command in commands:
-            try:
-                response = request_post(
-                    url,
-                    json={"command": command},
-                    timeout=timeout,
-                    verify=False if secure else True,
-                    headers={"Content-Type": "application/json"},
-                )
-            except Exception:
-                continue
-            saw_response = True
-            headers = {str(k).lower(): str(v).lower() for k, v in response.headers.items()}
-            body = (response.text or "")[:4000].lower()
-            server = headers.get("server", server)
-            for marker in NON_STB_HEADER_MARKERS:
-                if marker in headers:
-                    return {
-                        "is_stb": False,
-                        "reason": f"header:{marker}",
-                        "server": server,
-                        "rxids": [],
-                        "rxid_match": False,
-                    }
-            for marker in NON_STB_BODY_MARKERS:
-                if marker in body:
-                    return {
-                        "is_stb": False,
-                        "reason": f"body:{marker}",
-                        "server": server,
-                        "rxids": [],
-                        "rxid_match": False,
-                    }
-            for marker in NON_STB_SERVER_MARKERS:
-                if marker in server:
-                    return {
+    dead_ports: set[str] = set()
+
+    def observe(url: str, command: str, response: Any) -> None:
+        headers = {str(k).lower(): str(v).lower() for k, v in response.headers.items()}
+        body = (response.text or "")[:4000].lower()
+        try:
+            data = response.json()
+        except Exception:
+            data = None
+        with cond:
+            state["saw_response"] = True
+            state["server"] = headers.get("server", state["server"])
+            marker = _non_stb_marker(headers, body, state["server"])
+            if marker:
+                if state["verdict"] is None:
+                    state["verdict"] = {
                         "is_stb": False,
-                        "reason": f"server:{marker}",
-                        "server": server,
+                        "reason": marker,
+                        "server": state["server"],
                         "rxids": [],
                         "rxid_match": False,
                     }
-            auth_header = headers.get("www-authenticate", "")
-            if "digest" in auth_header:
-                positive = True
-            try:
-                data = response.json()
-            except Exception:
-                data = None
+                stop.set()
+                return
+            if "digest" in headers.get("www-authenticate", ""):
+                state["positive"] = True
             if isinstance(data, dict):
                 if "result" in data:
-                    positive = True
-                found = {
+                    state["positive"] = True
+                rxids.update(
                     normalize_rxid(match)
                     for text in _all_strings(data)
                     for match in _RXID_RE.findall(text)
                     if normalize_rxid(match)
-                }
-                rxids.update(found)
+                )
                 observations.append(
                     {
                         "url": url,
@@ -372,27 +383,234 @@ def probe_device_identity(
                         "result": data.get("result"),
                     }
                 )
-    normalized_rxids = sorted(rxids)
-    match = bool(expected and expected in rxids)
+                if expected and expected in rxids:
+                    stop.set()
+
+    def run_endpoint(url: str, secure: bool) -> None:
+        port = url.split("/")[2] + ("/tls" if secure else "")
+        try:
+            for command in PROBE_COMMANDS:
+                remaining = deadline - time.monotonic()
+                if stop.is_set() or remaining <= 0:
+                    return
+                with cond:
+                    if port in dead_ports:
+                        return
+                try:
+                    response = request_post(
+                        url,
+                        json={"command": command},
+                        timeout=min(timeout, remaining),
+                        verify=False if secure else True,
+                        headers={"Content-Type": "application/json"},
+                    )
+                except requests.ConnectionError:
+                    # Refused, unreachable or connect timeout: the port is not
+                    # going to answer the next command either.
+                    with cond:
+                        dead_ports.add(port)
+                    return
+                except Exception:
+                    continue
+                observe(url, command, response)
+        finally:
+            with cond:
+                state["running"] -= 1
+                cond.notify_all()
+
+    workers = []
+    for template, secure in endpoints:
+        url = template.format(ip=ip)
+        workers.append(
+            threading.Thread(
+                target=run_endpoint, args=(url, secure), name=f"probe-{ip}", daemon=True
+            )
+        )
+    with cond:
+        state["running"] = len(workers)
+    for worker in workers:
+        worker.start()
+    with cond:
+        cond.wait_for(
+            lambda: state["running"] == 0 or stop.is_set(),
+            max(deadline - time.monotonic(), 0.0),
+        )
+        stop.set()
+        if state["verdict"] is not None:
+            return dict(state["verdict"])
+        normalized_rxids = sorted(rxids)
+        saw_response = state["saw_response"]
+        positive = state["positive"]
+        server = state["server"]
+        recent = observations[-6:]
+    match = bool(expected and expected in normalized_rxids)
     return {
-        "is_stb": True if positive else (None if not saw_response else None),
+        "is_stb": True if positive else None,
         "reason": "rxid_match"
         if match
         else ("sgs_response" if positive else "unreachable" if not saw_response else "inconclusive"),
         "server": server,
         "rxids": normalized_rxids,
         "rxid_match": match if expected else None,
-        "observations": observations[-6:],
+        "observations": recent,
     }
 
 
-def verify_stored_ip_identity(alias: Optional[str] = None) -> Dict[str, Any]:
+IDENTITY_CACHE_TTL_S = 60.0
+IDENTITY_CACHE_MAX_AGE_S = 600.0
+IDENTITY_CACHE_MAX_ENTRIES = 1024
+RECOVERY_MAX_WORKERS = 8
+
+
+class IdentityCache:
+    """Identity verdicts keyed by ``(ip, expected RxID)`` with background refresh.
+
+    Status endpoints read from here instead of fingerprinting receivers inline;
+    a missing or expired verdict is refreshed on a daemon thread (one in flight
+    per key) and the caller gets whatever is cached right now. Verdicts older
+    than ``max_age_s`` are dropped rather than served, and at most
+    ``max_entries`` are kept, oldest first out.
+    """
+
+    def __init__(
+        self,
+        ttl_s: Optional[float] = None,
+        *,
+        max_age_s: float = IDENTITY_CACHE_MAX_AGE_S,
+        max_entries: int = IDENTITY_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self._ttl_s = ttl_s
+        self.max_age_s = float(max_age_s)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        # key -> (verdict, stored_at), oldest store first
+        self._entries: "OrderedDict[tuple[str, str], tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._refreshing: set[tuple[str, str]] = set()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "refreshes": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def ttl_s(self) -> float:
+        if self._ttl_s is not None:
+            return self._ttl_s
+        try:
+            return float(_CFG.get("identity_cache_ttl_s", IDENTITY_CACHE_TTL_S))
+        except (TypeError, ValueError):
+            return IDENTITY_CACHE_TTL_S
+
+    @staticmethod
+    def _key(ip: str, expected_rxid: str) -> tuple[str, str]:
+        return str(ip).strip(), normalize_rxid(expected_rxid)
+
+    def put(self, ip: str, expected_rxid: str, result: Mapping[str, Any]) -> None:
+        key = self._key(ip, expected_rxid)
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (dict(result), now)
+            self._stats["stores"] += 1
+            self._prune_locked(now)
+
+    def _prune_locked(self, now: float) -> None:
+        while self._entries:
+            key, (_result, stored) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and now - stored < self.max_age_s:
+                break
+            del self._entries[key]
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def refresh_async(self, ip: str, expected_rxid: str) -> bool:
+        key = self._key(ip, expected_rxid)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+
+        def worker() -> None:
+            try:
+                self.put(ip, expected_rxid, probe_device_identity(ip, expected_rxid))
+            except Exception:
+                LOG.exception("background identity probe failed ip=%s", ip)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, name=f"IdentityProbe-{key[0]}", daemon=True).start()
+        return True
+
+    def lookup(self, ip: str, expected_rxid: str) -> Dict[str, Any]:
+        """Return the cached verdict (with ``age_s``) and refresh it if needed."""
+        key = self._key(ip, expected_rxid)
+        with self._lock:
+            self._prune_locked(time.monotonic())
+            cached = self._entries.get(key)
+        if cached is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            # Already in flight when this returns False; either way a probe runs.
+            self.refresh_async(ip, expected_rxid)
+            return {
+                "is_stb": None,
+                "reason": "identity_pending",
+                "cached": False,
+                "age_s": None,
+                "refreshing": True,
+            }
+        result, stored = cached
+        age = time.monotonic() - stored
+        stale = age >= self.ttl_s
+        with self._lock:
+            self._stats["stale" if stale else "hits"] += 1
+            refreshing = key in self._refreshing
+        if stale:
+            self.refresh_async(ip, expected_rxid)
+            refreshing = True
+        return {
+            **result,
+            "cached": True,
+            "age_s": round(age, 1),
+            "stale": stale,
+            "refreshing": refreshing,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "refreshing": len(self._refreshing),
+                "ttl_s": self.ttl_s,
+            }
+
+
+identity_cache = IdentityCache()
+
+
+def verify_stored_ip_identity(
+    alias: Optional[str] = None, *, cached: bool = False
+) -> Dict[str, Any]:
+    """Fingerprint the stored IP; ``cached`` returns the cached verdict instead."""
     alias = str(alias or _default_alias())
     entry = _entry(alias)
     ip = str(entry.get("ip") or "").strip()
     if not ip:
         return {"alias": alias, "ip": None, "is_stb": None, "reason": "no_stored_ip"}
-    result = probe_device_identity(ip, str(entry.get("stb") or ""))
+    expected = str(entry.get("stb") or "")
+    if cached:
+        return {"alias": alias, "ip": ip, **identity_cache.lookup(ip, expected)}
+    result = probe_device_identity(ip, expected)
+    identity_cache.put(ip, expected, result)
     return {"alias": alias, "ip": ip, **result}
 
 
@@ -412,26 +630,7 @@ def _video_alive() -> bool:
 
 
 def _arp_entries() -> Dict[str, str]:
-    commands = (
-        ["ip", "neigh", "show"],
-        ["arp", "-a"] if platform.system() == "Windows" else ["arp", "-n"],
-    )
-    entries: Dict[str, str] = {}
-    for command in commands:
-        try:
-            output = subprocess.check_output(
-                command, text=True, stderr=subprocess.DEVNULL, timeout=5
-            )
-        except Exception:
-            continue
-        for line in output.splitlines():
-            ip_match = _IP_RE.search(line)
-            mac_match = _MAC_RE.search(line)
-            if ip_match and mac_match:
-                entries[ip_match.group(1)] = mac_match.group(0).replace("-", ":").lower()
-        if entries:
-            break
-    return entries
+    return neighbors.neighbor_table.entries()
 
 
 def _configured_mac(alias: str) -> Optional[str]:
@@ -481,47 +680,47 @@ def _candidate_hosts(alias: str, max_hosts: int = 512) -> list[str]:
     return hosts
 
 
-def _touch_host(ip: str, timeout: float = 0.2) -> None:
-    for port in (8080, 80, 443):
-        try:
-            with socket.create_connection((ip, port), timeout=timeout):
-                return
-        except OSError:
-            continue
-    # Ping is a final cache-population attempt; failure is harmless.
-    if platform.system() == "Windows":
-        command = ["ping", "-n", "1", "-w", str(max(100, int(timeout * 1000))), ip]
-    else:
-        command = ["ping", "-c", "1", "-W", "1", ip]
-    try:
-        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)
-    except Exception:
-        pass
+def _sweep_hosts(hosts: Sequence[str], concurrency: int) -> Dict[str, Any]:
+    """Touch every candidate so live receivers land in the neighbor table."""
+    host_timeout = float(
+        _CFG.get("ip_recovery_host_timeout_s", net_sweep.DEFAULT_HOST_TIMEOUT_S)
+    )
+    deadline = float(_CFG.get("ip_recovery_sweep_deadline_s", net_sweep.DEFAULT_DEADLINE_S))
+    result = net_sweep.sweep(
+        hosts, concurrency=concurrency, host_timeout_s=host_timeout, deadline_s=deadline
+    )
+    # The sweep just populated the kernel table; do not serve a pre-sweep cache.
+    neighbors.neighbor_table.invalidate()
+    return result.as_dict()
 
 
 def find_by_mac(
     alias: str,
     *,
     candidates: Optional[Sequence[str]] = None,
-    workers: int = 48,
+    workers: int = net_sweep.DEFAULT_CONCURRENCY,
 ) -> Optional[str]:
     mac = _configured_mac(alias)
     if not mac:
         return None
     hosts = list(candidates) if candidates is not None else _candidate_hosts(alias)
     host_set = set(hosts)
-    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), 96))) as pool:
-        list(pool.map(_touch_host, hosts))
+    if hosts:
+        sweep = _sweep_hosts(hosts, max(1, int(workers)))
+        with _state_lock:
+            _state(alias).last_sweep = sweep
+    return _verified_mac_candidate(alias, mac, _arp_entries(), host_set)
+
+
+def _verified_mac_candidate(
+    alias: str, mac: str, arp: Mapping[str, str], host_set: set[str]
+) -> Optional[str]:
     # The same physical device can legitimately appear more than once in the OS
     # ARP table (for example, one RFC1918 address plus an APIPA/link-local alias).
     # Recovery is scoped to the candidate hosts we deliberately scanned, so an
     # out-of-scope duplicate must not make an otherwise unique candidate
     # ambiguous. Multiple in-scope matches remain a hard failure.
-    matches = sorted(
-        ip
-        for ip, value in _arp_entries().items()
-        if value == mac and ip in host_set
-    )
+    matches = sorted(ip for ip, value in arp.items() if value == mac and ip in host_set)
     if len(matches) != 1:
         if len(matches) > 1:
             LOG.error("MAC %s resolved ambiguously within candidate scope: %s", mac, matches)
@@ -538,8 +737,13 @@ def scan_identity_candidates(
     *,
     candidates: Optional[Sequence[str]] = None,
     workers: int = 48,
-    probe: Callable[[str, str], Dict[str, Any]] = lambda ip, rxid: probe_device_identity(ip, rxid),
+    probe: Optional[Callable[[str, str], Dict[str, Any]]] = None,
 ) -> tuple[list[str], list[str]]:
+    """Probe ``candidates`` and return ``(exact RxID matches, unidentified)``.
+
+    Only verdicts from the real ``probe_device_identity`` feed the status
+    cache; an injected ``probe`` is the caller's own view of the network.
+    """
     entry = _entry(alias)
     expected = normalize_rxid(entry.get("stb"))
     hosts = list(candidates) if candidates is not None else _candidate_hosts(alias)
@@ -547,7 +751,11 @@ def scan_identity_candidates(
     unidentified: list[str] = []
 
     def check(ip: str) -> tuple[str, Dict[str, Any]]:
-        return ip, probe(ip, expected)
+        if probe is not None:
+            return ip, probe(ip, expected)
+        identity = probe_device_identity(ip, expected)
+        identity_cache.put(ip, expected, identity)
+        return ip, identity
 
     with ThreadPoolExecutor(max_workers=max(1, min(int(workers), 96))) as pool:
         futures = [pool.submit(check, ip) for ip in hosts]
@@ -569,9 +777,15 @@ def find_by_identity(
     alias: str,
     *,
     candidates: Optional[Sequence[str]] = None,
-    probe: Callable[[str, str], Dict[str, Any]] = lambda ip, rxid: probe_device_identity(ip, rxid),
+    probe: Optional[Callable[[str, str], Dict[str, Any]]] = None,
 ) -> tuple[Optional[str], Optional[str]]:
     exact, unidentified = scan_identity_candidates(alias, candidates=candidates, probe=probe)
+    return _identity_decision(exact, unidentified)
+
+
+def _identity_decision(
+    exact: Sequence[str], unidentified: Sequence[str]
+) -> tuple[Optional[str], Optional[str]]:
     if len(exact) > 1:
         return None, f"ambiguous RxID matches: {exact}"
     if len(exact) == 1:
@@ -586,21 +800,17 @@ def find_by_identity(
     return None, "no receiver identity match"
 
 
-def _get_pytesseract() -> Any:
-    try:
-        import pytesseract
-
-        return pytesseract
-    except Exception:
-        return None
-
-
 def _ocr_frame(frame: Any, psm: int = 6) -> str:
     if frame is None or not getattr(frame, "size", 0):
         return ""
-    pytesseract = _get_pytesseract()
-    if pytesseract is None:
+    if not ocr_engine.available():
         return ""
+    # Navigation re-reads a screen that usually has not changed yet.
+    slot = ("screen", int(psm))
+    fp = fingerprint(frame)
+    hit, cached = ocr_cache.lookup(slot, fp)
+    if hit:
+        return cached
     try:
         import cv2
 
@@ -611,11 +821,10 @@ def _ocr_frame(frame: Any, psm: int = 6) -> str:
         threshold = cv2.adaptiveThreshold(
             up, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 5
         )
-        raw = pytesseract.image_to_string(
-            threshold,
-            config=f"--oem 3 --psm {int(psm)} -c user_defined_dpi=300",
-        )
-        return re.sub(r"\s+", " ", str(raw or "")).strip()
+        raw = ocr_engine.image_to_string(threshold, psm=int(psm))
+        text = re.sub(r"\s+", " ", str(raw or "")).strip()
+        ocr_cache.store(slot, fp, text)
+        return text
     except Exception as exc:
         LOG.debug("OCR failed: %s", exc)
         return ""
@@ -843,14 +1052,16 @@ def recover_alias(
         if candidate:
             strategy = "sgs_identity"
 
-    # Strategy 3: RF-driven Diagnostics/Network screen and OCR.
+    # Strategy 3: RF-driven Diagnostics/Network screen and OCR.  There is one
+    # capture feed, so concurrent recoveries take turns on the screen.
     if not candidate and _get_frame is not None:
-        if navigator(alias):
-            candidate = screen_reader(alias)
-            if candidate:
-                strategy = "rf_ocr"
-        else:
-            details["rf_ocr"] = "navigation_failed"
+        with _screen_lock:
+            if navigator(alias):
+                candidate = screen_reader(alias)
+                if candidate:
+                    strategy = "rf_ocr"
+            else:
+                details["rf_ocr"] = "navigation_failed"
 
     if not candidate:
         return RecoveryResult(
@@ -976,36 +1187,236 @@ def recover_alias(
             _escape_to_live(alias)
 
 
+class _SharedPass:
+    """One sweep, ARP read and identity scan shared by a group of aliases."""
+
+    def __init__(self, hosts: Sequence[str]) -> None:
+        self.hosts = list(hosts)
+        self._lock = threading.Lock()
+        self._arp: Optional[Dict[str, str]] = None
+        self._identities: Optional[Dict[str, Dict[str, Any]]] = None
+        self.sweep: Dict[str, Any] = {}
+
+    def arp(self) -> Dict[str, str]:
+        with self._lock:
+            if self._arp is None:
+                self.sweep = _sweep_hosts(self.hosts, net_sweep.DEFAULT_CONCURRENCY)
+                self._arp = _arp_entries()
+            return self._arp
+
+    def identities(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._identities is None:
+                found: Dict[str, Dict[str, Any]] = {}
+                with ThreadPoolExecutor(max_workers=48) as pool:
+                    for ip, identity in zip(
+                        self.hosts, pool.map(lambda ip: probe_device_identity(ip, ""), self.hosts)
+                    ):
+                        if identity.get("is_stb") is True:
+                            found[ip] = identity
+                self._identities = found
+            return self._identities
+
+    def mac_finder(self, alias: str, *, candidates: Optional[Sequence[str]] = None) -> Optional[str]:
+        mac = _configured_mac(alias)
+        if not mac:
+            return None
+        scope = set(candidates) if candidates is not None else set(_candidate_hosts(alias))
+        arp = self.arp()
+        with _state_lock:
+            _state(alias).last_sweep = dict(self.sweep, shared=True)
+        return _verified_mac_candidate(alias, mac, arp, scope)
+
+    def identity_finder(
+        self, alias: str, *, candidates: Optional[Sequence[str]] = None
+    ) -> tuple[Optional[str], Optional[str]]:
+        expected = normalize_rxid(_entry(alias).get("stb"))
+        scope = set(candidates) if candidates is not None else set(_candidate_hosts(alias))
+        exact: list[str] = []
+        unidentified: list[str] = []
+        for ip, identity in self.identities().items():
+            if ip not in scope:
+                continue
+            rxids = identity.get("rxids") or []
+            match = bool(expected and expected in rxids)
+            identity_cache.put(ip, expected, {**identity, "rxid_match": match if expected else None})
+            if match:
+                exact.append(ip)
+            elif not rxids:
+                unidentified.append(ip)
+        return _identity_decision(sorted(exact), sorted(unidentified))
+
+
+class RecoveryCoordinator:
+    """Queue asynchronous recoveries and merge overlapping ones into shared sweeps.
+
+    Requests arriving within ``ip_recovery_merge_window_s`` (default 0.5 s) of
+    each other form a batch.  Aliases whose candidate subnets overlap are
+    resolved from one sweep, one ARP read and (if needed) one identity scan;
+    each alias then goes through the normal ``recover_alias`` write/verify/
+    rollback path on its own worker thread (at most
+    ``ip_recovery_max_workers``, default 8), so a slow receiver only delays
+    aliases that share its sweep.  A request for an alias that is already
+    queued, running or being verified by the passive IP watcher is dropped as
+    a duplicate.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._queued: Dict[str, float] = {}
+        self._running: set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._stats = {"requests": 0, "deduped": 0, "batches": 0, "groups": 0, "merged": 0}
+
+    @staticmethod
+    def _merge_window_s() -> float:
+        try:
+            return max(float(_CFG.get("ip_recovery_merge_window_s", 0.5)), 0.0)
+        except (TypeError, ValueError):
+            return 0.5
+
+    def submit(self, alias: str) -> bool:
+        with self._cond:
+            state = _state(alias)
+            with _state_lock:
+                # ``active`` is also set by the passive IP watcher while it
+                # verifies a move for this alias.
+                busy = state.active
+            if busy or alias in self._queued or alias in self._running:
+                self._stats["deduped"] += 1
+                return False
+            self._queued[alias] = time.monotonic()
+            self._stats["requests"] += 1
+            with _state_lock:
+                state.active = True
+                state.last_attempt_ts = time.time()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="IPRecoveryCoordinator", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "queue_depth": len(self._queued),
+                "running": sorted(self._running),
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queued:
+                    if not self._cond.wait(timeout=30.0) and not self._queued:
+                        self._thread = None
+                        return
+                    continue
+                first = min(self._queued.values())
+                remaining = first + self._merge_window_s() - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                batch = list(self._queued)
+                self._queued.clear()
+                self._running.update(batch)
+                self._stats["batches"] += 1
+            self._process(batch)
+
+    def _worker_slots(self) -> threading.BoundedSemaphore:
+        if self._slots is None:
+            try:
+                workers = int(_CFG.get("ip_recovery_max_workers", RECOVERY_MAX_WORKERS))
+            except (TypeError, ValueError):
+                workers = RECOVERY_MAX_WORKERS
+            self._slots = threading.BoundedSemaphore(max(1, workers))
+        return self._slots
+
+    def _start(self, alias: str, shared: Optional[_SharedPass]) -> None:
+        slots = self._worker_slots()
+        slots.acquire()
+
+        def worker() -> None:
+            try:
+                _run_recovery(alias, shared)
+            finally:
+                slots.release()
+                with self._cond:
+                    self._running.discard(alias)
+
+        try:
+            threading.Thread(target=worker, name=f"IPRecovery-{alias}", daemon=True).start()
+        except Exception:
+            slots.release()
+            with self._cond:
+                self._running.discard(alias)
+            raise
+
+    def _process(self, batch: Sequence[str]) -> None:
+        # (aliases, ordered candidate hosts, host set); overlapping groups merge.
+        groups: list[tuple[list[str], list[str], set[str]]] = []
+        for alias in batch:
+            try:
+                hosts = _candidate_hosts(alias)
+            except Exception:
+                hosts = []
+            aliases, union, seen = [alias], list(hosts), set(hosts)
+            for group in [g for g in groups if g[2] & seen]:
+                groups.remove(group)
+                aliases = group[0] + aliases
+                union = group[1] + [ip for ip in union if ip not in group[2]]
+                seen |= group[2]
+            groups.append((aliases, union, seen))
+        with self._cond:
+            self._stats["groups"] += len(groups)
+            self._stats["merged"] += sum(len(aliases) - 1 for aliases, _h, _s in groups)
+        # The first alias of a shared group runs the sweep; the others block on
+        # the pass's lock and reuse its result.
+        for aliases, hosts, _seen in groups:
+            if len(aliases) > 1:
+                LOG.info("shared IP recovery sweep for %s over %d hosts", aliases, len(hosts))
+            shared = _SharedPass(hosts) if len(aliases) > 1 else None
+            for alias in aliases:
+                self._start(alias, shared)
+
+
+def _run_recovery(alias: str, shared: Optional[_SharedPass]) -> None:
+    state = _state(alias)
+    try:
+        if shared is None:
+            result = recover_alias(alias)
+        else:
+            result = recover_alias(
+                alias, mac_finder=shared.mac_finder, identity_finder=shared.identity_finder
+            )
+        state.last_result = result.to_dict()
+    except Exception as exc:
+        LOG.exception("IP recovery worker failed for %s", alias)
+        state.last_result = {
+            "ok": False,
+            "alias": alias,
+            "reason": f"unhandled exception: {exc}",
+        }
+    finally:
+        with _state_lock:
+            state.active = False
+
+
+recovery_coordinator = RecoveryCoordinator()
+
+
 def recover_alias_async(alias: str, *, force: bool = False) -> bool:
     alias = str(alias or _default_alias())
     state = _state(alias)
     cooldown = float(_CFG.get("ip_recovery_cooldown_s", 30.0))
     with _state_lock:
         now = time.time()
-        if state.active:
-            return False
         if not force and state.last_attempt_ts and now - state.last_attempt_ts < cooldown:
             return False
-        state.active = True
-        state.last_attempt_ts = now
-
-    def worker() -> None:
-        try:
-            result = recover_alias(alias)
-            state.last_result = result.to_dict()
-        except Exception as exc:
-            LOG.exception("IP recovery worker failed for %s", alias)
-            state.last_result = {
-                "ok": False,
-                "alias": alias,
-                "reason": f"unhandled exception: {exc}",
-            }
-        finally:
-            with _state_lock:
-                state.active = False
-
-    threading.Thread(target=worker, name=f"IPRecovery-{alias}", daemon=True).start()
-    return True
+    return recovery_coordinator.submit(alias)
 
 
 def maybe_trigger_recovery(alias: Optional[str] = None) -> bool:
@@ -1072,9 +1483,15 @@ def get_recovery_status(alias: Optional[str] = None) -> Dict[str, Any]:
                 "last_result": dict(state.last_result),
                 "known_mac": state.known_mac,
                 "autopair": dict(state.autopair_last),
-                "rf_ready": _rf_ready(name),
-                "stored_identity": verify_stored_ip_identity(name),
+                "last_sweep": dict(state.last_sweep),
             }
+        output[name]["rf_ready"] = _rf_ready(name)
+        output[name]["stored_identity"] = verify_stored_ip_identity(name, cached=True)
     if alias:
         return output.get(str(alias), {})
-    return {"aliases": output}
+    return {
+        "aliases": output,
+        "identity_cache": identity_cache.status(),
+        "ocr_cache": ocr_cache.status(),
+        "coordinator": recovery_coordinator.status(),
+    }
@@ -0,0 +1,249 @@
+"""Passive detection of receivers that moved to a new IP address.
+
+Without this watcher a DHCP move is only noticed when an SGS key fails and
+``classify_sgs_failure`` starts recovery, so the first key after a move always
+pays for timeouts and RF fallback.  ``IPChangeWatcher`` instead listens to the
+neighbor table: whenever a MAC already persisted in ``base.txt`` (see
+``mac_learning``) shows up on an address other than the stored one, the alias
+is re-pointed through ``ip_recovery.recover_alias`` with that single address
+as the only candidate.  The normal identity probe, post-write SGS check and
+rollback therefore still decide whether the new address is kept.
+
+Events come from the rtnetlink subscription in ``neighbors``; where netlink is
+unavailable, or its watcher thread has exited, the table is polled every
+``JAMBOREE_IP_WATCH_POLL_S`` (default 5 s).  A receiver renewing its lease
+talks to the gateway and to us through the same neighbor table, so no
+raw-socket DHCP sniffing is needed.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from . import ip_recovery, neighbors
+from .stb_store import store
+
+LOG = logging.getLogger(__name__)
+DEFAULT_POLL_S = 5.0
+DEFAULT_COOLDOWN_S = 300.0
+_MAC_RE = re.compile(r"(?:[0-9a-f]{2}:){5}[0-9a-f]{2}")
+
+
+def _normalize_mac(value: object) -> Optional[str]:
+    mac = str(value or "").replace("-", ":").lower().strip()
+    return mac if _MAC_RE.fullmatch(mac) else None
+
+
+def _usable_ip(value: str) -> bool:
+    try:
+        address = ipaddress.IPv4Address(str(value))
+    except ValueError:
+        return False
+    return not (address.is_link_local or address.is_loopback or address.is_multicast)
+
+
+class IPChangeWatcher:
+    """Re-point aliases whose persisted MAC appears on a new address."""
+
+    def __init__(
+        self,
+        store_obj: Any = None,
+        table: Optional[neighbors.NeighborTable] = None,
+    ) -> None:
+        self._store = store_obj
+        self._table = table or neighbors.neighbor_table
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._attempts: Dict[Tuple[str, str], float] = {}
+        self._mode: Optional[str] = None
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_move: Dict[str, Any] = {}
+        self._stats = {
+            "events": 0,
+            "moves": 0,
+            "scheduled": 0,
+            "kept": 0,
+            "rejected": 0,
+            "busy": 0,
+            "cooldown": 0,
+        }
+
+    @property
+    def store(self) -> Any:
+        return self._store or store
+
+    @staticmethod
+    def _cooldown_s() -> float:
+        try:
+            return max(float(ip_recovery._CFG.get("ip_watch_cooldown_s", DEFAULT_COOLDOWN_S)), 0.0)
+        except (TypeError, ValueError):
+            return DEFAULT_COOLDOWN_S
+
+    def _mac_index(self) -> Dict[str, Tuple[str, str]]:
+        """Return ``{mac: (alias, stored_ip)}``; MACs shared by two aliases are dropped."""
+        index: Dict[str, Tuple[str, str]] = {}
+        shared: set[str] = set()
+        for alias, entry in (self.store.all() or {}).items():
+            if not isinstance(entry, Mapping):
+                continue
+            mac = _normalize_mac(entry.get("mac"))
+            if not mac:
+                continue
+            if mac in index:
+                shared.add(mac)
+            index[mac] = (str(alias), str(entry.get("ip") or "").strip())
+        for mac in shared:
+            index.pop(mac, None)
+        return index
+
+    def observe(self, neighbors_seen: Iterable[Tuple[str, str]]) -> List[str]:
+        """Check ``(ip, mac)`` pairs and start verification for moved aliases."""
+        pairs = list(neighbors_seen)
+        with self._lock:
+            self._stats["events"] += 1
+        if not pairs:
+            return []
+        index = self._mac_index()
+        if not index:
+            return []
+        scheduled: List[str] = []
+        for ip, raw_mac in pairs:
+            mac = _normalize_mac(raw_mac)
+            known = index.get(mac) if mac else None
+            if known is None:
+                continue
+            alias, stored_ip = known
+            if ip == stored_ip or not _usable_ip(ip):
+                continue
+            if self._schedule(alias, str(ip), mac):
+                scheduled.append(alias)
+        return scheduled
+
+    def _schedule(self, alias: str, ip: str, mac: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._stats["moves"] += 1
+            if alias in self._pending:
+                self._stats["busy"] += 1
+                return False
+            last = self._attempts.get((alias, ip))
+            if last is not None and now - last < self._cooldown_s():
+                self._stats["cooldown"] += 1
+                return False
+            self._attempts[(alias, ip)] = now
+            self._pending.add(alias)
+            self._stats["scheduled"] += 1
+        LOG.info("neighbor table shows alias=%s mac=%s on new ip=%s", alias, mac, ip)
+        threading.Thread(
+            target=self._verify_move,
+            args=(alias, ip, mac),
+            name=f"IPWatch-{alias}",
+            daemon=True,
+        ).start()
+        return True
+
+    def _verify_move(self, alias: str, ip: str, mac: str) -> None:
+        state = ip_recovery._state(alias)
+        try:
+            with ip_recovery._state_lock:
+                if state.active:
+                    with self._lock:
+                        self._stats["busy"] += 1
+                    return
+                state.active = True
+            try:
+                result = ip_recovery.recover_alias(
+                    alias,
+                    candidates=[ip],
+                    mac_finder=lambda name, candidates=None: self._confirm(name, ip, mac),
+                    identity_finder=lambda *_a, **_k: (None, None),
+                    navigator=lambda _alias: False,
+                )
+                outcome = result.to_dict()
+            except Exception as exc:
+                LOG.exception("passive IP change verification failed alias=%s ip=%s", alias, ip)
+                outcome = {"ok": False, "alias": alias, "reason": f"unhandled exception: {exc}"}
+            with ip_recovery._state_lock:
+                state.last_result = dict(outcome, source="neighbor_watch")
+                state.active = False
+            with self._lock:
+                self._stats["kept" if outcome.get("ok") else "rejected"] += 1
+                self._last_move = {
+                    "alias": alias,
+                    "ip": ip,
+                    "mac": mac,
+                    "ok": bool(outcome.get("ok")),
+                    "reason": outcome.get("reason"),
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }
+        finally:
+            with self._lock:
+                self._pending.discard(alias)
+
+    def _confirm(self, alias: str, ip: str, mac: str) -> Optional[str]:
+        # The event may be stale by the time the worker runs; re-read the table.
+        arp = self._table.entries(max_age_s=neighbors.MISS_REFRESH_S)
+        return ip_recovery._verified_mac_candidate(alias, mac, arp, {ip})
+
+    def _poll(self, interval_s: float) -> None:
+        while not self._stop.wait(interval_s):
+            if self._table.watching:
+                continue
+            if self._mode == "netlink":
+                LOG.warning("neighbor netlink watcher stopped; polling every %.1f s", interval_s)
+                self._mode = "poll"
+            try:
+                self.observe(self._table.entries().items())
+            except Exception:
+                LOG.exception("neighbor table poll failed")
+
+    def start(self) -> str:
+        """Start watching; return ``"netlink"`` or ``"poll"``."""
+        if self._mode:
+            return self._mode
+        self._stop.clear()
+        self._table.add_listener(self.observe)
+        self._mode = "netlink" if self._table.start_watcher() else "poll"
+        # The poller idles while the netlink thread is alive and takes over if
+        # it ever exits, so a dead subscription never ends IP-change detection.
+        if not (self._poller and self._poller.is_alive()):
+            try:
+                interval = float(os.getenv("JAMBOREE_IP_WATCH_POLL_S", DEFAULT_POLL_S))
+            except ValueError:
+                interval = DEFAULT_POLL_S
+            self._poller = threading.Thread(
+                target=self._poll,
+                args=(max(interval, 0.5),),
+                name="IPWatchPoller",
+                daemon=True,
+            )
+            self._poller.start()
+        # Catch receivers that moved while the service was down.
+        try:
+            self.observe(self._table.entries().items())
+        except Exception:
+            LOG.exception("initial neighbor table check failed")
+        return self._mode
+
+    def stop(self) -> None:
+        self._table.remove_listener(self.observe)
+        self._stop.set()
+        self._mode = None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "mode": self._mode,
+                "pending": sorted(self._pending),
+                "last_move": dict(self._last_move),
+            }
+
+
+ip_change_watcher = IPChangeWatcher()
@@ -13,7 +13,7 @@ import threading
 import time
 from typing import Any, Callable, Dict, Mapping, Optional
 
-from . import ip_recovery
+from . import ip_recovery, neighbors
 from .stb_store import store
 
 LOG = logging.getLogger(__name__)
@@ -64,15 +64,20 @@ def learn_verified_mac(
         }
 
     existing = _valid_mac(entry.get("mac"))
-    reader = arp_reader or ip_recovery._arp_entries
-    observed = _valid_mac((reader() or {}).get(verified_ip))
+
+    def lookup(ip: str) -> Optional[str]:
+        if arp_reader is None:
+            return neighbors.neighbor_table.lookup(ip)
+        return (arp_reader() or {}).get(ip)
+
+    observed = _valid_mac(lookup(verified_ip))
     if not observed:
         # A successful same-subnet SGS exchange normally populates ARP already.
         # Give the OS a few scheduler ticks to publish the cache entry, without
         # issuing identity probes or adding latency to the completed HTTP request.
         for _ in range(3):
             time.sleep(0.05)
-            observed = _valid_mac((reader() or {}).get(verified_ip))
+            observed = _valid_mac(lookup(verified_ip))
             if observed:
                 break
     if not observed:
@@ -124,6 +129,7 @@ def learn_verified_mac(
             "mac_learning_source": "verified_sgs_arp",
         },
         create=False,
+        defer=True,
     )
     state.known_mac = observed
     LOG.info("persisted verified SGS MAC alias=%s ip=%s mac=%s", alias, verified_ip, observed)
@@ -0,0 +1,265 @@
+"""Cached IPv4 neighbor (ARP) table.
+
+MAC learning and IP recovery look up ``ip -> mac`` after every successful SGS
+key and around every recovery sweep.  On Linux the table is read directly from
+``/proc/net/arp``; elsewhere ``ip neigh``/``arp`` is still spawned.  Either way
+the parsed table is cached for ``JAMBOREE_ARP_CACHE_S`` (default 1 s).
+
+``start_watcher()`` subscribes to rtnetlink neighbor events (RTMGRP_NEIGH) and
+drops the cache whenever the kernel adds, changes or removes an entry, so new
+entries are seen on the next lookup without waiting for the TTL.  If the
+kernel drops events (ENOBUFS) the cache is dropped as well, listeners are
+handed the full table, and the watcher keeps running.  Listeners
+registered with ``add_listener`` are handed the ``(ip, mac)`` pairs of every
+resolved IPv4 entry the kernel reports.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import platform
+import re
+import socket
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import netlink
+
+LOG = logging.getLogger(__name__)
+PROC_ARP = Path("/proc/net/arp")
+DEFAULT_TTL_S = 1.0
+# A lookup that misses rereads the table, but not more often than this.
+MISS_REFRESH_S = 0.02
+RTMGRP_NEIGH = 0x4
+RTM_NEWNEIGH = 28
+NDA_DST = 1
+NDA_LLADDR = 2
+# NUD_REACHABLE | NUD_STALE | NUD_DELAY | NUD_PROBE | NUD_PERMANENT
+_NUD_RESOLVED = 0x02 | 0x04 | 0x08 | 0x10 | 0x80
+ATF_COM = 0x2  # completed entry
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_NDMSG = struct.Struct("=BxxxiHBB")
+_RTATTR = struct.Struct("=HH")
+
+Neighbor = Tuple[str, str]
+NeighborListener = Callable[[Sequence[Neighbor]], None]
+
+_IP_RE = re.compile(r"(?<![\d.])((?:\d{1,3}\.){3}\d{1,3})(?![\d.])")
+_MAC_RE = re.compile(r"\b(?:[0-9a-f]{2}[:-]){5}[0-9a-f]{2}\b", re.I)
+_NULL_MAC = "00:00:00:00:00:00"
+
+
+def parse_proc_arp(text: str) -> Dict[str, str]:
+    """Parse ``/proc/net/arp``; incomplete and all-zero entries are skipped."""
+    entries: Dict[str, str] = {}
+    for line in text.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        ip, _hw_type, flags, mac = parts[:4]
+        try:
+            complete = int(flags, 16) & ATF_COM
+        except ValueError:
+            continue
+        mac = mac.lower()
+        if complete and mac != _NULL_MAC and _MAC_RE.fullmatch(mac):
+            entries[ip] = mac
+    return entries
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def parse_neigh_messages(data: bytes) -> List[Neighbor]:
+    """Return ``(ip, mac)`` for resolved IPv4 RTM_NEWNEIGH messages in ``data``."""
+    found: List[Neighbor] = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _flags, _seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        end = min(offset + length, len(data))
+        body = offset + _NLMSGHDR.size
+        if msg_type == RTM_NEWNEIGH and body + _NDMSG.size <= end:
+            family, _ifindex, state, _ndm_flags, _ndm_type = _NDMSG.unpack_from(data, body)
+            ip = mac = None
+            attr = body + _NDMSG.size
+            while attr + _RTATTR.size <= end:
+                attr_len, attr_type = _RTATTR.unpack_from(data, attr)
+                if attr_len < _RTATTR.size:
+                    break
+                value = data[attr + _RTATTR.size : attr + attr_len]
+                if attr_type == NDA_DST and len(value) == 4:
+                    ip = socket.inet_ntoa(value)
+                elif attr_type == NDA_LLADDR and len(value) == 6:
+                    mac = ":".join(f"{octet:02x}" for octet in value)
+                attr += _align(attr_len)
+            if (
+                family == socket.AF_INET
+                and state & _NUD_RESOLVED
+                and ip
+                and mac
+                and mac != _NULL_MAC
+            ):
+                found.append((ip, mac))
+        offset += _align(length)
+    return found
+
+
+def _command_entries() -> Dict[str, str]:
+    commands = (
+        ["ip", "neigh", "show"],
+        ["arp", "-a"] if platform.system() == "Windows" else ["arp", "-n"],
+    )
+    entries: Dict[str, str] = {}
+    for command in commands:
+        try:
+            output = subprocess.check_output(
+                command, text=True, stderr=subprocess.DEVNULL, timeout=5
+            )
+        except Exception:
+            continue
+        for line in output.splitlines():
+            ip_match = _IP_RE.search(line)
+            mac_match = _MAC_RE.search(line)
+            if ip_match and mac_match:
+                entries[ip_match.group(1)] = mac_match.group(0).replace("-", ":").lower()
+        if entries:
+            break
+    return entries
+
+
+class NeighborTable:
+    def __init__(self, proc_path: Path = PROC_ARP, ttl_s: Optional[float] = None) -> None:
+        self.proc_path = Path(proc_path)
+        if ttl_s is None:
+            try:
+                ttl_s = float(os.getenv("JAMBOREE_ARP_CACHE_S", DEFAULT_TTL_S))
+            except ValueError:
+                ttl_s = DEFAULT_TTL_S
+        self.ttl_s = max(float(ttl_s), 0.0)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, str] = {}
+        self._read_at: Optional[float] = None
+        self._stats = {"reads": 0, "hits": 0, "proc_reads": 0, "command_reads": 0, "invalidations": 0}
+        self._watcher: Dict[str, Any] = netlink.new_state()
+        self._listeners: List[NeighborListener] = []
+
+    def add_listener(self, callback: NeighborListener) -> None:
+        """Call ``callback([(ip, mac), ...])`` for entries reported by the watcher.
+
+        Callbacks run on the watcher thread and must return quickly.
+        """
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: NeighborListener) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    @property
+    def watching(self) -> bool:
+        thread = self._watcher["thread"]
+        return bool(thread and thread.is_alive())
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            text = self.proc_path.read_text(encoding="ascii", errors="replace")
+        except OSError:
+            self._stats["command_reads"] += 1
+            return _command_entries()
+        self._stats["proc_reads"] += 1
+        return parse_proc_arp(text)
+
+    def entries(self, max_age_s: Optional[float] = None) -> Dict[str, str]:
+        """Return ``{ip: mac}``, rereading when the cache is older than ``max_age_s``."""
+        limit = self.ttl_s if max_age_s is None else max(float(max_age_s), 0.0)
+        with self._lock:
+            now = time.monotonic()
+            if self._read_at is not None and now - self._read_at < limit:
+                self._stats["hits"] += 1
+                return dict(self._entries)
+            self._stats["reads"] += 1
+            self._entries = self._read()
+            self._read_at = time.monotonic()
+            return dict(self._entries)
+
+    def lookup(self, ip: str) -> Optional[str]:
+        """Return the MAC for ``ip``; a miss rereads a cache older than a few ms."""
+        mac = self.entries().get(str(ip))
+        if mac is None:
+            mac = self.entries(max_age_s=MISS_REFRESH_S).get(str(ip))
+        return mac
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._read_at = None
+            self._stats["invalidations"] += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            status: Dict[str, Any] = dict(self._stats)
+            status["entries"] = len(self._entries)
+            status["age_s"] = (
+                round(time.monotonic() - self._read_at, 3) if self._read_at is not None else None
+            )
+        status["watcher"] = {
+            "active": self.watching,
+            "events": self._watcher["events"],
+            "overflows": self._watcher["overflows"],
+            "error": self._watcher["error"],
+        }
+        return status
+
+    def _on_event(self, data: bytes) -> None:
+        self.invalidate()
+        self._dispatch(data)
+
+    def _resync(self) -> None:
+        # The kernel dropped events; listeners get the whole table instead.
+        self.invalidate()
+        with self._lock:
+            listeners = list(self._listeners)
+        if listeners:
+            self._notify(listeners, list(self.entries().items()))
+
+    def _dispatch(self, data: bytes) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        if not listeners:
+            return
+        try:
+            found = parse_neigh_messages(data)
+        except struct.error:
+            return
+        if found:
+            self._notify(listeners, found)
+
+    @staticmethod
+    def _notify(listeners: Sequence[NeighborListener], found: List[Neighbor]) -> None:
+        for callback in listeners:
+            try:
+                callback(found)
+            except Exception:
+                LOG.exception("neighbor listener failed")
+
+    def start_watcher(self) -> bool:
+        """Invalidate the cache on Linux neighbor-table changes (rtnetlink)."""
+        return netlink.start_watcher(
+            self._watcher,
+            RTMGRP_NEIGH,
+            label="neighbor",
+            thread_name="NeighborTableWatcher",
+            on_message=self._on_event,
+            on_overflow=self._resync,
+        )
+
+neighbor_table = NeighborTable()
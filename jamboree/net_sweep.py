@@ -0,0 +1,194 @@
+"""Non-blocking TCP liveness sweep used to populate the ARP/neighbor table.
+
+IP recovery needs every live host in a /24 to have exchanged at least one
+packet with us so its MAC shows up in the neighbor table.  Instead of a thread
+per host with blocking ``create_connection`` calls and a ``ping`` subprocess
+for each silent host, the sweep opens non-blocking connects from one thread and
+multiplexes them with ``selectors``:
+
+* at most ``concurrency`` sockets are in flight at once;
+* each host has ``host_timeout_s`` from its first connect to answer on any
+  probed port, and the sweep as a whole stops at ``deadline_s``;
+* an accepted connection *or* a refusal (RST) proves the host is alive, and the
+  remaining ports for that host are abandoned.
+
+Even a host that drops every SYN has answered ARP by the time the connect is
+attempted, so no ``ping`` fallback is needed for the neighbor table.
+"""
+from __future__ import annotations
+
+import errno
+import logging
+import selectors
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+LOG = logging.getLogger(__name__)
+DEFAULT_PORTS = (8080, 80, 443)
+DEFAULT_CONCURRENCY = 256
+DEFAULT_HOST_TIMEOUT_S = 0.4
+DEFAULT_DEADLINE_S = 15.0
+
+_IN_PROGRESS = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EAGAIN,
+    getattr(errno, "WSAEWOULDBLOCK", 10035),
+}
+_REFUSED = {errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", 10061)}
+
+
+@dataclass
+class SweepResult:
+    """Sweep outcome; ``accepted``/``refused``/``timed_out``/``unreachable`` count probes."""
+
+    hosts: int
+    alive: List[str] = field(default_factory=list)
+    refused: int = 0
+    accepted: int = 0
+    timed_out: int = 0
+    unreachable: int = 0
+    deadline_hit: bool = False
+    duration_s: float = 0.0
+
+    @property
+    def hosts_per_s(self) -> float:
+        return self.hosts / self.duration_s if self.duration_s > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hosts": self.hosts,
+            "alive": len(self.alive),
+            "accepted": self.accepted,
+            "refused": self.refused,
+            "timed_out": self.timed_out,
+            "unreachable": self.unreachable,
+            "deadline_hit": self.deadline_hit,
+            "duration_s": round(self.duration_s, 3),
+            "hosts_per_s": round(self.hosts_per_s, 1),
+        }
+
+
+def _start(ip: str, port: int) -> Tuple[Optional[socket.socket], Optional[int]]:
+    """Begin a non-blocking connect; return ``(socket, None)`` or ``(None, errno)``."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    except OSError as exc:
+        return None, exc.errno or errno.EMFILE
+    sock.setblocking(False)
+    try:
+        code = sock.connect_ex((ip, port))
+    except OSError as exc:
+        code = exc.errno or errno.EHOSTUNREACH
+    if code in _IN_PROGRESS:
+        return sock, None
+    sock.close()
+    return None, code
+
+
+def sweep(
+    hosts: Iterable[str],
+    ports: Sequence[int] = DEFAULT_PORTS,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    host_timeout_s: float = DEFAULT_HOST_TIMEOUT_S,
+    deadline_s: float = DEFAULT_DEADLINE_S,
+) -> SweepResult:
+    """Probe ``hosts`` on ``ports`` and return which of them answered."""
+    ordered = list(dict.fromkeys(str(ip) for ip in hosts))
+    result = SweepResult(hosts=len(ordered))
+    started = time.monotonic()
+    hard_stop = started + max(float(deadline_s), 0.0)
+    limit = max(1, int(concurrency))
+    per_host = max(float(host_timeout_s), 0.01)
+
+    queue: Deque[Tuple[str, int]] = deque((ip, int(port)) for ip in ordered for port in ports)
+    host_deadline: Dict[str, float] = {}
+    inflight: Dict[socket.socket, Tuple[str, float]] = {}
+    alive: Set[str] = set()
+    selector = selectors.DefaultSelector()
+
+    def finish(sock: socket.socket) -> str:
+        ip, _due = inflight.pop(sock)
+        try:
+            selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        sock.close()
+        return ip
+
+    def mark_alive(ip: str) -> None:
+        if ip in alive:
+            return
+        alive.add(ip)
+        for other in [s for s, (owner, _due) in inflight.items() if owner == ip]:
+            finish(other)
+
+    try:
+        while queue or inflight:
+            now = time.monotonic()
+            if now >= hard_stop:
+                result.deadline_hit = bool(queue or inflight)
+                break
+            while queue and len(inflight) < limit:
+                ip, port = queue.popleft()
+                if ip in alive:
+                    continue
+                due = host_deadline.setdefault(ip, now + per_host)
+                sock, code = _start(ip, port)
+                if sock is None:
+                    if code in _REFUSED:
+                        result.refused += 1
+                        mark_alive(ip)
+                    elif code == 0:
+                        result.accepted += 1
+                        mark_alive(ip)
+                    elif code == errno.EMFILE and inflight:
+                        # Out of descriptors: wait for in-flight probes to drain.
+                        queue.appendleft((ip, port))
+                        break
+                    else:
+                        result.unreachable += 1
+                    continue
+                inflight[sock] = (ip, due)
+                selector.register(sock, selectors.EVENT_WRITE)
+            if not inflight:
+                continue
+            nearest = min(due for _ip, due in inflight.values())
+            wait = max(0.0, min(nearest, hard_stop) - time.monotonic())
+            for key, _events in selector.select(wait):
+                sock = key.fileobj
+                if sock not in inflight:
+                    continue
+                code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                ip = finish(sock)
+                if code == 0:
+                    result.accepted += 1
+                    mark_alive(ip)
+                elif code in _REFUSED:
+                    result.refused += 1
+                    mark_alive(ip)
+                else:
+                    result.unreachable += 1
+            now = time.monotonic()
+            for sock in [s for s, (_ip, due) in inflight.items() if due <= now]:
+                finish(sock)
+                result.timed_out += 1
+    finally:
+        for sock in list(inflight):
+            finish(sock)
+        selector.close()
+
+    result.alive = [ip for ip in ordered if ip in alive]
+    result.duration_s = time.monotonic() - started
+    LOG.info(
+        "subnet sweep hosts=%d alive=%d duration=%.2fs rate=%.0f hosts/s",
+        result.hosts,
+        len(result.alive),
+        result.duration_s,
+        result.hosts_per_s,
+    )
+    return result
@@ -0,0 +1,101 @@
+"""rtnetlink multicast subscriptions shared by the cache watchers.
+
+The receiver identity (``sgs_lib``) and the neighbor table (``neighbors``)
+both drop a cache whenever the kernel reports a change, so the socket setup
+and receive loop live here.  When events arrive faster than the socket buffer
+drains, the kernel discards them and ``recv`` fails with ``ENOBUFS``; the
+messages are gone, so ``on_overflow`` is called to resync (invalidate and
+reread the full state) and the loop keeps receiving.  Only a closed socket
+ends the thread; other errors are logged and retried after a short pause.
+"""
+from __future__ import annotations
+
+import errno
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict
+
+LOG = logging.getLogger(__name__)
+RECV_BUFSIZE = 65535
+ERROR_RETRY_S = 1.0
+
+
+def new_state() -> Dict[str, Any]:
+    """Return the ``{"thread", "events", "overflows", "error"}`` watcher record."""
+    return {"thread": None, "events": 0, "overflows": 0, "error": None}
+
+
+def _call(callback: Callable[..., None], *args: Any) -> None:
+    try:
+        callback(*args)
+    except Exception:
+        LOG.exception("netlink callback %r failed", callback)
+
+
+def _receive(
+    sock: socket.socket,
+    state: Dict[str, Any],
+    label: str,
+    on_message: Callable[[bytes], None],
+    on_overflow: Callable[[], None],
+) -> None:
+    while True:
+        try:
+            data = sock.recv(RECV_BUFSIZE)
+        except OSError as e:
+            if e.errno == errno.ENOBUFS:
+                state["overflows"] += 1
+                LOG.info("%s netlink watcher dropped events; resyncing", label)
+                _call(on_overflow)
+                continue
+            state["error"] = str(e)
+            if e.errno == errno.EBADF or sock.fileno() < 0:
+                LOG.warning("%s netlink watcher stopped: %s", label, e)
+                return
+            LOG.warning("%s netlink watcher error, retrying: %s", label, e)
+            time.sleep(ERROR_RETRY_S)
+            continue
+        if data:
+            state["events"] += 1
+            _call(on_message, data)
+
+
+def start_watcher(
+    state: Dict[str, Any],
+    groups: int,
+    *,
+    label: str,
+    thread_name: str,
+    on_message: Callable[[bytes], None],
+    on_overflow: Callable[[], None],
+) -> bool:
+    """Subscribe to the rtnetlink ``groups`` bitmask on a daemon thread.
+
+    ``state`` is a ``new_state()`` record; return False (with ``state["error"]``
+    set) where netlink is unavailable.
+    """
+    thread = state["thread"]
+    if thread and thread.is_alive():
+        return True
+    family = getattr(socket, "AF_NETLINK", None)
+    if family is None:
+        state["error"] = "netlink unavailable on this platform"
+        return False
+    try:
+        sock = socket.socket(family, socket.SOCK_RAW, getattr(socket, "NETLINK_ROUTE", 0))
+        sock.bind((0, groups))
+    except OSError as e:
+        state["error"] = str(e)
+        LOG.debug("%s netlink watcher unavailable: %s", label, e)
+        return False
+    thread = threading.Thread(
+        target=_receive,
+        args=(sock, state, label, on_message, on_overflow),
+        name=thread_name,
+        daemon=True,
+    )
+    state.update(thread=thread, error=None)
+    thread.start()
+    return True
@@ -0,0 +1,160 @@
+"""Frame-fingerprint cache in front of OCR.
+
+``wait_for_pin`` polls every ``PIN_READ_INTERVAL_S`` and IP recovery re-reads
+the screen while navigating, so most OCR work is spent on frames that have not
+changed.  Results are cached per *slot* (namespace, region and OCR pass) and
+per frame fingerprint, and only a real screen change triggers new Tesseract
+work.
+
+A fingerprint is an area-averaged grayscale thumbnail with one cell per
+``CELL_PX`` x ``CELL_PX`` pixels, plus the 16x16 average hash derived from it.  Entries of a slot whose hash is within
+``MAX_HASH_DISTANCE`` bits are candidates; capture noise flips the few cells
+that sit right at the mean.  The hash alone is not enough, though: on a pairing
+dialog almost every cell is background, so every PIN hashes alike.  A cached
+result is reused only when, in addition, no thumbnail cell differs by more than
+``max_delta`` grey levels (``JAMBOREE_OCR_CACHE_DELTA``, default 12).  Capture
+noise moves cell means by a few levels; a changed digit moves the cells its
+strokes cross by far more, which is why the cell size is fixed in pixels rather
+than the thumbnail in cells (a 32x32 thumbnail of a whole 1080p frame cannot
+tell ``...913`` from ``...912``).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+CELL_PX = 8
+HASH_SIZE = 16
+MAX_HASH_DISTANCE = 12
+DEFAULT_MAX_DELTA = 12
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_S = 120.0
+_BUCKET_DEPTH = 8
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    shape: Tuple[int, ...]
+    ahash: int
+    thumb: Any
+
+
+def fingerprint(image: Any) -> Optional[Fingerprint]:
+    """Return the fingerprint of ``image`` or ``None`` if it cannot be computed."""
+    try:
+        import cv2
+        import numpy as np
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        if gray.size == 0:
+            return None
+        height, width = gray.shape[:2]
+        cells = (max(1, width // CELL_PX), max(1, height // CELL_PX))
+        thumb = cv2.resize(gray, cells, interpolation=cv2.INTER_AREA)
+        small = cv2.resize(thumb, (HASH_SIZE, HASH_SIZE), interpolation=cv2.INTER_AREA)
+        bits = np.packbits(small > small.mean())
+        return Fingerprint(
+            tuple(image.shape), int.from_bytes(bits.tobytes(), "big"), thumb.astype(np.int16)
+        )
+    except Exception:
+        return None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class OCRCache:
+    """LRU of OCR results keyed by slot and matched by frame fingerprint."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_s: Optional[float] = None,
+        max_delta: Optional[float] = None,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = _env_float("JAMBOREE_OCR_CACHE_TTL_S", DEFAULT_TTL_S) if ttl_s is None else ttl_s
+        self.max_delta = (
+            _env_float("JAMBOREE_OCR_CACHE_DELTA", DEFAULT_MAX_DELTA)
+            if max_delta is None
+            else max_delta
+        )
+        self._lock = threading.Lock()
+        # (slot, shape) -> [(ahash, thumb, value, stored_at), ...] newest last
+        self._buckets: "OrderedDict[tuple, List[Tuple[int, Any, Any, float]]]" = OrderedDict()
+        self._entries = 0
+        self._stats = {"hits": 0, "misses": 0, "near_misses": 0, "stores": 0, "evictions": 0}
+
+    def lookup(self, slot: Tuple[Hashable, ...], fp: Optional[Fingerprint]) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` for a cached result, else ``(False, None)``."""
+        if fp is None:
+            return False, None
+        key = (slot, fp.shape)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket:
+                fresh = [item for item in bucket if now - item[3] < self.ttl_s]
+                self._entries -= len(bucket) - len(fresh)
+                bucket[:] = fresh
+                similar = False
+                for ahash, thumb, value, _stored in reversed(bucket):
+                    if bin(ahash ^ fp.ahash).count("1") > MAX_HASH_DISTANCE:
+                        continue
+                    if int(abs(thumb - fp.thumb).max()) <= self.max_delta:
+                        self._buckets.move_to_end(key)
+                        self._stats["hits"] += 1
+                        return True, value
+                    similar = True
+                if similar:
+                    self._stats["near_misses"] += 1
+                if not bucket:
+                    del self._buckets[key]
+            self._stats["misses"] += 1
+            return False, None
+
+    def store(self, slot: Tuple[Hashable, ...], fp: Optional[Fingerprint], value: Any) -> None:
+        if fp is None:
+            return
+        key = (slot, fp.shape)
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [])
+            self._buckets.move_to_end(key)
+            bucket.append((fp.ahash, fp.thumb, value, time.monotonic()))
+            self._entries += 1
+            self._stats["stores"] += 1
+            if len(bucket) > _BUCKET_DEPTH:
+                del bucket[0]
+                self._entries -= 1
+                self._stats["evictions"] += 1
+            while self._entries > self.max_entries and self._buckets:
+                _key, evicted = self._buckets.popitem(last=False)
+                self._entries -= len(evicted)
+                self._stats["evictions"] += len(evicted)
+
+    def clear(self, namespace: Optional[Hashable] = None) -> None:
+        """Drop every entry, or only slots whose first element is ``namespace``."""
+        with self._lock:
+            for key in list(self._buckets):
+                if namespace is None or key[0][:1] == (namespace,):
+                    self._entries -= len(self._buckets.pop(key))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": self._entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+ocr_cache = OCRCache()
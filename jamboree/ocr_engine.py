@@ -0,0 +1,301 @@
+"""OCR backends shared by the PIN reader and RF/OCR IP recovery.
+
+pytesseract writes a temporary image and starts a new ``tesseract`` process for
+every call, so loading the model dominates a 90-pass exhaustive PIN read.  When
+``tesserocr`` (the libtesseract binding) is installed the engine keeps
+long-lived ``PyTessBaseAPI`` handles instead and feeds them frame bytes
+directly.  A handle is not thread-safe, so each call checks one out of a
+per-page-segmentation-mode pool and returns it afterwards; at most
+``JAMBOREE_OCR_IDLE_HANDLES`` (default 8) idle handles are kept per mode.  tesserocr releases the GIL while recognising, so the
+``ocr_pool`` threads still run in parallel.
+
+``JAMBOREE_OCR_BACKEND`` selects ``auto`` (default: tesserocr, falling back to
+pytesseract), ``tesserocr`` or ``pytesseract``.  Every failure degrades to an
+empty string, as the callers treat "no text" and "no OCR" the same way.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+LOG = logging.getLogger(__name__)
+DEFAULT_DPI = 300
+DEFAULT_IDLE_HANDLES = 8  # ocr_pool's default worker cap
+
+
+def _as_uint8(image: Any) -> Any:
+    import numpy as np
+
+    array = np.asarray(image)
+    if array.dtype != np.uint8:
+        array = array.astype(np.uint8)
+    return np.ascontiguousarray(array)
+
+
+class PytesseractBackend:
+    """One ``tesseract`` subprocess per call."""
+
+    name = "pytesseract"
+
+    def __init__(self) -> None:
+        import pytesseract
+
+        # Raises TesseractNotFoundError when the binary is missing, so "auto"
+        # reports the real reason instead of failing on every call.
+        self.version = str(pytesseract.get_tesseract_version())
+        self._pytesseract = pytesseract
+
+    def image_to_string(self, image: Any, psm: int, whitelist: Optional[str], dpi: int) -> str:
+        config = f"--oem 3 --psm {int(psm)} -c user_defined_dpi={int(dpi)}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return self._pytesseract.image_to_string(image, config=config) or ""
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrBackend:
+    """Resident libtesseract handles, checked out per call from a pool per PSM."""
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng", max_idle: Optional[int] = None) -> None:
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.lang = lang
+        if max_idle is None:
+            try:
+                max_idle = int(os.getenv("JAMBOREE_OCR_IDLE_HANDLES", DEFAULT_IDLE_HANDLES))
+            except ValueError:
+                max_idle = DEFAULT_IDLE_HANDLES
+        self.max_idle = max(1, int(max_idle))
+        self._lock = threading.Lock()
+        self._idle: Dict[int, List[Any]] = {}
+        self._live = 0
+        self._closed = False
+        # Fail at selection time, not on the first PIN read, if the language
+        # data cannot be loaded.
+        self._release(6, self._checkout(6))
+
+    def _checkout(self, psm: int) -> Any:
+        with self._lock:
+            idle = self._idle.get(psm)
+            if idle:
+                return idle.pop()
+            self._live += 1
+        try:
+            return self._tesserocr.PyTessBaseAPI(lang=self.lang, psm=int(psm), oem=3)
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+
+    def _release(self, psm: int, api: Any) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(psm, [])
+            keep = not self._closed and len(idle) < self.max_idle
+            if keep:
+                idle.append(api)
+            else:
+                self._live -= 1
+        if not keep:
+            _end(api)
+
+    @property
+    def handles(self) -> int:
+        with self._lock:
+            return self._live
+
+    def image_to_string(self, image: Any, psm: int, whitelist: Optional[str], dpi: int) -> str:
+        array = _as_uint8(image)
+        if array.ndim == 3:
+            import cv2
+
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
+        height, width = array.shape[:2]
+        depth = 1 if array.ndim == 2 else array.shape[2]
+        api = self._checkout(int(psm))
+        try:
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            api.SetImageBytes(array.tobytes(), width, height, depth, width * depth)
+            api.SetSourceResolution(int(dpi))
+            return api.GetUTF8Text() or ""
+        finally:
+            try:
+                api.Clear()
+            finally:
+                self._release(int(psm), api)
+
+    def close(self) -> None:
+        """End idle handles now; handles still checked out end on return."""
+        with self._lock:
+            self._closed = True
+            handles = [api for idle in self._idle.values() for api in idle]
+            self._idle = {}
+            self._live -= len(handles)
+        for api in handles:
+            _end(api)
+
+
+def _end(api: Any) -> None:
+    try:
+        api.End()
+    except Exception:
+        pass
+
+
+_BACKENDS = {"tesserocr": TesserocrBackend, "pytesseract": PytesseractBackend}
+
+
+def create_backend(name: str) -> Any:
+    """Instantiate backend ``name``; raises if it is unavailable."""
+    try:
+        factory = _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown OCR backend {name!r}") from None
+    return factory()
+
+
+class OCREngine:
+    """Lazily selected OCR backend with call counters."""
+
+    def __init__(self, preference: Optional[str] = None) -> None:
+        self.preference = preference
+        self._lock = threading.Lock()
+        self._backend: Any = None
+        self._selected = False
+        self._error: Optional[str] = None
+        self._stats = {"calls": 0, "errors": 0, "seconds": 0.0}
+
+    def _select(self) -> Any:
+        selected = str(
+            self.preference or os.getenv("JAMBOREE_OCR_BACKEND", "auto")
+        ).strip().lower()
+        order = ("tesserocr", "pytesseract") if selected == "auto" else (selected,)
+        errors = []
+        for name in order:
+            try:
+                backend = create_backend(name)
+            except Exception as exc:
+                errors.append(f"{name}: {exc}")
+                continue
+            LOG.info("OCR backend: %s", backend.name)
+            return backend
+        self._error = "; ".join(errors) or "no OCR backend"
+        LOG.warning("no OCR backend available (%s)", self._error)
+        return None
+
+    @property
+    def backend(self) -> Any:
+        with self._lock:
+            if not self._selected:
+                self._backend = self._select()
+                self._selected = True
+            return self._backend
+
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def image_to_string(
+        self,
+        image: Any,
+        *,
+        psm: int = 6,
+        whitelist: Optional[str] = None,
+        dpi: int = DEFAULT_DPI,
+    ) -> str:
+        backend = self.backend
+        if backend is None or image is None:
+            return ""
+        started = time.perf_counter()
+        try:
+            return backend.image_to_string(image, int(psm), whitelist, int(dpi))
+        except Exception as exc:
+            LOG.debug("OCR error (%s): %s", backend.name, exc)
+            with self._lock:
+                self._stats["errors"] += 1
+            return ""
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["seconds"] += elapsed
+
+    def reset(self) -> None:
+        """Close the current backend and select again on the next call."""
+        with self._lock:
+            backend, self._backend, self._selected = self._backend, None, False
+            self._error = None
+        if backend is not None:
+            backend.close()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            backend = self._backend
+            calls = self._stats["calls"]
+            seconds = self._stats["seconds"]
+            return {
+                "backend": backend.name if backend is not None else None,
+                "selected": self._selected,
+                "error": self._error,
+                "calls": calls,
+                "errors": self._stats["errors"],
+                "avg_ms": round(1000.0 * seconds / calls, 1) if calls else 0.0,
+                "handles": getattr(backend, "handles", None),
+            }
+
+
+ocr_engine = OCREngine()
+
+
+def image_to_string(
+    image: Any, *, psm: int = 6, whitelist: Optional[str] = None, dpi: int = DEFAULT_DPI
+) -> str:
+    return ocr_engine.image_to_string(image, psm=psm, whitelist=whitelist, dpi=dpi)
+
+
+def compare_backends(
+    images: Sequence[Any],
+    *,
+    psms: Iterable[int] = (6,),
+    backends: Iterable[str] = ("tesserocr", "pytesseract"),
+    repeat: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    """Benchmark the available backends over ``images``.
+
+    Returns ``{backend: {"calls", "wall_s", "calls_per_s", "texts"}}``;
+    unavailable backends report ``{"error": ...}``.  The first call of each
+    backend (model load) is included, since that is the cost being compared.
+    """
+    psm_list = list(psms)
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in backends:
+        try:
+            backend = create_backend(name)
+        except Exception as exc:
+            results[name] = {"error": str(exc)}
+            continue
+        texts: List[str] = []
+        calls = 0
+        started = time.perf_counter()
+        try:
+            for _ in range(max(1, int(repeat))):
+                for image in images:
+                    for psm in psm_list:
+                        texts.append(backend.image_to_string(image, psm, None, DEFAULT_DPI))
+                        calls += 1
+        finally:
+            wall = time.perf_counter() - started
+            backend.close()
+        results[name] = {
+            "calls": calls,
+            "wall_s": round(wall, 3),
+            "calls_per_s": round(calls / wall, 1) if wall > 0 else 0.0,
+            "texts": texts[: len(images) * len(psm_list)],
+        }
+    return results
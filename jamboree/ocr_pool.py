@@ -0,0 +1,97 @@
+"""Shared worker pool for OCR passes.
+
+The PIN reader's region x scale x variant x PSM matrix used to run strictly
+serially, one blocking ``tesseract`` subprocess at a time.  Each pass is
+independent, so the passes are fanned out over a pool sized to the host's
+cores (``JAMBOREE_OCR_WORKERS``, default ``os.cpu_count()`` capped at 8).
+Threads are enough: a worker spends its time waiting on the tesseract child
+process with the GIL released.  Tesseract's own OpenMP threading is limited to
+one thread per process (``OMP_THREAD_LIMIT``, unless already set) so N
+concurrent passes do not oversubscribe N cores.
+
+``status()`` reports calls/s and wall time per effort tier so the pool can be
+sized to the machine.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+LOG = logging.getLogger(__name__)
+MAX_DEFAULT_WORKERS = 8
+
+
+def _default_workers() -> int:
+    try:
+        configured = int(os.getenv("JAMBOREE_OCR_WORKERS", "0"))
+    except ValueError:
+        configured = 0
+    if configured > 0:
+        return configured
+    return max(1, min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS))
+
+
+class OCRPool:
+    """Lazily started thread pool with per-tier throughput counters."""
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.workers = max(1, int(workers)) if workers else _default_workers()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 1:
+                    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="OCRPool"
+                )
+            executor = self._executor
+        return executor.submit(fn, *args, **kwargs)
+
+    def record(
+        self,
+        tier: str,
+        *,
+        calls: int,
+        wall_s: float,
+        cancelled: int = 0,
+        early_stop: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._tiers.setdefault(
+                str(tier),
+                {"runs": 0, "calls": 0, "wall_s": 0.0, "cancelled": 0, "early_stops": 0},
+            )
+            stats["runs"] += 1
+            stats["calls"] += int(calls)
+            stats["wall_s"] += max(float(wall_s), 0.0)
+            stats["cancelled"] += int(cancelled)
+            stats["early_stops"] += int(bool(early_stop))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = {}
+            for tier, stats in self._tiers.items():
+                wall = stats["wall_s"]
+                tiers[tier] = {
+                    **stats,
+                    "wall_s": round(wall, 3),
+                    "avg_wall_s": round(wall / stats["runs"], 3) if stats["runs"] else 0.0,
+                    "calls_per_s": round(stats["calls"] / wall, 1) if wall > 0 else 0.0,
+                }
+            return {"workers": self.workers, "started": self._executor is not None, "tiers": tiers}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+ocr_pool = OCRPool()
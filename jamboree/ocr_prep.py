@@ -0,0 +1,221 @@
+"""Per-frame OCR preprocessing shared by every region, scale and variant.
+
+The PIN reader used to rebuild everything from the BGR crop for each region and
+each scale: a grayscale conversion for the text gate, another per scale, an
+upscale, and all seven threshold variants whether or not the effort plan used
+them.  ``FramePrep`` does the grayscale conversion once per frame and hands out
+regions as views of it.  Upscaled regions and their variants are memoized by
+*effective* scale: ``MAX_OCR_WIDTH`` clamps every scale of a 1080p PIN region
+to the same factor, so the exhaustive tier's three scales share one upscale and
+one set of variants.
+
+Only the requested variants are built.  They are written in place into one
+preallocated plane stack per (region, effective scale) by OpenCV's SIMD
+threshold kernels (``dst=``), instead of one fresh array per variant plus a
+``bitwise_not`` copy for every inverted polarity.  (A NumPy broadcast of the
+global thresholds over a plane stack was measured ~10x slower than this.)  The
+images are pixel-identical to the per-crop pipeline.
+
+``propose_text_boxes`` is the text-localization stage in front of the fixed
+region list: a morphological gradient of a 640 px wide copy of the frame,
+Otsu-thresholded and closed horizontally so the glyphs of one line merge into
+one component.  Lines of plausible text height that hold at least a PIN's worth
+of glyphs are returned as tight boxes, tallest first (the PIN is normally the
+largest text on a pairing screen), wherever on screen they are.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Box = Tuple[float, float, float, float]
+FULL_FRAME: Box = (0.0, 0.0, 1.0, 1.0)
+# Every variant the reader knows, in the order the per-crop pipeline built them.
+VARIANT_NAMES: Tuple[str, ...] = (
+    "gray",
+    "otsu",
+    "otsu_inv",
+    "bright_inv",
+    "blur_otsu_inv",
+    "adaptive_inv",
+    "closed_inv",
+)
+_NEEDS_OTSU = {"otsu", "otsu_inv", "closed_inv"}
+TEXT_WORK_WIDTH = 640
+# Below this Otsu level of the gradient image the frame has no real edges,
+# only capture noise (a flat panel thresholds at a few grey levels).
+_MIN_EDGE_LEVEL = 20.0
+
+
+def _count_glyphs(line: Any) -> int:
+    """Number of glyph-shaped components in one downscaled text line."""
+    import cv2
+
+    _thr, mask = cv2.threshold(line, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if cv2.countNonZero(mask) * 2 > mask.size:
+        mask = cv2.bitwise_not(mask)          # the glyphs are the minority class
+    n, _labels, stats, _centroids = cv2.connectedComponentsWithStats(mask, 8)
+    shapes = [(int(stats[i, cv2.CC_STAT_WIDTH]), int(stats[i, cv2.CC_STAT_HEIGHT]))
+              for i in range(1, n) if stats[i, cv2.CC_STAT_HEIGHT] >= 2]
+    if not shapes:
+        return 0
+    tallest = max(h for _w, h in shapes)
+    return sum(1 for w, h in shapes if h >= 0.6 * tallest and 0.15 * h <= w <= 1.2 * h)
+
+
+def propose_text_boxes(
+    gray: Any,
+    *,
+    max_boxes: Optional[int] = None,
+    min_glyphs: int = 4,
+    work_width: int = TEXT_WORK_WIDTH,
+) -> List[Box]:
+    """Return fractional boxes around the text lines of ``gray``, tallest first."""
+    import cv2
+
+    height, width = gray.shape[:2]
+    if height < 16 or width < 16:
+        return []
+    if width > work_width:
+        size = (work_width, max(1, int(round(height * work_width / float(width)))))
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    else:
+        small = gray
+    sh, sw = small.shape[:2]
+    grad = cv2.morphologyEx(
+        small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    )
+    level, edges = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if level < _MIN_EDGE_LEVEL:
+        return []
+    lines = cv2.morphologyEx(
+        edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    )
+    n, _labels, stats, _centroids = cv2.connectedComponentsWithStats(lines, 8)
+    found = []
+    for i in range(1, n):
+        x, y, w, h, area = (int(v) for v in stats[i])
+        if not (0.012 * sh <= h <= 0.15 * sh):
+            continue
+        # A line of text is wide, mostly filled once closed, and not a full-width bar.
+        if w < 2 * h or w > 0.9 * sw or area < 0.35 * w * h:
+            continue
+        if _count_glyphs(small[y:y + h, x:x + w]) < min_glyphs:
+            continue
+        pad_x, pad_y = h, max(1, int(round(0.4 * h)))
+        box = (
+            round(max(0, x - pad_x) / float(sw), 4),
+            round(max(0, y - pad_y) / float(sh), 4),
+            round(min(sw, x + w + pad_x) / float(sw), 4),
+            round(min(sh, y + h + pad_y) / float(sh), 4),
+        )
+        found.append((h, box))
+    found.sort(key=lambda item: -item[0])
+    boxes = [box for _h, box in found]
+    return boxes if max_boxes is None else boxes[:max_boxes]
+
+
+class FramePrep:
+    """Grayscale frame plus memoized upscaled regions and variant planes."""
+
+    def __init__(self, frame: Any, *, max_width: Optional[int] = None) -> None:
+        import cv2
+
+        self.frame = frame
+        self.max_width = max_width
+        self.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        self._scaled: Dict[Tuple[Box, float], Any] = {}
+        self._planes: Dict[Tuple[Box, float], Dict[str, Any]] = {}
+        self._text_boxes: Optional[List[Box]] = None
+        self.stats = {"resizes": 0, "planes": 0, "stacks": 0, "reused": 0}
+
+    @staticmethod
+    def _bounds(shape: Sequence[int], box: Box) -> Tuple[slice, slice]:
+        h, w = shape[:2]
+        x0, y0, x1, y1 = box
+        return slice(int(y0 * h), int(y1 * h)), slice(int(x0 * w), int(x1 * w))
+
+    def crop(self, box: Box) -> Any:
+        """BGR view of ``box`` (same bounds as ``sgs_autopair._crop``)."""
+        rows, cols = self._bounds(self.frame.shape, box)
+        return self.frame[rows, cols]
+
+    def gray_region(self, box: Box) -> Any:
+        """Grayscale view of ``box``; no copy is made."""
+        rows, cols = self._bounds(self.gray.shape, box)
+        return self.gray[rows, cols]
+
+    def text_boxes(self, max_boxes: Optional[int] = None) -> List[Box]:
+        """Memoized :func:`propose_text_boxes` of the whole frame."""
+        if self._text_boxes is None:
+            self._text_boxes = propose_text_boxes(self.gray)
+        boxes = list(self._text_boxes)
+        return boxes if max_boxes is None else boxes[:max_boxes]
+
+    def effective_scale(self, box: Box, scale: float) -> float:
+        width = self.gray_region(box).shape[1]
+        if width > 0 and self.max_width:
+            # Clamp the effective scale so the OCR image never exceeds max_width.
+            scale = min(float(scale), self.max_width / float(width))
+            scale = max(scale, 1.0)
+        return float(scale)
+
+    def scaled(self, box: Box, scale: float) -> Any:
+        import cv2
+
+        key = (box, self.effective_scale(box, scale))
+        up = self._scaled.get(key)
+        if up is None:
+            up = cv2.resize(
+                self.gray_region(box), None, fx=key[1], fy=key[1], interpolation=cv2.INTER_CUBIC
+            )
+            self._scaled[key] = up
+            self.stats["resizes"] += 1
+        return up
+
+    def variants(self, box: Box, scale: float, names: Iterable[str] = VARIANT_NAMES) -> Dict[str, Any]:
+        """Return ``{name: image}`` for the requested variants of ``box`` at ``scale``."""
+        import cv2
+        import numpy as np
+
+        key = (box, self.effective_scale(box, scale))
+        up = self.scaled(box, scale)
+        planes = self._planes.setdefault(key, {"gray": up})
+        wanted = [name for name in VARIANT_NAMES if name in set(names)]
+        missing = [name for name in wanted if name not in planes]
+        if missing:
+            # Otsu's binary image is an input to otsu_inv and closed_inv even
+            # when it is not itself requested.
+            build = list(missing)
+            if _NEEDS_OTSU.intersection(missing) and "otsu" not in planes and "otsu" not in build:
+                build.insert(0, "otsu")
+            stack = np.empty((len(build),) + up.shape, dtype=np.uint8)
+            self.stats["stacks"] += 1
+            slots = {name: stack[index] for index, name in enumerate(build) if name != "gray"}
+            for name in VARIANT_NAMES:
+                if name not in slots:
+                    continue
+                out = slots[name]
+                if name == "otsu":
+                    cv2.threshold(up, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=out)
+                elif name == "otsu_inv":
+                    cv2.bitwise_not(planes["otsu"], dst=out)
+                elif name == "bright_inv":
+                    # Fixed high threshold: isolates bright dialog text from a dark panel.
+                    cv2.threshold(up, 165, 255, cv2.THRESH_BINARY_INV, dst=out)
+                elif name == "blur_otsu_inv":
+                    cv2.GaussianBlur(up, (3, 3), 0, dst=out)
+                    cv2.threshold(out, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=out)
+                elif name == "adaptive_inv":
+                    cv2.adaptiveThreshold(
+                        up, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 5,
+                        dst=out,
+                    )
+                elif name == "closed_inv":
+                    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+                    cv2.morphologyEx(planes["otsu"], cv2.MORPH_CLOSE, kernel, dst=out)
+                    cv2.bitwise_not(out, dst=out)
+                planes[name] = out
+                self.stats["planes"] += 1
+        else:
+            self.stats["reused"] += 1
+        return {name: planes[name] for name in wanted}
@@ -0,0 +1,202 @@
+"""Server-side keypress sequences and named macros.
+
+A sequence is a list of ``{"button", "hold_ms", "gap_ms"}`` steps run against
+one STB on a background thread.  Step start times are anchored to a single
+monotonic origin (step N is due at the sum of the preceding holds and gaps), so
+client/network jitter and per-step transport latency do not accumulate across
+a navigation flow.  Each step goes through the normal transport pipeline, so it
+uses SGS or DART according to the STB's protocol and fallback rules; a step may
+also carry ``"force": "sgs" | "rf"``.
+
+Named macros live in ``base.txt`` under the top-level ``macros`` key.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+LOG = logging.getLogger(__name__)
+MAX_STEPS = 200
+MAX_HOLD_MS = 10_000
+MAX_GAP_MS = 60_000
+DEFAULT_HOLD_MS = 120
+MAX_RUNS = 128
+
+# press(alias, button, hold_ms, force) -> transport result mapping
+PressFn = Callable[[str, str, int, Optional[str]], Mapping[str, Any]]
+
+
+def _ts() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def normalize_steps(raw: Any) -> List[Dict[str, Any]]:
+    """Validate and fill defaults for a step list; raise ``ValueError``."""
+    if not isinstance(raw, Sequence) or isinstance(raw, (str, bytes)) or not raw:
+        raise ValueError("steps must be a non-empty list")
+    if len(raw) > MAX_STEPS:
+        raise ValueError(f"at most {MAX_STEPS} steps are allowed")
+    steps = []
+    for index, item in enumerate(raw):
+        if not isinstance(item, Mapping):
+            raise ValueError(f"step {index} must be an object")
+        button = str(item.get("button") or "").strip()
+        if not button:
+            raise ValueError(f"step {index}: button is required")
+        try:
+            hold = int(item.get("hold_ms", item.get("delay", DEFAULT_HOLD_MS)))
+            gap = int(item.get("gap_ms", 0))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"step {index}: hold_ms/gap_ms must be integers") from exc
+        if not 0 <= hold <= MAX_HOLD_MS or not 0 <= gap <= MAX_GAP_MS:
+            raise ValueError(f"step {index}: hold_ms or gap_ms out of range")
+        force = str(item.get("force") or "").strip().lower() or None
+        if force not in {None, "sgs", "rf", "dart"}:
+            raise ValueError(f"step {index}: force must be sgs or rf")
+        steps.append({"button": button, "hold_ms": hold, "gap_ms": gap, "force": force})
+    return steps
+
+
+@dataclass
+class SequenceRun:
+    alias: str
+    steps: List[Dict[str, Any]]
+    macro: Optional[str] = None
+    stop_on_error: bool = True
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = "pending"
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    started_ts: Optional[str] = None
+    finished_ts: Optional[str] = None
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in {"completed", "failed"}
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout)
+
+    def stream(self, *, timeout_s: float = 600.0) -> Iterator[Dict[str, Any]]:
+        """Yield progress events as they happen, ending with the final event."""
+        index = 0
+        deadline = time.monotonic() + timeout_s
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self.events) > index or self.done,
+                    max(deadline - time.monotonic(), 0.0),
+                )
+                pending = self.events[index:]
+                finished = self.done
+            index += len(pending)
+            yield from pending
+            if (finished and index >= len(self.events)) or time.monotonic() >= deadline:
+                return
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "alias": self.alias,
+            "macro": self.macro,
+            "state": self.state,
+            "ok": None if not self.done else self.state == "completed",
+            "steps": len(self.steps),
+            "results": list(self.results),
+            "started_ts": self.started_ts,
+            "finished_ts": self.finished_ts,
+        }
+
+
+class SequenceRunner:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, SequenceRun]" = OrderedDict()
+
+    def get(self, run_id: str) -> Optional[SequenceRun]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def start(
+        self,
+        press: PressFn,
+        alias: str,
+        steps: Sequence[Mapping[str, Any]],
+        *,
+        macro: Optional[str] = None,
+        stop_on_error: bool = True,
+    ) -> SequenceRun:
+        run = SequenceRun(alias, normalize_steps(steps), macro=macro, stop_on_error=stop_on_error)
+        with self._lock:
+            self._runs[run.id] = run
+            while len(self._runs) > MAX_RUNS:
+                self._runs.popitem(last=False)
+        threading.Thread(
+            target=self._execute, args=(press, run), name=f"Sequence-{alias}", daemon=True
+        ).start()
+        return run
+
+    @staticmethod
+    def _execute(press: PressFn, run: SequenceRun) -> None:
+        run.state = "running"
+        run.started_ts = _ts()
+        run._emit({"event": "start", "id": run.id, "alias": run.alias, "steps": len(run.steps)})
+        origin = time.monotonic()
+        planned_ms = 0.0
+        failed = False
+        for index, step in enumerate(run.steps):
+            due = origin + planned_ms / 1000.0
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            begin = time.monotonic()
+            record: Dict[str, Any] = {
+                "event": "step",
+                "index": index,
+                "button": step["button"],
+                "hold_ms": step["hold_ms"],
+                "planned_offset_ms": round(planned_ms, 1),
+                "start_offset_ms": round((begin - origin) * 1000.0, 1),
+            }
+            try:
+                result = press(run.alias, step["button"], step["hold_ms"], step["force"])
+                record.update(ok=True, via=result.get("via"))
+            except Exception as exc:
+                record.update(ok=False, error=str(exc))
+                failed = True
+            record["latency_ms"] = round((time.monotonic() - begin) * 1000.0, 1)
+            record["lag_ms"] = round(record["start_offset_ms"] - record["planned_offset_ms"], 1)
+            run.results.append(record)
+            run._emit(record)
+            if failed and run.stop_on_error:
+                break
+            planned_ms += step["hold_ms"] + step["gap_ms"]
+        run.finished_ts = _ts()
+        final = {
+            "event": "end",
+            "id": run.id,
+            "ok": not failed,
+            "completed_steps": sum(1 for r in run.results if r.get("ok")),
+            "elapsed_ms": round((time.monotonic() - origin) * 1000.0, 1),
+        }
+        with run._cond:
+            run.state = "failed" if failed else "completed"
+            run.events.append(final)
+            run._cond.notify_all()
+        LOG.info("sequence %s on %s %s", run.id, run.alias, run.state)
+
+
+sequence_runner = SequenceRunner()
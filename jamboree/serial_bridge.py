@@ -1,14 +1,30 @@
-"""DART/RF command formatting with honest delivery receipts."""
+"""DART/RF command formatting with honest delivery receipts.
+
+By default a command succeeds once it is flushed to the serial port.  With
+``wait_ack`` (or ``JAMBOREE_DART_ACK=1``) the call instead completes when the
+DART firmware reports ``TX+ACK confirmed`` for every key it had to trigger,
+and raises with the firmware's reason otherwise.
+"""
 from __future__ import annotations
 
 import logging
+import os
 import time
-from typing import Union
+from typing import List, Optional, Sequence, Tuple, Union
 
-from .commands import get_button_codes, get_button_number
+from .commands import button_commands, get_button_codes, get_button_number
 from .serial_hub import serial_mgr
 
 LOG = logging.getLogger(__name__)
+DART_ACK_BUDGET_S = 4.0  # firmware: 10 retries x 300 ms ack timeout per key
+DART_RX_BUFFER_BYTES = 64  # Serial RX ring on the ATmega328 sketch
+DART_LINE_GAP_S = 0.6  # one DOWN+UP pair at the firmware's 300 ms ack timeout
+DART_UP_KEY = 0x03
+
+
+def wait_ack_default() -> bool:
+    """``JAMBOREE_DART_ACK``: complete DART commands on the firmware ack."""
+    return str(os.getenv("JAMBOREE_DART_ACK", "0")).lower() in {"1", "true", "yes", "on"}
 
 
 def _remote(value: Union[str, int]) -> str:
@@ -21,6 +37,55 @@ def _remote(value: Union[str, int]) -> str:
     return str(number)
 
 
+def _key_bytes(*codes: str) -> tuple:
+    """Hex key codes the firmware will trigger; ``()`` for reset pseudo-keys."""
+    try:
+        return tuple(int(code, 16) for code in codes)
+    except (TypeError, ValueError):
+        return ()
+
+
+def rf_line(remote_num: Union[str, int], button_id: str, delay_ms: Union[str, int]) -> str:
+    """Format-A ``remote down up duration`` line (duration floored at 80 ms)."""
+    codes = get_button_codes(button_id)
+    if not codes:
+        raise ValueError(f"unknown button_id {button_id!r}")
+    delay = max(int(delay_ms), 80)
+    return f"{_remote(remote_num)} {codes['KEY_CMD']} {codes['KEY_RELEASE']} {delay}\n"
+
+
+def quick_line(remote_num: Union[str, int], button_id: str, action: str) -> str:
+    """Format-B ``remote button action`` line."""
+    action = str(action).lower().strip()
+    if action not in {"down", "up", "reset", "allup"}:
+        raise ValueError(f"invalid DART action {action!r}")
+    number = get_button_number(button_id)
+    if not number:
+        raise ValueError(f"unknown button_id {button_id!r}")
+    return f"{_remote(remote_num)} {number} {action}\n"
+
+
+def line_keys(line: str) -> Tuple[str, tuple, int]:
+    """Return ``(remote, keys, hold_ms)`` the firmware acknowledges for ``line``.
+
+    Format A triggers DOWN then the unattended UP after the hold; Format B
+    triggers the one key of its action, mirroring the sketch: button 86 /
+    ``allup`` releases and 99 / ``reset`` resets without a key.
+    """
+    parts = line.split()
+    if len(parts) == 4:
+        return _remote(parts[0]), _key_bytes(parts[1], parts[2]), max(int(parts[3]), 80)
+    if len(parts) != 3:
+        raise ValueError(f"invalid DART line {line.strip()!r}")
+    remote, number, action = _remote(parts[0]), parts[1], parts[2].lower()
+    if action == "allup" or number == "86":
+        return remote, (DART_UP_KEY,), 0
+    if action == "reset" or number == "99":
+        return remote, (), 0
+    codes = button_commands.get(number) or {}
+    return remote, _key_bytes(codes.get("KEY_CMD" if action == "down" else "KEY_RELEASE")), 0
+
+
 def rf_available(alias_or_com: str, *, require_ready: bool = True) -> bool:
     return serial_mgr.has_port(str(alias_or_com), require_ready=require_ready)
 
@@ -29,7 +94,39 @@ def rf_status(alias_or_com: str) -> dict:
     return serial_mgr.status(str(alias_or_com))
 
 
-def _write(alias_or_com: str, line: str, *, strict: bool = True) -> str:
+def _write_acked(
+    alias_or_com: str,
+    line: str,
+    remote: str,
+    keys: Sequence[int],
+    *,
+    hold_ms: int = 0,
+    strict: bool = True,
+) -> str:
+    receipt = serial_mgr.write_with_ack(
+        str(alias_or_com),
+        line.encode("ascii"),
+        remote=int(remote),
+        keys=keys,
+        ack_timeout_s=hold_ms / 1000.0 + DART_ACK_BUDGET_S * max(len(keys), 1),
+        require_ready=strict,
+    )
+    if receipt is None:
+        readiness = "open/ready and writable" if strict else "configured"
+        raise RuntimeError(f"DART port for {alias_or_com!r} is not {readiness}")
+    if not receipt.ok:
+        raise RuntimeError(f"DART command {line.strip()!r} not acknowledged: {receipt.error}")
+    LOG.debug(
+        "DART -> [%s] %s acked in %.1f ms",
+        alias_or_com,
+        line.rstrip(),
+        (receipt.latency_s or 0.0) * 1000.0,
+    )
+    return line.rstrip()
+
+
+def write_line(alias_or_com: str, line: str, *, strict: bool = True) -> str:
+    """Write one DART line and wait for the serial flush receipt."""
     ok = serial_mgr.write(
         str(alias_or_com),
         line.encode("ascii"),
@@ -44,19 +141,45 @@ def _write(alias_or_com: str, line: str, *, strict: bool = True) -> str:
     return line.rstrip()
 
 
+def send_line(
+    alias_or_com: str,
+    line: str,
+    *,
+    wait_ack: Optional[bool] = None,
+    strict: bool = True,
+) -> str:
+    """Write one DART line, completing on the firmware ack in ``wait_ack`` mode.
+
+    Unlike :func:`send_rf` there is no hold padding in flush mode; callers that
+    own the hold timing (the press scheduler) wait for it themselves.
+    """
+    if wait_ack_default() if wait_ack is None else wait_ack:
+        remote, keys, hold_ms = line_keys(line)
+        return _write_acked(alias_or_com, line, remote, keys, hold_ms=hold_ms, strict=strict)
+    return write_line(alias_or_com, line, strict=strict)
+
+
 def send_rf(
     alias_or_com: str,
     remote_num: Union[str, int],
     button_id: str,
     delay_ms: Union[str, int],
+    *,
+    wait_ack: Optional[bool] = None,
 ) -> str:
-    """Send legacy Format-A ``down/up/duration`` and wait for serial flush."""
+    """Send legacy Format-A ``down/up/duration`` and wait for serial flush.
+
+    With ``wait_ack`` the call returns once the firmware confirms both the DOWN
+    and the unattended UP, replacing the fixed hold padding.
+    """
     delay = max(int(delay_ms), 80)
-    codes = get_button_codes(button_id)
-    if not codes:
-        raise ValueError(f"unknown button_id {button_id!r}")
-    line = f"{_remote(remote_num)} {codes['KEY_CMD']} {codes['KEY_RELEASE']} {delay}\n"
-    result = _write(alias_or_com, line)
+    line = rf_line(remote_num, button_id, delay)
+    remote = _remote(remote_num)
+    if wait_ack_default() if wait_ack is None else wait_ack:
+        codes = get_button_codes(button_id)
+        keys = _key_bytes(codes["KEY_CMD"], codes["KEY_RELEASE"])
+        return _write_acked(alias_or_com, line, remote, keys, hold_ms=delay)
+    result = write_line(alias_or_com, line)
     time.sleep((delay + 50) / 1000.0)
     return result
 
@@ -66,8 +189,10 @@ def send_rf_strict(
     remote_num: Union[str, int],
     button_id: str,
     delay_ms: Union[str, int],
+    *,
+    wait_ack: Optional[bool] = None,
 ) -> str:
-    return send_rf(alias_or_com, remote_num, button_id, delay_ms)
+    return send_rf(alias_or_com, remote_num, button_id, delay_ms, wait_ack=wait_ack)
 
 
 def send_quick_dart(
@@ -75,11 +200,80 @@ def send_quick_dart(
     remote_num: Union[str, int],
     button_id: str,
     action: str,
+    *,
+    wait_ack: Optional[bool] = None,
 ) -> str:
-    action = str(action).lower().strip()
-    if action not in {"down", "up", "reset", "allup"}:
-        raise ValueError(f"invalid DART action {action!r}")
-    number = get_button_number(button_id)
-    if not number:
-        raise ValueError(f"unknown button_id {button_id!r}")
-    return _write(alias_or_com, f"{_remote(remote_num)} {number} {action}\n")
+    return send_line(alias_or_com, quick_line(remote_num, button_id, action), wait_ack=wait_ack)
+
+
+def send_rf_many(
+    alias_or_com: str,
+    presses: Sequence[Tuple[Union[str, int], str, Union[str, int]]],
+    *,
+    wait_ack: Optional[bool] = None,
+) -> List[str]:
+    """Send several Format-A presses on one port, one line at a time.
+
+    ``presses`` are ``(remote, button_id, delay_ms)``; a remote listed twice is
+    sent once.  The sketch has a 64-byte RX buffer and blocks while it retries
+    a key, so each line is only written once the firmware has echoed the
+    previous one.  If an echo never arrives (older sketches, debug output
+    off) the remaining lines are paced by time instead: they are written
+    back to back while they fit in the RX buffer, with a ``DART_LINE_GAP_S``
+    pause whenever the next line would overflow it.  In flush mode the hold
+    padding is waited once for the longest press; with ``wait_ack`` the call
+    completes when every line is acknowledged and raises otherwise.
+    """
+    planned = []
+    seen = set()
+    for remote_num, button_id, delay_ms in presses:
+        remote = _remote(remote_num)
+        if remote in seen:
+            continue
+        seen.add(remote)
+        line = rf_line(remote, button_id, delay_ms)
+        _, keys, hold_ms = line_keys(line)
+        planned.append((line, remote, keys, hold_ms))
+    if not planned:
+        return []
+    acked = wait_ack_default() if wait_ack is None else wait_ack
+    alias = str(alias_or_com)
+    receipts = []
+    deadline = 0.0
+    echoing = True
+    buffered = 0
+    try:
+        for line, remote, keys, hold_ms in planned:
+            if receipts and echoing:
+                if not receipts[-1][1].accepted.wait(DART_ACK_BUDGET_S * len(receipts[-1][2])):
+                    LOG.warning(
+                        "DART [%s] did not echo %r; pacing the remaining lines by time",
+                        alias,
+                        receipts[-1][0],
+                    )
+                    echoing = False
+            elif receipts and buffered + len(line) > DART_RX_BUFFER_BYTES:
+                time.sleep(DART_LINE_GAP_S)
+                buffered = 0
+            receipt = serial_mgr.write_tracked(alias, line.encode("ascii"), remote=int(remote), keys=keys)
+            if receipt is None or receipt.written is None:
+                raise RuntimeError(f"DART port for {alias_or_com!r} is not open/ready and writable")
+            LOG.debug("DART -> [%s] %s", alias_or_com, line.rstrip())
+            receipts.append((line.rstrip(), receipt, keys))
+            if not echoing:
+                buffered += len(line)
+            deadline = max(deadline, receipt.written + (hold_ms + 50) / 1000.0)
+        if not acked:
+            time.sleep(max(deadline - time.perf_counter(), 0.0))
+            return [line for line, _, _ in receipts]
+        failed = []
+        for (line, receipt, keys), (_, _, _, hold_ms) in zip(receipts, planned):
+            serial_mgr.await_ack(alias, receipt, hold_ms / 1000.0 + DART_ACK_BUDGET_S * len(keys))
+            if not receipt.ok:
+                failed.append(f"{line!r}: {receipt.error}")
+        if failed:
+            raise RuntimeError("DART commands not acknowledged: " + "; ".join(failed))
+        return [line for line, _, _ in receipts]
+    finally:
+        for _, receipt, _ in receipts:
+            serial_mgr.discard_ack(alias, receipt)
@@ -4,6 +4,20 @@ A command is reported successful only after the worker has written and flushed i
 to an open serial device.  This is stronger than merely placing bytes in a queue;
 it still does not claim a receiver-side RF acknowledgement unless the board emits
 one and a future protocol adapter explicitly validates it.
+
+Writes are handled by a dedicated writer thread per port that blocks on the
+write queue, so a queued keypress is dispatched as soon as it arrives instead
+of waiting for the reader's ``readline`` timeout.  A per-port lock is held for
+every write and for the whole of a DTR reset or close, and the writer re-checks
+readiness under it, so a request dequeued just before a reset is held until the
+board is back instead of being written into the bootloader.  Queue-wait and
+write/flush times are recorded per command and reported by
+``SerialManager.status``.
+
+The DART sketch echoes every command (``[SER] ...``) and reports each I2C key
+trigger as ``[TRIG] pin=.. key=0x..`` followed by ``[TRIG] TX+ACK confirmed`` or
+``[WAIT] timeout``.  ``DartAckTracker`` follows that stream so a caller can opt
+into a receipt that completes on the radio acknowledgement itself.
 """
 from __future__ import annotations
 
@@ -15,7 +29,7 @@ import re
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Mapping, Optional
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import serial
 from serial import SerialException
@@ -27,8 +41,19 @@ STALL_RESET_S = 30.0
 REOPEN_BACKOFFS = (1, 2, 5, 10, 20, 30, 60)
 READ_TIMEOUT_S = 0.25
 WRITE_TIMEOUT_S = 1.0
+WRITER_POLL_S = 0.5
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
 _COM_RE = re.compile(r"^(COM\d+|/dev/tty[^ ]+|ttyS\d+|ttyUSB\d+)$", re.I)
 
+# remotePins[] in the DART sketch; A0..A3 print as 14..17 on ATmega328 boards.
+DART_PIN_REMOTES = {
+    12: 1, 11: 2, 10: 3, 9: 4, 8: 5, 7: 6, 6: 7, 5: 8,
+    4: 9, 3: 10, 2: 11, 13: 12, 14: 13, 15: 14, 16: 15, 17: 16,
+}
+_TRIG_RE = re.compile(r"^\[TRIG\] pin=(\d+) key=0x([0-9A-Fa-f]{2})")
+_I2C_TX_RE = re.compile(r"^\[I2C TX @(\d+)us \+\d+us\] ((?:[0-9A-F]{2} ?)+)")
+_FSM_RE = re.compile(r"^\[FSM\] R(\d+) (.*)$")
+
 
 def _supports_exclusive_kwarg() -> bool:
     try:
@@ -40,12 +65,233 @@ def _supports_exclusive_kwarg() -> bool:
 _EXCLUSIVE_OK = _supports_exclusive_kwarg()
 
 
+class LatencyStats:
+    """Thread-safe count/avg/max plus a non-cumulative bucket histogram."""
+
+    def __init__(self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self._lock = threading.Lock()
+        self._bounds = tuple(float(b) for b in buckets_ms)
+        self._buckets = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._last_ms: Optional[float] = None
+
+    def record(self, seconds: float) -> None:
+        ms = max(0.0, float(seconds) * 1000.0)
+        with self._lock:
+            self.count += 1
+            self._total_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+            self._last_ms = ms
+            for idx, bound in enumerate(self._bounds):
+                if ms <= bound:
+                    self._buckets[idx] += 1
+                    break
+            else:
+                self._buckets[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={bound:g}ms" for bound in self._bounds] + ["inf"]
+            return {
+                "count": self.count,
+                "avg_ms": round(self._total_ms / self.count, 3) if self.count else None,
+                "max_ms": round(self._max_ms, 3),
+                "last_ms": None if self._last_ms is None else round(self._last_ms, 3),
+                "buckets": dict(zip(labels, self._buckets)),
+            }
+
+
 @dataclass
 class _WriteRequest:
     data: bytes
     done: threading.Event = field(default_factory=threading.Event)
     ok: bool = False
     error: Optional[str] = None
+    enqueued: float = field(default_factory=time.perf_counter)
+    queue_wait_s: Optional[float] = None
+    write_s: Optional[float] = None
+
+
+@dataclass
+class AckReceipt:
+    """Firmware-level completion of one DART command."""
+
+    line: str
+    remote: int
+    keys: Tuple[int, ...]
+    done: threading.Event = field(default_factory=threading.Event)
+    # Set once the firmware has read the line off its RX buffer (echo/trigger).
+    accepted: threading.Event = field(default_factory=threading.Event)
+    ok: bool = False
+    error: Optional[str] = None
+    stage: int = 0
+    echoed: bool = False
+    triggered: bool = False
+    retries: int = 0
+    submitted: float = field(default_factory=time.perf_counter)
+    written: Optional[float] = None
+    ack_latency_s: List[float] = field(default_factory=list)
+    i2c_tx_us: List[int] = field(default_factory=list)
+
+    @property
+    def latency_s(self) -> Optional[float]:
+        return self.ack_latency_s[-1] if self.ok and self.ack_latency_s else None
+
+
+class DartAckTracker:
+    """Correlate DART debug output with submitted commands, per remote.
+
+    Keys are expected in order (Format A: DOWN then the unattended UP).  An
+    empty key tuple completes on the firmware's ``[RST]`` line.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: List[AckReceipt] = []
+        self._current: Optional[AckReceipt] = None
+        self._triggered: Optional[AckReceipt] = None
+        self._by_key: Dict[int, AckReceipt] = {}
+        self.first_ack = LatencyStats()
+        self.complete = LatencyStats()
+        self._counts = {"confirmed": 0, "failed": 0, "timeouts": 0, "retries": 0}
+
+    def expect(self, line: str, remote: int, keys: Sequence[int]) -> AckReceipt:
+        receipt = AckReceipt(line.strip(), int(remote), tuple(int(k) & 0xFF for k in keys))
+        with self._lock:
+            self._pending.append(receipt)
+        return receipt
+
+    def mark_written(self, receipt: AckReceipt) -> None:
+        receipt.written = time.perf_counter()
+
+    def cancel(self, receipt: AckReceipt, error: str, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if receipt.done.is_set():
+                return
+            if timed_out:
+                self._counts["timeouts"] += 1
+            self._finish_locked(receipt, False, error)
+
+    def discard(self, receipt: AckReceipt) -> None:
+        """Stop tracking ``receipt`` without counting it as failed or timed out."""
+        with self._lock:
+            if not receipt.done.is_set():
+                self._finish_locked(receipt, False, "not awaited")
+
+    def wait(self, receipt: AckReceipt, timeout_s: float) -> AckReceipt:
+        if not receipt.done.wait(max(float(timeout_s), 0.05)):
+            self.cancel(receipt, "no firmware acknowledgement before timeout", timed_out=True)
+        return receipt
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            counts["pending"] = len(self._pending)
+        counts["first_ack"] = self.first_ack.snapshot()
+        counts["complete"] = self.complete.snapshot()
+        return counts
+
+    def feed(self, raw) -> None:
+        line = raw.decode("ascii", "replace") if isinstance(raw, bytes) else str(raw)
+        line = line.strip()
+        if not line.startswith("["):
+            return
+        with self._lock:
+            if not self._pending and not self._by_key:
+                return
+            self._feed_locked(line)
+
+    def _feed_locked(self, line: str) -> None:
+        if line.startswith("[SER] "):
+            echoed = line[6:].strip()
+            self._current = next(
+                (r for r in self._pending if not r.echoed and r.line == echoed), None
+            )
+            if self._current:
+                self._current.echoed = True
+                self._current.accepted.set()
+            return
+        match = _TRIG_RE.match(line)
+        if match:
+            remote = DART_PIN_REMOTES.get(int(match.group(1)))
+            key = int(match.group(2), 16)
+            self._triggered = next(
+                (
+                    r
+                    for r in self._pending
+                    if r.echoed and r.remote == remote and r.stage < len(r.keys) and r.keys[r.stage] == key
+                ),
+                None,
+            )
+            if self._triggered:
+                self._triggered.triggered = True
+                self._by_key[key] = self._triggered
+            return
+        if line.startswith("[TRIG] TX+ACK confirmed"):
+            receipt, self._triggered = self._triggered, None
+            if receipt and not receipt.done.is_set():
+                self._advance_locked(receipt)
+            return
+        if line.startswith("[WAIT] timeout") or line.startswith("[Q] full"):
+            self._counts["retries"] += 1
+            if self._triggered:
+                self._triggered.retries += 1
+            return
+        match = _I2C_TX_RE.match(line)
+        if match:
+            # The sketch flushes its I2C log after the command returns, so
+            # attribute the timestamp by the key byte rather than by position.
+            payload = match.group(2).split()
+            receipt = self._by_key.pop(int(payload[3], 16), None) if len(payload) > 3 else None
+            if receipt:
+                receipt.i2c_tx_us.append(int(match.group(1)))
+            return
+        match = _FSM_RE.match(line)
+        if match:
+            remote, detail = int(match.group(1)), match.group(2)
+            if "UP failed" in detail:
+                receipt = next((r for r in self._pending if r.remote == remote and r.echoed), None)
+                if receipt:
+                    self._finish_locked(receipt, False, f"firmware: {detail}")
+            elif "deferring DOWN" in detail or "blocked" in detail:
+                if self._current and self._current.remote == remote:
+                    self._finish_locked(self._current, False, f"firmware: {detail}")
+            return
+        if line.startswith("[RST]"):
+            if self._current and not self._current.keys:
+                self._finish_locked(self._current, True, None)
+            return
+        if line.startswith("[ERR]") or line.startswith("[REL] failed"):
+            if self._current and not self._current.done.is_set():
+                self._finish_locked(self._current, False, f"firmware: {line}")
+
+    def _advance_locked(self, receipt: AckReceipt) -> None:
+        now = time.perf_counter()
+        elapsed = now - (receipt.written or receipt.submitted)
+        receipt.ack_latency_s.append(elapsed)
+        if receipt.stage == 0:
+            self.first_ack.record(elapsed)
+        receipt.stage += 1
+        if receipt.stage >= len(receipt.keys):
+            self.complete.record(elapsed)
+            self._finish_locked(receipt, True, None)
+
+    def _finish_locked(self, receipt: AckReceipt, ok: bool, error: Optional[str]) -> None:
+        receipt.ok, receipt.error = ok, error
+        if not ok and error and not error.startswith(("no firmware", "not awaited")):
+            self._counts["failed"] += 1
+        elif ok:
+            self._counts["confirmed"] += 1
+        with contextlib.suppress(ValueError):
+            self._pending.remove(receipt)
+        if self._current is receipt:
+            self._current = None
+        if self._triggered is receipt:
+            self._triggered = None
+        receipt.accepted.set()
+        receipt.done.set()
 
 
 class SerialPortWorker(threading.Thread):
@@ -66,7 +312,13 @@ class SerialPortWorker(threading.Thread):
         self._write_q: "queue.Queue[_WriteRequest]" = queue.Queue(maxsize=256)
         self._stop_event = threading.Event()  # do not shadow Thread._stop()
         self._ready = threading.Event()
+        # Serialises writes against resets/closes of ``_ser``.
+        self._port_lock = threading.RLock()
         self._last_activity = time.monotonic()
+        self._writer: Optional[threading.Thread] = None
+        self.queue_wait = LatencyStats()
+        self.write_time = LatencyStats()
+        self.acks = DartAckTracker()
         self.last_error: Optional[str] = None
 
     @property
@@ -76,7 +328,7 @@ class SerialPortWorker(threading.Thread):
     def stop(self) -> None:
         self._stop_event.set()
         self._ready.clear()
-        with contextlib.suppress(Exception):
+        with self._port_lock, contextlib.suppress(Exception):
             if self._ser and self._ser.is_open:
                 self._ser.close()
         self._fail_pending("serial worker stopped")
@@ -108,6 +360,47 @@ class SerialPortWorker(threading.Thread):
             LOG.warning("[%-6s] serial write failed: %s", self.com, request.error)
         return request.ok
 
+    def submit_with_ack(
+        self,
+        data: bytes,
+        *,
+        remote: int,
+        keys: Sequence[int],
+        ack_timeout_s: float,
+        require_ready: bool = True,
+    ) -> AckReceipt:
+        """Write ``data`` and wait for the firmware to confirm every key in ``keys``."""
+        receipt = self.submit_tracked(data, remote=remote, keys=keys, require_ready=require_ready)
+        if receipt.written is None:
+            return receipt
+        return self.acks.wait(receipt, ack_timeout_s)
+
+    def submit_tracked(
+        self,
+        data: bytes,
+        *,
+        remote: int,
+        keys: Sequence[int],
+        require_ready: bool = True,
+    ) -> AckReceipt:
+        """Write ``data`` and return its receipt without waiting for the firmware.
+
+        ``receipt.written`` stays ``None`` if the serial write itself failed.
+        """
+        receipt = self.acks.expect(bytes(data).decode("ascii", "replace"), remote, keys)
+        if not self.submit(data, require_ready=require_ready):
+            self.acks.cancel(receipt, "serial write failed")
+            return receipt
+        self.acks.mark_written(receipt)
+        return receipt
+
+    def timing(self) -> dict:
+        return {
+            "queue_wait": self.queue_wait.snapshot(),
+            "write_flush": self.write_time.snapshot(),
+            "queued": self._write_q.qsize(),
+        }
+
     def _resolve_port(self) -> str:
         if self._vid is None or self._pid is None:
             return self.com
@@ -149,10 +442,11 @@ class SerialPortWorker(threading.Thread):
 
     def _close_serial(self) -> None:
         self._ready.clear()
-        if self._ser:
-            with contextlib.suppress(Exception):
-                self._ser.close()
-        self._ser = None
+        with self._port_lock:
+            if self._ser:
+                with contextlib.suppress(Exception):
+                    self._ser.close()
+            self._ser = None
 
     def _fail_pending(self, error: str) -> None:
         while True:
@@ -166,82 +460,126 @@ class SerialPortWorker(threading.Thread):
             self._write_q.task_done()
 
     def _soft_reset(self) -> None:
-        if not self._ser:
-            return
+        self._ready.clear()
+        with self._port_lock:
+            if not self._ser:
+                return
+            try:
+                self._ser.dtr = False
+                time.sleep(0.2)
+                self._ser.dtr = True
+                time.sleep(2.0)
+                with contextlib.suppress(Exception):
+                    self._ser.reset_input_buffer()
+                    self._ser.reset_output_buffer()
+                self._last_activity = time.monotonic()
+                self._ready.set()
+            except Exception as exc:
+                self.last_error = str(exc)
+                LOG.error("[%-6s] DTR reset failed: %s", self.com, exc)
+                self._close_serial()
+
+    def _write_one(self, request: _WriteRequest) -> bool:
+        """Write one request; the caller holds ``_port_lock``."""
+        started = time.perf_counter()
+        request.queue_wait_s = started - request.enqueued
+        self.queue_wait.record(request.queue_wait_s)
         try:
-            self._ready.clear()
-            self._ser.dtr = False
-            time.sleep(0.2)
-            self._ser.dtr = True
-            time.sleep(2.0)
-            with contextlib.suppress(Exception):
-                self._ser.reset_input_buffer()
-                self._ser.reset_output_buffer()
+            if not self._ser or not self._ser.is_open:
+                raise SerialException("serial port closed before write")
+            self._ser.write(request.data)
+            self._ser.flush()
             self._last_activity = time.monotonic()
-            self._ready.set()
+            request.ok = True
         except Exception as exc:
+            request.error = str(exc)
+            request.ok = False
             self.last_error = str(exc)
-            LOG.error("[%-6s] DTR reset failed: %s", self.com, exc)
+            LOG.warning("[%-6s] write failed: %s", self.com, exc)
             self._close_serial()
+        finally:
+            request.write_s = time.perf_counter() - started
+            if request.ok:
+                self.write_time.record(request.write_s)
+            request.done.set()
+            self._write_q.task_done()
+        if not request.ok:
+            self._fail_pending("serial connection failed before queued write")
+        return request.ok
 
-    def _drain_writes(self) -> bool:
-        """Write queued requests; return False if the port failed."""
-        while True:
-            try:
-                request = self._write_q.get_nowait()
-            except queue.Empty:
-                return True
-            try:
-                if not self._ser or not self._ser.is_open:
-                    raise SerialException("serial port closed before write")
-                self._ser.write(request.data)
-                self._ser.flush()
-                self._last_activity = time.monotonic()
-                request.ok = True
-            except Exception as exc:
-                request.error = str(exc)
-                request.ok = False
-                self.last_error = str(exc)
-                LOG.warning("[%-6s] write failed: %s", self.com, exc)
-                self._close_serial()
-            finally:
+    def _write_loop(self) -> None:
+        """Block on the write queue and dispatch each request immediately."""
+        request: Optional[_WriteRequest] = None
+        try:
+            while not self._stop_event.is_set():
+                if not self._ready.wait(WRITER_POLL_S):
+                    continue
+                if request is None:
+                    try:
+                        request = self._write_q.get(timeout=WRITER_POLL_S)
+                    except queue.Empty:
+                        continue
+                with self._port_lock:
+                    # A reset or close may have begun while this thread was
+                    # blocked on the queue; keep the request until it is over.
+                    if not self._ready.is_set():
+                        continue
+                    self._write_one(request)
+                request = None
+        finally:
+            if request is not None:
+                request.error = "serial worker stopped"
                 request.done.set()
                 self._write_q.task_done()
-            if not request.ok:
-                self._fail_pending("serial connection failed before queued write")
-                return False
+
+    def _start_writer(self) -> None:
+        if self._writer and self._writer.is_alive():
+            return
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"sp-{self.com}-tx", daemon=True
+        )
+        self._writer.start()
 
     def run(self) -> None:
         backoff_idx = 0
+        self._start_writer()
         try:
             while not self._stop_event.is_set():
-                if not self._ser or not self._ser.is_open:
+                # The writer closes the port (``_ser = None``) on a failed write
+                # without taking part in this loop, so work on a local handle.
+                ser = self._ser
+                if ser is None or not ser.is_open:
                     if not self._open_serial():
                         delay = REOPEN_BACKOFFS[min(backoff_idx, len(REOPEN_BACKOFFS) - 1)]
                         backoff_idx += 1
                         self._stop_event.wait(delay)
                         continue
                     backoff_idx = 0
-
-                if not self._drain_writes():
-                    continue
+                    ser = self._ser
 
                 try:
-                    line = self._ser.readline()
-                    if line:
-                        self._last_activity = time.monotonic()
-                        if self._on_rx:
-                            self._on_rx(line, self.com)
-                except SerialException as exc:
+                    line = ser.readline()
+                except (SerialException, OSError, AttributeError, TypeError) as exc:
+                    # pyserial raises TypeError/AttributeError when the handle
+                    # is closed underneath a blocking read.
                     self.last_error = str(exc)
                     LOG.warning("[%-6s] read failed: %s", self.com, exc)
-                    self._close_serial()
+                    if self._ser is ser:
+                        self._close_serial()
                     continue
+                if line:
+                    self._last_activity = time.monotonic()
+                    self.acks.feed(line)
+                    if self._on_rx:
+                        self._on_rx(line, self.com)
 
                 if time.monotonic() - self._last_activity > STALL_RESET_S:
                     self._soft_reset()
         finally:
+            self._stop_event.set()
             self._close_serial()
+            if self._writer and self._writer is not threading.current_thread():
+                self._writer.join(timeout=WRITER_POLL_S * 2)
             self._fail_pending("serial worker exited")
 
 
@@ -340,6 +678,58 @@ class SerialManager:
             completion_timeout_s=completion_timeout_s,
         )
 
+    def write_with_ack(
+        self,
+        alias_or_com: str,
+        data: bytes,
+        *,
+        remote: int,
+        keys: Sequence[int],
+        ack_timeout_s: float,
+        require_ready: bool = True,
+    ) -> Optional[AckReceipt]:
+        worker = self._resolve_worker(alias_or_com)
+        if not worker:
+            LOG.warning("no serial worker for %r", alias_or_com)
+            return None
+        return worker.submit_with_ack(
+            data,
+            remote=remote,
+            keys=keys,
+            ack_timeout_s=ack_timeout_s,
+            require_ready=require_ready,
+        )
+
+    def write_tracked(
+        self,
+        alias_or_com: str,
+        data: bytes,
+        *,
+        remote: int,
+        keys: Sequence[int],
+        require_ready: bool = True,
+    ) -> Optional[AckReceipt]:
+        """Write ``data`` and return its firmware receipt without waiting on it."""
+        worker = self._resolve_worker(alias_or_com)
+        if not worker:
+            LOG.warning("no serial worker for %r", alias_or_com)
+            return None
+        return worker.submit_tracked(data, remote=remote, keys=keys, require_ready=require_ready)
+
+    def await_ack(self, alias_or_com: str, receipt: AckReceipt, timeout_s: float) -> AckReceipt:
+        """Wait for a receipt returned by :meth:`write_tracked`."""
+        worker = self._resolve_worker(alias_or_com)
+        if worker is None:
+            receipt.done.wait(max(float(timeout_s), 0.0))
+            return receipt
+        return worker.acks.wait(receipt, timeout_s)
+
+    def discard_ack(self, alias_or_com: str, receipt: AckReceipt) -> None:
+        """Stop tracking a receipt nobody will wait for."""
+        worker = self._resolve_worker(alias_or_com)
+        if worker is not None:
+            worker.acks.discard(receipt)
+
     def status(self, alias_or_com: str) -> dict:
         worker = self._resolve_worker(alias_or_com)
         return {
@@ -350,6 +740,8 @@ class SerialManager:
             if alias_or_com in self._alias_to_port
             else alias_or_com,
             "last_error": worker.last_error if worker else None,
+            "timing": worker.timing() if worker else None,
+            "acks": worker.acks.stats() if worker else None,
         }
 
     def stop_all(self, join_timeout: float = 3.0) -> None:
@@ -13,10 +13,16 @@ import os
 import re
 import threading
 import time
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from .core.credentials import CredentialManager
-from .sgs_lib import get_local_iface_mac, sgs_get_receiver_id
+from .ocr_cache import fingerprint, ocr_cache
+from .ocr_engine import ocr_engine
+from .ocr_pool import ocr_pool
+from .ocr_prep import FULL_FRAME, FramePrep
+from .sgs_lib import cached_local_mac, sgs_get_receiver_id
+from .stb_store import credential_source
 
 log = logging.getLogger(__name__)
 SGS_PORTS: Tuple[int, ...] = (8080, 80)
@@ -92,6 +98,11 @@ def get_status() -> Dict[str, Any]:
             "detail": dict(_state.get("detail") or {}),
             "last_result": dict(_state.get("last_result") or {}),
             "history": list(_state.get("history") or [])[-15:],
+            "ocr": {
+                **ocr_pool.status(),
+                "engine": ocr_engine.status(),
+                "cache": ocr_cache.status(),
+            },
         }
 
 
@@ -118,12 +129,12 @@ def _receiver_id() -> str:
 
 
 def _local_mac() -> str:
-    return get_local_iface_mac()
+    return cached_local_mac()
 
 
 def credentials_status(alias: str) -> Dict[str, Any]:
     pair_alias, entry = _resolve_pair_target(alias)
-    status = CredentialManager.status(pair_alias, _store.document() if _store else None)
+    status = CredentialManager.status(pair_alias, credential_source(_store, pair_alias))
     stored_rid = entry.get("pair_rid")
     current_rid = _receiver_id()
     return {
@@ -237,21 +248,12 @@ def _normalise_digits(raw: str) -> str:
 
 
 def _ocr(img, psm: int = 6, digits_only: bool = False, strict: bool = False) -> str:
-    try:
-        import pytesseract
-    except Exception:
-        return ""
-    cfg = f"--oem 3 --psm {psm} -c user_defined_dpi=300"
+    whitelist = None
     if digits_only:
         # strict: digits only, so the classifier must choose the nearest digit.
         # loose:  also allow look-alike letters, repaired by _normalise_digits().
-        cfg += (" -c tessedit_char_whitelist=0123456789" if strict
-                else " -c tessedit_char_whitelist=0123456789OoDdIl|SsBGgbqZzAT")
-    try:
-        return pytesseract.image_to_string(img, config=cfg) or ""
-    except Exception as exc:
-        log.debug("sgs_autopair: OCR error: %s", exc)
-        return ""
+        whitelist = "0123456789" if strict else "0123456789OoDdIl|SsBGgbqZzAT"
+    return ocr_engine.image_to_string(img, psm=psm, whitelist=whitelist)
 
 
 # Tesseract cost scales with pixel count, and a 0.5x0.4 crop of a 1080p frame
@@ -328,57 +330,19 @@ def has_text_like_content(img) -> bool:
 
 
 def _variants(img, scale: float):
-    """Yield ``(name, image)`` preprocessing variants for one crop.
+    """Return ``[(name, image)]`` preprocessing variants for one crop.
 
     A single threshold pass is not good enough: on a real TV capture the PIN can
     be light-on-dark or dark-on-light, and Otsu picks the wrong polarity often
     enough that individual digits flip (3<->5, 8<->6).  Running several variants
     and voting is what makes the reader reliable, and it costs a few hundred ms
-    once per pairing attempt.
+    once per pairing attempt.  ``score_pin_candidates`` shares one
+    ``FramePrep`` across regions and scales instead of calling this per crop.
     """
-    out = []
     try:
-        import cv2
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if len(img.shape) == 3 else img
-        # Clamp the effective scale so the OCR image never exceeds MAX_OCR_WIDTH.
-        if gray.shape[1] > 0:
-            scale = min(float(scale), MAX_OCR_WIDTH / float(gray.shape[1]))
-            scale = max(scale, 1.0)
-        up = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        out.append(("gray", up))
-        _, otsu = cv2.threshold(up, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        out.append(("otsu", otsu))
-        out.append(("otsu_inv", cv2.bitwise_not(otsu)))
-        # Fixed high threshold: isolates bright dialog text from a dark panel.
-        _, bright = cv2.threshold(up, 165, 255, cv2.THRESH_BINARY)
-        out.append(("bright_inv", cv2.bitwise_not(bright)))
-        # Mild blur before Otsu smooths compression noise on the capture.
-        _, blurred = cv2.threshold(
-            cv2.GaussianBlur(up, (3, 3), 0), 0, 255,
-            cv2.THRESH_BINARY + cv2.THRESH_OTSU,
-        )
-        out.append(("blur_otsu_inv", cv2.bitwise_not(blurred)))
-        # Adaptive threshold copes with a gradient/backlit dialog panel where a
-        # single global cutoff loses either the top or the bottom of the digits.
-        try:
-            adap = cv2.adaptiveThreshold(
-                up, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                cv2.THRESH_BINARY, 31, 5,
-            )
-            out.append(("adaptive_inv", cv2.bitwise_not(adap)))
-        except Exception:
-            pass
-        # Closing repairs hairline breaks in anti-aliased strokes, which is the
-        # single most common cause of a digit being read as a letter.
-        try:
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-            closed = cv2.morphologyEx(otsu, cv2.MORPH_CLOSE, kernel)
-            out.append(("closed_inv", cv2.bitwise_not(closed)))
-        except Exception:
-            pass
+        return list(FramePrep(img, max_width=MAX_OCR_WIDTH).variants(FULL_FRAME, scale).items())
     except Exception:
-        out.append(("raw", img))
-    return out
+        return [("raw", img)]
 
 
 def _prep(img, scale: float = 2.6):
@@ -428,10 +392,16 @@ _METHOD_WEIGHT = {
 # instead.
 #
 # Each plan entry is (region_index, scale, variant_names, passes) where a pass is
-# ("labelled", psm) or ("strict"|"loose", psm).
+# ("labelled", psm) or ("strict"|"loose", psm).  ``proposals`` is how many of
+# the text lines found by ``FramePrep.text_boxes`` are searched first: a line
+# found anywhere on screen (banner or dialog) is read before the fixed regions.
+# ``max_calls`` covers the whole frame.  The proposals share at most half of it
+# (a tight line crop needs fewer passes), and the fixed regions split whatever
+# the proposals did not use.
 _EFFORT_PLANS: Dict[str, Dict[str, Any]] = {
-    # ~9 calls (~0.9 s) - the centred modal, the layouts that matter most.
+    # <= 12 calls (~1.2 s) - the centred modal, the layouts that matter most.
     "fast": {
+        "proposals": 2,
         "regions": (0,),
         "scales": (2.6,),
         "variants": ("otsu_inv", "gray", "adaptive_inv"),
@@ -439,7 +409,7 @@ _EFFORT_PLANS: Dict[str, Dict[str, Any]] = {
         "max_calls": 12,
         "time_budget_s": 4.0,
     },
-    # ~40 calls - MORE DEPTH ON THE SAME REGION, not a wider crop.
+    # <= 44 calls - MORE DEPTH ON THE SAME REGION, not a wider crop.
     #
     # Measured on a 4-font x 8-PIN synthetic sweep: an earlier "deep" tier that
     # widened the crop to regions (0,1,3) scored 78% top-1, *worse* than the
@@ -449,6 +419,7 @@ _EFFORT_PLANS: Dict[str, Dict[str, Any]] = {
     # search area is reserved for the exhaustive tier, where the region weights
     # keep peripheral digits from winning.
     "deep": {
+        "proposals": 2,
         "regions": (0, 1),
         "scales": (2.6, 4.0),
         "variants": ("otsu_inv", "gray", "closed_inv", "adaptive_inv"),
@@ -456,8 +427,9 @@ _EFFORT_PLANS: Dict[str, Dict[str, Any]] = {
         "max_calls": 44,
         "time_budget_s": 12.0,
     },
-    # ~80 calls (~8 s) - last resort, includes the whole frame.
+    # <= 70 calls (~7 s) - last resort, includes the whole frame.
     "exhaustive": {
+        "proposals": 3,
         "regions": (0, 1, 2, 3, 4),
         "scales": (2.0, 2.6, 4.0),
         "variants": ("otsu", "otsu_inv", "gray", "adaptive_inv", "closed_inv"),
@@ -469,6 +441,60 @@ _EFFORT_PLANS: Dict[str, Dict[str, Any]] = {
 }
 
 
+def _proposal_weight(box: Tuple[float, float, float, float]) -> float:
+    """Weight of the best ``_PIN_REGIONS`` box containing the centre of ``box``."""
+    cx, cy = (box[0] + box[2]) / 2.0, (box[1] + box[3]) / 2.0
+    return max(
+        weight
+        for (x0, y0, x1, y1), weight in _PIN_REGIONS
+        if x0 <= cx <= x1 and y0 <= cy <= y1
+    )
+
+
+def _pass_votes(image, kind: str, psm: int, region_w: float) -> List[Tuple[str, float]]:
+    """Run one OCR pass and return its ``(pin, weight)`` votes (pool worker)."""
+    if kind == "labelled":
+        # Unconstrained OCR, then pull the digits that sit next to the words
+        # "code"/"pin" - the strongest signal, since it cannot be a clock or a
+        # channel number.
+        return [
+            (_normalise_digits(m.group(1)), region_w * _METHOD_WEIGHT["labelled"])
+            for m in _LABELLED_PIN_RE.finditer(_ocr(image, psm=psm))
+        ]
+    strict = kind == "strict"
+    whole = _normalise_digits(_ocr(image, psm=psm, digits_only=True, strict=strict))
+    if PIN_MIN_DIGITS <= len(whole) <= PIN_MAX_DIGITS:
+        return [(whole, region_w * _METHOD_WEIGHT["whitelist"] * (1.5 if strict else 0.7))]
+    return [
+        (m.group(1), region_w * _METHOD_WEIGHT["bare"])
+        for m in _BARE_DIGITS_RE.finditer(whole)
+    ]
+
+
+def _tally(
+    jobs: List[Tuple[str, str, Future, tuple]],
+    votes: Dict[int, List[Tuple[str, float]]],
+    limit: int,
+) -> Tuple[Dict[str, float], Dict[str, int], Dict[str, List[str]]]:
+    """Accumulate the votes of ``jobs[:limit]`` in plan order."""
+    scores: Dict[str, float] = {}
+    hits: Dict[str, int] = {}
+    sources: Dict[str, List[str]] = {}
+    for index in range(min(limit, len(jobs))):
+        tag = jobs[index][1]
+        for pin, weight in votes.get(index, ()):
+            if not pin or not (PIN_MIN_DIGITS <= len(pin) <= PIN_MAX_DIGITS):
+                continue
+            if len(pin) == PIN_PREFERRED_DIGITS:
+                weight *= 1.6                     # firmware issues 6 digits today
+            scores[pin] = scores.get(pin, 0.0) + weight
+            hits[pin] = hits.get(pin, 0) + 1
+            sources.setdefault(pin, [])
+            if len(sources[pin]) < 5:
+                sources[pin].append(tag)
+    return scores, hits, sources
+
+
 def score_pin_candidates(
     frame=None,
     effort: str = "fast",
@@ -476,7 +502,9 @@ def score_pin_candidates(
 ) -> List[Dict[str, Any]]:
     """Score every PIN candidate visible in one frame, within a call budget.
 
-    Returns ``[{"pin", "score", "hits", "sources"}, ...]`` sorted best-first.
+    Returns ``[{"pin", "score", "hits", "fresh_hits", "sources"}, ...]`` sorted
+    best-first; ``fresh_hits`` counts only votes from real OCR passes, not from
+    ``ocr_cache``.
     Voting across regions/scales/polarities/PSMs is what corrects the individual
     digit confusions a single OCR pass gets wrong; ``effort`` bounds how much of
     that matrix is explored.
@@ -495,98 +523,193 @@ def score_pin_candidates(
     # was never reached at all -- a banner-style pairing screen returned no
     # candidates whatsoever.
     regions = tuple(plan["regions"])
-    per_region = max(3, int(plan["max_calls"]) // max(1, len(regions)))
-    calls_used = 0
+    max_calls = int(plan["max_calls"])
     # Hard wall-clock stop.  Without this a single call could run for ~40 s and
     # blow straight through wait_for_pin's overall timeout, because the deadline
     # used to be checked only between polls.
     if time_budget_s is None:
         time_budget_s = float(plan.get("time_budget_s") or 0) or None
     hard_deadline = (time.time() + float(time_budget_s)) if time_budget_s else None
+    started = time.monotonic()
 
     def _out_of_time() -> bool:
         return hard_deadline is not None and time.time() >= hard_deadline
 
-    scores: Dict[str, float] = {}
-    hits: Dict[str, int] = {}
-    sources: Dict[str, List[str]] = {}
+    # Grayscale once per frame; regions are views, variants are memoized.
+    try:
+        prep = FramePrep(frame, max_width=MAX_OCR_WIDTH)
+    except Exception as exc:
+        log.debug("sgs_autopair: frame preprocessing failed: %s", exc)
+        return []
 
-    def _add(pin: str, weight: float, source: str) -> None:
-        if not pin or not (PIN_MIN_DIGITS <= len(pin) <= PIN_MAX_DIGITS):
-            return
-        if len(pin) == PIN_PREFERRED_DIGITS:
-            weight *= 1.6                     # firmware issues 6 digits today
-        scores[pin] = scores.get(pin, 0.0) + weight
-        hits[pin] = hits.get(pin, 0) + 1
-        sources.setdefault(pin, [])
-        if len(sources[pin]) < 5:
-            sources[pin].append(source)
-
-    for region_idx in regions:
-        if _out_of_time():
-            log.debug("sgs_autopair: OCR time budget reached, stopping at region %d", region_idx)
-            break
-        budget = per_region
+    # Text-localization proposals are searched before the fixed regions, each
+    # as its own stage, so a PIN line found by the localizer ends the read
+    # before any fixed region is OCR'd.  A proposal takes the weight of the
+    # best fixed region its centre falls in, which keeps a banner or clock line
+    # from counting as much as a line inside the centred dialog.  Stage entries
+    # are (label, box, weight, budget, may_stop).
+    proposals: List[Tuple[float, float, float, float]] = []
+    if plan.get("proposals"):
         try:
-            box, region_w = _PIN_REGIONS[region_idx]
-            crop = _crop(frame, box)
-        except Exception:
-            continue
-        if crop is None or not getattr(crop, "size", 0):
-            continue
-        # Skip regions that clearly hold no glyphs (see has_text_like_content).
-        if not has_text_like_content(crop):
-            log.debug("sgs_autopair: region %d has no glyph-like content, skipping", region_idx)
-            continue
-
-        for scale in plan["scales"]:
-            if budget <= 0 or _out_of_time():
+            proposals = prep.text_boxes(int(plan["proposals"]))
+        except Exception as exc:
+            log.debug("sgs_autopair: text localization failed: %s", exc)
+    per_proposal = max(3, max_calls // (2 * max(1, len(proposals))))
+    weighted = sorted(
+        ((box, _proposal_weight(box)) for box in proposals), key=lambda item: -item[1]
+    )
+    # A budget of None is a fixed region's share of what the proposals left.
+    stages: List[List[Tuple[str, Tuple[float, float, float, float], float, Optional[int], bool]]] = [
+        [(f"p{n}", box, weight, per_proposal, weight >= _PIN_REGIONS[1][1])]
+        for n, (box, weight) in enumerate(weighted)
+    ]
+    stages.append([
+        (f"r{region_idx}", _PIN_REGIONS[region_idx][0], _PIN_REGIONS[region_idx][1],
+         None, region_idx <= 1)
+        for region_idx in regions
+    ])
+
+    # Within a stage every pass is submitted to the shared OCR pool up front,
+    # in plan order, so the pool works through the first region while later
+    # ones queue behind it.  A pass whose region looks the same as in an
+    # earlier poll reuses that poll's votes from ocr_cache instead.  Entries
+    # are (label, tag, future, cache slot).
+    jobs: List[Tuple[str, str, Future, tuple]] = []
+    fingerprints: Dict[str, Any] = {}
+    cached_jobs: Set[int] = set()
+    votes: Dict[int, List[Tuple[str, float]]] = {}
+    pending: Dict[Future, int] = {}
+    region_last: Dict[str, int] = {}
+    may_stop: Dict[str, bool] = {}
+    checked = 0
+    cutoff = 0
+    cancelled = 0
+    early_stop = False
+    for stage in stages:
+        if early_stop:
+            break
+        per_region = max(3, (max_calls - len(jobs)) // max(1, len(regions)))
+        for label, box, region_w, budget, stoppable in stage:
+            if budget is None:
+                budget = per_region
+            if _out_of_time():
+                log.debug("sgs_autopair: OCR time budget reached, stopping at region %s", label)
                 break
-            available = dict(_variants(crop, scale))
-            for vname in plan["variants"]:
-                image = available.get(vname)
-                if image is None or budget <= 0:
-                    continue
-                for kind, psm in plan["passes"]:
-                    if budget <= 0 or _out_of_time():
-                        break
-                    budget -= 1
-                    calls_used += 1
-                    tag = f"{kind}/{vname}/x{scale}/psm{psm}/r{region_idx}"
-
-                    if kind == "labelled":
-                        # Unconstrained OCR, then pull the digits that sit next
-                        # to the words "code"/"pin" - the strongest signal, since
-                        # it cannot be a clock or a channel number.
-                        for m in _LABELLED_PIN_RE.finditer(_ocr(image, psm=psm)):
-                            _add(_normalise_digits(m.group(1)),
-                                 region_w * _METHOD_WEIGHT["labelled"], tag)
-                        continue
+            try:
+                crop = prep.gray_region(box)
+            except Exception:
+                continue
+            if crop is None or not getattr(crop, "size", 0):
+                continue
+            # Skip regions that clearly hold no glyphs (see has_text_like_content).
+            if not has_text_like_content(crop):
+                log.debug("sgs_autopair: region %s has no glyph-like content, skipping", label)
+                continue
 
-                    strict = kind == "strict"
-                    text = _ocr(image, psm=psm, digits_only=True, strict=strict)
-                    whole = _normalise_digits(text)
-                    weight = region_w * _METHOD_WEIGHT["whitelist"] * (1.5 if strict else 0.7)
-                    if PIN_MIN_DIGITS <= len(whole) <= PIN_MAX_DIGITS:
-                        _add(whole, weight, tag)
-                    else:
-                        for m in _BARE_DIGITS_RE.finditer(whole):
-                            _add(m.group(1), region_w * _METHOD_WEIGHT["bare"], tag)
-
-        # A clear winner from the centred dialog is enough; going wider only
-        # invites clock/channel digits into the vote.
-        if scores and region_idx <= 1:
-            ranked = sorted(scores.values(), reverse=True)
-            if len(ranked) == 1 or ranked[0] >= 2.0 * ranked[1]:
+            fingerprints[label] = fp = fingerprint(crop)
+            may_stop[label] = stoppable
+            for scale in plan["scales"]:
+                if budget <= 0:
+                    break
+                available: Optional[Dict[str, Any]] = None
+                for vname in plan["variants"]:
+                    if budget <= 0:
+                        continue
+                    for kind, psm in plan["passes"]:
+                        if budget <= 0:
+                            break
+                        slot = ("pin", box, scale, vname, kind, psm)
+                        hit, cached = ocr_cache.lookup(slot, fp)
+                        if hit:
+                            future: Future = Future()
+                            future.set_result(cached)
+                            cached_jobs.add(len(jobs))
+                        else:
+                            if available is None:
+                                try:
+                                    available = prep.variants(box, scale, plan["variants"])
+                                except Exception as exc:
+                                    log.debug("sgs_autopair: variant preprocessing failed: %s", exc)
+                                    available = {}
+                            image = available.get(vname)
+                            if image is None:
+                                break
+                            future = ocr_pool.submit(_pass_votes, image, kind, psm, region_w)
+                        budget -= 1
+                        pending[future] = len(jobs)
+                        region_last[label] = len(jobs)
+                        jobs.append((label, f"{kind}/{vname}/x{scale}/psm{psm}/{label}", future, slot))
+        cutoff = len(jobs)
+        region_order = list(region_last)
+
+        # Collect results.  A clear winner from the centred dialog is enough;
+        # going wider only invites clock/channel digits into the vote.  The
+        # margin is checked once every pass of a region (and of the regions
+        # before it) is done, exactly as the serial reader did, and the queued
+        # passes of the remaining regions are then cancelled.
+        while pending and not early_stop:
+            timeout = None if hard_deadline is None else max(0.0, hard_deadline - time.time())
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                log.debug("sgs_autopair: OCR time budget reached with %d passes pending",
+                          len(pending))
                 break
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    votes[index] = future.result()
+                except Exception as exc:
+                    log.debug("sgs_autopair: OCR pass failed: %s", exc)
+                    votes[index] = []
+                    continue
+                if index in cached_jobs:
+                    continue                    # keep the original read's TTL
+                label, _tag, _future, slot = jobs[index]
+                ocr_cache.store(slot, fingerprints.get(label), votes[index])
+            while checked < len(region_order):
+                label = region_order[checked]
+                last = region_last[label]
+                if any(i not in votes for i in range(last + 1)):
+                    break
+                checked += 1
+                if not may_stop[label]:
+                    continue
+                prefix = _tally(jobs, votes, last + 1)[0]
+                ranked = sorted(prefix.values(), reverse=True)
+                if ranked and (len(ranked) == 1 or ranked[0] >= 2.0 * ranked[1]):
+                    cutoff = last + 1
+                    early_stop = True
+                    break
+        cancelled += sum(1 for future in pending if future.cancel())
+        if pending and not early_stop:
+            break                                   # out of time
+        pending.clear()
+
+    scores, hits, sources = _tally(jobs, votes, cutoff)
+    fresh = _tally(jobs, {i: v for i, v in votes.items() if i not in cached_jobs}, cutoff)[1]
+    cache_hits = len(cached_jobs)
+    calls_used = len(votes) - cache_hits
+    ocr_pool.record(
+        effort,
+        calls=calls_used,
+        wall_s=time.monotonic() - started,
+        cancelled=cancelled,
+        early_stop=early_stop,
+    )
 
     out = [
-        {"pin": pin, "score": round(score, 2), "hits": hits[pin], "sources": sources[pin]}
+        {
+            "pin": pin,
+            "score": round(score, 2),
+            "hits": hits[pin],
+            "fresh_hits": fresh.get(pin, 0),
+            "sources": sources[pin],
+        }
         for pin, score in sorted(scores.items(), key=lambda kv: -kv[1])
     ]
     if out:
-        log.debug("sgs_autopair: PIN candidates (%s, %d calls used): %s",
-                  effort, calls_used,
+        log.debug("sgs_autopair: PIN candidates (%s, %d calls used, %d cached, %d cancelled): %s",
+                  effort, calls_used, cache_hits, cancelled,
                   [(c["pin"], c["score"], c["hits"]) for c in out[:4]])
     return out
 
@@ -596,8 +719,8 @@ def read_pin_candidates(frame=None, effort: str = "exhaustive") -> List[Tuple[st
 
     Defaults to the exhaustive tier because this is a single explicit read (an
     operator asking "what PIN can you see?"), not a poll inside a loop, so it
-    should search every region -- including the bottom-banner layout that the
-    fast/deep tiers skip on purpose.
+    should search every region -- including the bottom-banner region that the
+    fast/deep tiers only reach through text-localization proposals.
     """
     return [(c["pin"], c["sources"][0] if c["sources"] else "?")
             for c in score_pin_candidates(frame, effort=effort)]
@@ -653,6 +776,10 @@ def wait_for_pin(
         for cand in score_pin_candidates(
             effort=effort, time_budget_s=min(tier_budget, remaining)
         ):
+            # Votes served from ocr_cache repeat an earlier poll's read of the
+            # same screen; they are not another frame agreeing.
+            if not cand.get("fresh_hits", cand["hits"]):
+                continue
             pin = cand["pin"]
             total[pin] = total.get(pin, 0.0) + cand["score"]
             frames_seen[pin] = frames_seen.get(pin, 0) + 1
@@ -794,7 +921,7 @@ def verify_commands_active(alias: str, cleanup: bool = True) -> Dict[str, Any]:
         "errors": [],
     }
     if not CredentialManager.has_stored_credentials(
-        pair_alias, _store.document() if _store else None
+        pair_alias, credential_source(_store, pair_alias)
     ):
         out["errors"].append("not_paired")
         out["ok"] = False
@@ -848,7 +975,7 @@ def verify_commands_active(alias: str, cleanup: bool = True) -> Dict[str, Any]:
 def verify_credentials_persisted(alias: str) -> Dict[str, Any]:
     pair_alias, entry = _resolve_pair_target(alias)
     secure = CredentialManager.status(
-        pair_alias, _store.document() if _store else None
+        pair_alias, credential_source(_store, pair_alias)
     )
     return {
         "requested_alias": str(alias),
@@ -960,6 +1087,8 @@ def auto_pair(
             if complete.get("ok"):
                 break
             rejected.append(use_pin)
+            # Re-read the dialog from scratch rather than replaying cached votes.
+            ocr_cache.clear("pin")
             if attempt < attempts:
                 time.sleep(2.0)
         result["steps"]["pin"] = {
@@ -3,24 +3,44 @@
 No credential is placed in a subprocess argument or debug curl command.  The
 client tries mutual-TLS/digest first when credentials exist, then the engineering
 HTTP endpoints supported by some lab images.
+
+Each receiver IP gets a pooled keep-alive ``requests.Session`` and a reusable
+digest-auth object, so repeated keys skip the TCP/TLS handshake and answer the
+cached digest challenge pre-emptively.  Pools are evicted when ``STBStore``
+reports that a receiver moved, and on authentication failures.
+
+The endpoint that last returned ``result == 1`` for a receiver is tried first on
+the next key; the full https/8080/80 ladder is only walked when it fails.  The
+learned endpoint is persisted on the receiver row (``sgs_endpoint`` plus the IP
+it was learned at) so a restart does not have to rediscover it.
 """
 from __future__ import annotations
 
 import json
 import logging
 import os
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
 
 from . import mac_learning
 from .commands import get_sgs_codes
 from .core.credentials import CredentialManager
 from .sgs_lib import sgs_get_receiver_id
-from .stb_store import store
+from .stb_store import (
+    CREDENTIAL_FIELDS,
+    changed_fields,
+    changed_ips,
+    credential_source,
+    store,
+)
 
 LOG = logging.getLogger(__name__)
 PACKAGE_DIR = Path(__file__).resolve().parent
@@ -29,12 +49,365 @@ KEY_PEM = PACKAGE_DIR / "key.pem"
 CID_CACHE: Dict[Tuple[str, str], Tuple[int, float]] = {}
 CACHE_TTL_S = 150.0
 DEFAULT_REQUEST_TIMEOUT_S = 2.0
+POOL_MAX_RECEIVERS = 128
+POOL_IDLE_TTL_S = 300.0
+POOL_CONNECTIONS_PER_RECEIVER = 4
+ENDPOINT_KINDS = ("https", "http:8080", "http:80")
 
 
 def clear_cid_cache() -> None:
     CID_CACHE.clear()
 
 
+@dataclass
+class _PooledReceiver:
+    session: requests.Session
+    created: float
+    last_used: float
+    auth: Optional[HTTPDigestAuth] = None
+    auth_key: Optional[Tuple[str, str]] = None
+    requests: int = 0
+
+
+class SessionPool:
+    """Keep-alive HTTP sessions keyed by receiver IP.
+
+    A session keeps its urllib3 connection pools open between keys, which also
+    reuses the negotiated TLS session on the ``https`` endpoint.  The digest
+    auth object is kept with the session: ``HTTPDigestAuth`` remembers the last
+    server nonce and signs the next request before the receiver has to issue a
+    fresh 401 challenge.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_receivers: int = POOL_MAX_RECEIVERS,
+        idle_ttl_s: float = POOL_IDLE_TTL_S,
+        connections_per_receiver: int = POOL_CONNECTIONS_PER_RECEIVER,
+    ) -> None:
+        self.max_receivers = max(1, int(max_receivers))
+        self.idle_ttl_s = max(1.0, float(idle_ttl_s))
+        self.connections_per_receiver = max(1, int(connections_per_receiver))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _PooledReceiver]" = OrderedDict()
+        self._created = 0
+        self._reused = 0
+        self._evicted: Dict[str, int] = {}
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.connections_per_receiver,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _drop_locked(self, ip: str, reason: str) -> bool:
+        entry = self._entries.pop(ip, None)
+        if entry is None:
+            return False
+        self._evicted[reason] = self._evicted.get(reason, 0) + 1
+        try:
+            entry.session.close()
+        except Exception:
+            pass
+        return True
+
+    def _entry_locked(self, ip: str) -> _PooledReceiver:
+        now = time.monotonic()
+        # Entries are kept in LRU order, so idle sessions are always at the front.
+        while self._entries:
+            oldest_ip, oldest = next(iter(self._entries.items()))
+            if now - oldest.last_used <= self.idle_ttl_s:
+                break
+            self._drop_locked(oldest_ip, "idle")
+        entry = self._entries.get(ip)
+        if entry is None:
+            while len(self._entries) >= self.max_receivers:
+                self._drop_locked(next(iter(self._entries)), "capacity")
+            entry = _PooledReceiver(self._new_session(), now, now)
+            self._entries[ip] = entry
+            self._created += 1
+        else:
+            self._entries.move_to_end(ip)
+            self._reused += 1
+        entry.last_used = now
+        entry.requests += 1
+        return entry
+
+    def acquire(
+        self, ip: str, creds: Optional[Tuple[str, str]]
+    ) -> Tuple[requests.Session, Optional[HTTPDigestAuth]]:
+        """Return the pooled session and digest auth object for ``ip``."""
+        ip = str(ip)
+        with self._lock:
+            entry = self._entry_locked(ip)
+            if not creds:
+                return entry.session, None
+            key = (str(creds[0]), str(creds[1]))
+            if entry.auth is None or entry.auth_key != key:
+                entry.auth = HTTPDigestAuth(*key)
+                entry.auth_key = key
+            return entry.session, entry.auth
+
+    def evict(self, ip: str, reason: str = "explicit") -> bool:
+        with self._lock:
+            return self._drop_locked(str(ip), reason)
+
+    def clear(self, reason: str = "explicit") -> None:
+        with self._lock:
+            for ip in list(self._entries):
+                self._drop_locked(ip, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "receivers": len(self._entries),
+                "max_receivers": self.max_receivers,
+                "idle_ttl_s": self.idle_ttl_s,
+                "sessions_created": self._created,
+                "sessions_reused": self._reused,
+                "evicted": dict(self._evicted),
+                "hosts": {
+                    ip: {
+                        "requests": entry.requests,
+                        "age_s": round(now - entry.created, 1),
+                        "idle_s": round(now - entry.last_used, 1),
+                        "digest_cached": entry.auth is not None,
+                    }
+                    for ip, entry in self._entries.items()
+                },
+            }
+
+
+session_pool = SessionPool()
+
+
+class EndpointSelector:
+    """Remember which SGS endpoint last succeeded for each receiver IP.
+
+    A *hit* is a request answered by the remembered endpoint on the first
+    attempt; a *miss* is any request that had to walk the ladder, either because
+    nothing was remembered yet or because the remembered endpoint failed.
+
+    Once https has answered for an IP, a plaintext fallback that happens to
+    succeed after a transient https failure is never learned: the preference
+    stays on https so the next request probes it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._preferred: Dict[str, str] = {}
+        # IPs whose persisted preference has already been consulted (or was
+        # deliberately invalidated) so base.txt is not rescanned on every miss.
+        self._seeded: set[str] = set()
+        # IPs where https has answered; plaintext never displaces it there.
+        self._secure: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.downgrades_refused = 0
+
+    def preferred(self, ip: str) -> Optional[str]:
+        ip = str(ip)
+        with self._lock:
+            if ip in self._preferred or ip in self._seeded:
+                return self._preferred.get(ip)
+            self._seeded.add(ip)
+        persisted = _persisted_endpoint(ip)
+        if persisted:
+            with self._lock:
+                self._preferred.setdefault(ip, persisted)
+                if persisted == "https":
+                    self._secure.add(ip)
+        return persisted
+
+    def secure(self, ip: str) -> bool:
+        """Return True once https has answered at ``ip``."""
+        with self._lock:
+            return str(ip) in self._secure
+
+    def order(self, ip: str, attempts: list[tuple[str, str, bool]]) -> list[tuple[str, str, bool]]:
+        preferred = self.preferred(ip)
+        if not preferred:
+            return attempts
+        first = [attempt for attempt in attempts if attempt[0] == preferred]
+        return first + [attempt for attempt in attempts if attempt[0] != preferred]
+
+    def record(self, ip: str, kind: str, *, first_attempt: bool) -> None:
+        ip = str(ip)
+        with self._lock:
+            if first_attempt and self._preferred.get(ip) == kind:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._seeded.add(ip)
+            if kind == "https":
+                self._secure.add(ip)
+            elif ip in self._secure:
+                self.downgrades_refused += 1
+                self._preferred[ip] = "https"
+                return
+            self._preferred[ip] = kind
+
+    def record_failure(self, ip: str, kind: str) -> None:
+        """Count a request that failed everywhere and demote ``kind`` at ``ip``.
+
+        Only the remembered endpoint is forgotten, and only if it is the one
+        that failed; the persisted value is not reloaded for it either.
+        """
+        ip = str(ip)
+        with self._lock:
+            self.misses += 1
+            if self._preferred.get(ip) == kind:
+                del self._preferred[ip]
+                self._seeded.add(ip)
+
+    def invalidate(self, ip: str, *, reseed: bool = False) -> bool:
+        """Forget ``ip``; ``reseed`` allows the persisted value to be reloaded."""
+        ip = str(ip)
+        with self._lock:
+            dropped = self._preferred.pop(ip, None) is not None
+            if reseed:
+                # A reseed follows an IP change; the address may now be a
+                # different receiver, so https has to prove itself again.
+                self._seeded.discard(ip)
+                self._secure.discard(ip)
+            else:
+                self._seeded.add(ip)
+            if dropped:
+                self.invalidations += 1
+            return dropped
+
+    def stats(self, ip: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            output: Dict[str, Any] = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "invalidations": self.invalidations,
+                "downgrades_refused": self.downgrades_refused,
+            }
+            if ip is None:
+                output["learned"] = dict(self._preferred)
+            else:
+                output["preferred"] = self._preferred.get(str(ip))
+            return output
+
+
+endpoint_selector = EndpointSelector()
+
+
+def _persisted_endpoint(ip: str) -> Optional[str]:
+    """Return a persisted endpoint learned at exactly ``ip``, if any."""
+    try:
+        rows = store.all() or {}
+    except Exception:
+        return None
+    for entry in rows.values():
+        if not isinstance(entry, Mapping):
+            continue
+        kind = str(entry.get("sgs_endpoint") or "")
+        if (
+            kind in ENDPOINT_KINDS
+            and str(entry.get("ip") or "") == ip
+            and str(entry.get("sgs_endpoint_ip") or "") == ip
+        ):
+            return kind
+    return None
+
+
+_persisting: set[str] = set()
+_persist_lock = threading.Lock()
+
+
+def _persist_endpoint_async(alias: str, entry: Mapping[str, Any], ip: str) -> bool:
+    """Record the learned endpoint on ``alias`` when it differs from base.txt."""
+    kind = endpoint_selector.stats(ip).get("preferred")
+    if not kind or (
+        entry.get("sgs_endpoint") == kind and entry.get("sgs_endpoint_ip") == ip
+    ):
+        return False
+    if kind != "https" and (
+        endpoint_selector.secure(ip)
+        or (entry.get("sgs_endpoint") == "https" and entry.get("sgs_endpoint_ip") == ip)
+    ):
+        # Never write a plaintext downgrade over an https receiver.
+        return False
+    update = getattr(store, "update_stb", None)
+    if not callable(update):
+        return False
+    with _persist_lock:
+        if alias in _persisting:
+            return False
+        _persisting.add(alias)
+
+    def worker() -> None:
+        try:
+            latest = store.get(alias) or {}
+            if str(latest.get("ip") or "") == ip:
+                update(
+                    alias,
+                    {"sgs_endpoint": kind, "sgs_endpoint_ip": ip},
+                    create=False,
+                    defer=True,
+                )
+        except Exception:
+            LOG.exception("failed to persist SGS endpoint alias=%s ip=%s", alias, ip)
+        finally:
+            with _persist_lock:
+                _persisting.discard(alias)
+
+    threading.Thread(target=worker, name=f"SGSEndpoint-{alias}", daemon=True).start()
+    return True
+
+
+def _on_store_change(
+    previous: Mapping[str, Any], current: Mapping[str, Any]
+) -> None:
+    # Only the plaintext opt-in fields feed CredentialManager from base.txt, so
+    # endpoint/MAC metadata writes leave the credential cache alone.
+    for alias in changed_fields(previous, current, CREDENTIAL_FIELDS):
+        CredentialManager.invalidate_cache(alias)
+    for alias, (old_ip, new_ip) in changed_ips(previous, current).items():
+        for ip in (old_ip, new_ip):
+            if ip:
+                endpoint_selector.invalidate(ip, reseed=True)
+        if old_ip and session_pool.evict(old_ip, "ip_change"):
+            LOG.info(
+                "evicted pooled SGS session alias=%s old_ip=%s new_ip=%s",
+                alias,
+                old_ip,
+                new_ip or None,
+            )
+
+
+_add_listener = getattr(store, "add_change_listener", None)
+if callable(_add_listener):
+    _add_listener(_on_store_change, fields=CREDENTIAL_FIELDS + ("ip",))
+
+
+def status() -> Dict[str, Any]:
+    """Return non-secret SGS transport diagnostics for health endpoints."""
+    return {
+        "pool": session_pool.stats(),
+        "endpoints": endpoint_selector.stats(),
+        "credential_cache": CredentialManager.cache_stats(),
+        "cid_cache": len(CID_CACHE),
+    }
+
+
+def endpoint_status(ip: str) -> Dict[str, Any]:
+    """Return the learned endpoint and selector counters for one receiver."""
+    return endpoint_selector.stats(str(ip or ""))
+
+
 def _cert() -> Optional[Tuple[str, str]]:
     if CERT_PEM.is_file() and KEY_PEM.is_file():
         return str(CERT_PEM), str(KEY_PEM)
@@ -72,7 +445,7 @@ def _request_timeout_s() -> float:
 
 
 def _credentials(alias: str) -> Optional[Tuple[str, str]]:
-    username, password = CredentialManager.get_credentials(alias, store.document())
+    username, password = CredentialManager.get_credentials(alias, credential_source(store, alias))
     return (username, password) if username and password else None
 
 
@@ -91,23 +464,29 @@ def _post(
     payload: dict,
     *,
     creds: Optional[Tuple[str, str]],
+    alias: Optional[str] = None,
     timeout: Optional[float] = None,
 ) -> dict:
     request_timeout = _request_timeout_s() if timeout is None else max(0.05, float(timeout))
-    attempts: list[tuple[str, bool]] = []
+    attempts: list[tuple[str, str, bool]] = []
     if creds:
-        attempts.append((f"https://{ip}/www/sgs", True))
+        attempts.append(("https", f"https://{ip}/www/sgs", True))
     attempts.extend(
-        ((f"http://{ip}:8080/www/sgs", False), (f"http://{ip}/www/sgs", False))
+        (
+            ("http:8080", f"http://{ip}:8080/www/sgs", False),
+            ("http:80", f"http://{ip}/www/sgs", False),
+        )
     )
+    attempts = endpoint_selector.order(ip, attempts)
+    session, auth = session_pool.acquire(ip, creds)
     errors: list[str] = []
-    for url, secure in attempts:
+    for index, (kind, url, secure) in enumerate(attempts):
         try:
-            response = requests.post(
+            response = session.post(
                 url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
-                auth=HTTPDigestAuth(*creds) if creds else None,
+                auth=auth,
                 verify=_verify_setting() if secure else True,
                 cert=_cert() if secure else None,
                 timeout=request_timeout,
@@ -117,6 +496,11 @@ def _post(
             continue
         if response.status_code in (401, 403):
             clear_cid_cache()
+            session_pool.evict(ip, "auth_failure")
+            endpoint_selector.invalidate(ip)
+            # The receiver rejected the cached secret; reread it on the next key.
+            # ``alias`` names the row the credentials came from (all if unknown).
+            CredentialManager.invalidate_cache(alias)
             raise PermissionError(f"SGS authentication failed (HTTP {response.status_code})")
         try:
             data = response.json()
@@ -124,8 +508,11 @@ def _post(
             errors.append(f"{url}: non-JSON HTTP {response.status_code}")
             continue
         if isinstance(data, dict) and data.get("result") == 1:
+            endpoint_selector.record(ip, kind, first_attempt=index == 0)
             return data
         errors.append(f"{url}: result={data.get('result') if isinstance(data, dict) else 'invalid'}")
+    if attempts:
+        endpoint_selector.record_failure(ip, attempts[0][0])
     raise RuntimeError("SGS request failed: " + "; ".join(errors))
 
 
@@ -159,6 +546,7 @@ def get_or_attach_cid(joey_rid: str, hopper_alias: str, hopper_ip: str) -> int:
             "attr": 1,
         },
         creds=creds,
+        alias=hopper_alias,
     )
     if "cid" not in data:
         raise RuntimeError(f"attach succeeded without cid: {data}")
@@ -188,6 +576,7 @@ def attach_alias(alias: str) -> Optional[int]:
                 "attr": 1,
             },
             creds=creds,
+            alias=host_alias,
         )
         return int(data["cid"]) if "cid" in data else None
     return get_or_attach_cid(rxid, host_alias, str(host["ip"]))
@@ -245,7 +634,8 @@ def send_sgs(
             key_name,
             cid,
         )
-    data = _post(target_ip, payload, creds=_credentials(target_alias))
+    data = _post(target_ip, payload, creds=_credentials(target_alias), alias=target_alias)
+    _persist_endpoint_async(target_alias, target, target_ip)
     # A result=1 is the strongest cheap evidence available that this resolved
     # target alias really was reached at target_ip.  Learn its ARP MAC only after
     # that success, in a daemon worker, so healthy keypress latency is unchanged.
@@ -24,6 +24,8 @@ import struct
 import argparse
 import requests
 import logging
+import threading
+import time
 from uuid import getnode as get_mac
 from pathlib import Path
 
@@ -50,6 +52,8 @@ DEFAULT_RECEIVER       = "R0000000000-00"
 
 from typing import Dict, Any
 
+from . import netlink
+
 # Import secure credential manager
 try:
     from .core.credentials import CredentialManager
@@ -122,16 +126,106 @@ def get_local_iface_mac(addr_pattern: str = DEFAULT_PC_IP_PATTERN) -> str:
     return ""
 
 
+def _compute_receiver_id(mac: str) -> str:
+    if mac:
+        return f"XAF{mac}"
+    logging.warning("Falling back to default receiver %s", DEFAULT_RECEIVER)
+    return DEFAULT_RECEIVER
+
+
+# The local MAC (and therefore the SGS receiver ID) is effectively constant for
+# the life of the process.  Interface enumeration plus ioctl calls used to run on
+# every remote_key/attach payload; the identity is now computed once and only
+# recomputed when the netlink watcher reports a link/address change or a caller
+# asks for it explicitly.
+_identity_lock = threading.Lock()
+_identity = {
+    "mac": None,
+    "receiver_id": None,
+    "computed_ts": None,
+    "computations": 0,
+    "stale_reason": "startup",
+}
+_watcher = netlink.new_state()
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+
+
+def _refresh_identity_locked(reason: str) -> None:
+    mac = get_local_iface_mac()
+    _identity.update(
+        mac=mac,
+        receiver_id=_compute_receiver_id(mac),
+        computed_ts=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        stale_reason=None,
+        last_refresh_reason=reason,
+    )
+    _identity["computations"] += 1
+
+
+def invalidate_receiver_identity(reason: str = "explicit") -> None:
+    """Mark the cached identity stale; it is recomputed on next use."""
+    with _identity_lock:
+        _identity["stale_reason"] = reason
+
+
+def refresh_receiver_identity(reason: str = "explicit") -> str:
+    """Recompute the local MAC/receiver ID now and return the receiver ID."""
+    with _identity_lock:
+        _refresh_identity_locked(reason)
+        return _identity["receiver_id"]
+
+
+def cached_local_mac() -> str:
+    """Return the memoized local MAC used in SGS pairing envelopes."""
+    with _identity_lock:
+        if _identity["stale_reason"] is not None:
+            _refresh_identity_locked(_identity["stale_reason"])
+        return _identity["mac"] or ""
+
+
 def sgs_get_receiver_id() -> str:
     """
     Build a receiver ID string based on local MAC.
     Format: 'XAF' + <lowercase mac without separators>
+
+    The value is memoized; see refresh_receiver_identity().
     """
-    mac = get_local_iface_mac()
-    if mac:
-        return f"XAF{mac}"
-    logging.warning("Falling back to default receiver %s", DEFAULT_RECEIVER)
-    return DEFAULT_RECEIVER
+    with _identity_lock:
+        if _identity["stale_reason"] is not None:
+            _refresh_identity_locked(_identity["stale_reason"])
+        return _identity["receiver_id"]
+
+
+def receiver_identity_status() -> Dict[str, Any]:
+    """Return the cached receiver identity and watcher state for /api/health."""
+    with _identity_lock:
+        status = {
+            key: value for key, value in _identity.items() if key != "stale_reason"
+        }
+        status["stale"] = _identity["stale_reason"] is not None
+    thread = _watcher["thread"]
+    status["watcher"] = {
+        "active": bool(thread and thread.is_alive()),
+        "events": _watcher["events"],
+        "overflows": _watcher["overflows"],
+        "error": _watcher["error"],
+    }
+    return status
+
+
+def start_interface_watcher() -> bool:
+    """Invalidate the identity on Linux link/address changes (rtnetlink)."""
+    return netlink.start_watcher(
+        _watcher,
+        RTMGRP_LINK | RTMGRP_IPV4_IFADDR,
+        label="receiver identity",
+        thread_name="ReceiverIdentityWatcher",
+        on_message=lambda _data: invalidate_receiver_identity("netlink"),
+        # Dropped events may have included a link change; recompute on next use.
+        on_overflow=lambda: invalidate_receiver_identity("netlink overflow"),
+    )
 
 # --- add near sgs_save_base / sgs_load_base ---
 def sgs_upsert_credentials(
@@ -604,7 +698,7 @@ class STB(object):
          exit()
 
       # set this device Receiver ID based on Mac
-      self.mac = get_local_iface_mac()
+      self.mac = cached_local_mac()
       self.rid = sgs_get_receiver_id()
 
       #  ---- stb info collecting complete
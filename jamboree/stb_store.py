@@ -9,26 +9,47 @@ a child receiver.
 
 The persisted document remains untouched. ``get()`` returns an *effective*
 entry for runtime consumers so pairing/transport behavior is corrected without
-silently rewriting the operator's configuration.
+silently rewriting the operator's configuration. Effective entries are computed
+once per store generation and handed out as read-only ``FrozenEntry`` views, so
+the hot path neither recomputes topology nor copies rows; callers that need to
+modify a row take ``dict(entry)``.
 
 The file may also be updated by another JAMboree process, recovery helper, or an
 operator. A long-running server therefore tracks the file identity/timestamps
 and transparently reloads external changes before serving configuration reads.
+A ``config_watch`` watcher (inotify, or a bounded poll interval) gates that
+check so ordinary reads do not ``stat()`` the file under the store lock.
+Runtime caches keyed by receiver address (pooled SGS sessions, for example)
+register a change listener and are told about every new generation; a
+deferred write that touches no watched field patches its row in place instead.
+
+Background metadata writers (verified MAC learning, learned SGS endpoints) call
+``update_stb(..., defer=True)``. Deferred patches are visible to readers at
+once but are persisted together, one locked ``base_io`` rewrite per coalescing
+window (``JAMBOREE_BASE_COALESCE_MS``, default 250 ms), or sooner when any
+synchronous write or ``flush()`` happens. A crash inside the window loses only
+those deferred, re-learnable fields; synchronous writes keep their
+write-through guarantee.
 """
 from __future__ import annotations
 
 import copy
+import json
 import logging
+import os
 import re
 import threading
+import weakref
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 
-from . import base_io
+from . import base_io, config_watch
 from .paths import BASE_PATH
 
 LOG = logging.getLogger(__name__)
 _lock = threading.RLock()
+DEFAULT_COALESCE_MS = 250.0
+FLUSH_RETRY_S = 5.0
 
 # These receiver/client families use a host Hopper for authenticated SGS. Keep
 # this intentionally narrow so stale/default host fields on ordinary rows do not
@@ -37,17 +58,183 @@ _CHILD_ROLE_NAMES = {"joey", "hopperplus", "hopper_plus", "client"}
 _CHILD_ALIAS_RE = re.compile(
     r"(?:^|[-_])(JOEY|MOCHAJOEY|HOPPERPLUS|HOPPER_PLUS)(?:[-_]|$)", re.I
 )
+# Row fields that feed ``_effective_entry``/``_infer_legacy_host`` for *other*
+# rows too; a deferred patch touching one of them rebuilds the generation.
+_TOPOLOGY_FIELDS = frozenset({"role", "model", "host", "master_stb"})
+
+ChangeListener = Callable[[Mapping[str, Any], Mapping[str, Any]], None]
+
+
+class FrozenEntry(dict):
+    """A read-only ``dict`` view of one effective STB row.
+
+    It stays a real ``dict`` so JSON encoding and ``isinstance`` checks keep
+    working; copying (``dict(entry)``, ``copy.deepcopy``) yields a plain dict.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *_args: Any, **_kwargs: Any) -> None:
+        raise TypeError("STB entries are read-only; copy with dict(entry) before editing")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore[assignment]
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return FrozenEntry({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def credential_source(
+    source: Any, alias: str
+) -> Optional[Callable[[], Optional[Dict[str, Any]]]]:
+    """Return a lazy ``CredentialManager`` base source scoped to ``alias``.
+
+    Stores without ``alias_document`` fall back to the full ``document()``.
+    """
+    if source is None:
+        return None
+    narrow = getattr(source, "alias_document", None)
+    if callable(narrow):
+        return lambda: narrow(alias)
+    return source.document
+
+
+def changed_ips(
+    previous: Mapping[str, Any], current: Mapping[str, Any]
+) -> Dict[str, Tuple[str, str]]:
+    """Return ``{alias: (old_ip, new_ip)}`` for rows whose address changed.
+
+    Removed aliases report an empty ``new_ip`` so address-keyed caches can drop
+    state for receivers that no longer exist in the configuration.
+    """
+    changes: Dict[str, Tuple[str, str]] = {}
+    for alias, raw in (previous or {}).items():
+        old_ip = str((raw or {}).get("ip") or "").strip() if isinstance(raw, Mapping) else ""
+        new_raw = (current or {}).get(alias)
+        new_ip = (
+            str((new_raw or {}).get("ip") or "").strip()
+            if isinstance(new_raw, Mapping)
+            else ""
+        )
+        if old_ip != new_ip:
+            changes[str(alias)] = (old_ip, new_ip)
+    for alias, raw in (current or {}).items():
+        if alias in (previous or {}) or not isinstance(raw, Mapping):
+            continue
+        new_ip = str(raw.get("ip") or "").strip()
+        if new_ip:
+            changes[str(alias)] = ("", new_ip)
+    return changes
+
+
+# Row fields CredentialManager reads from base.txt (plaintext opt-in only).
+CREDENTIAL_FIELDS: Tuple[str, ...] = ("lname", "passwd")
+
+
+def changed_fields(
+    previous: Mapping[str, Any], current: Mapping[str, Any], fields: Iterable[str]
+) -> List[str]:
+    """Return aliases whose value for any of ``fields`` differs between generations.
+
+    Added and removed rows count as changed when they carry one of the fields.
+    """
+    names = tuple(fields)
+    changed: List[str] = []
+    for alias in set(previous or {}) | set(current or {}):
+        old = (previous or {}).get(alias)
+        new = (current or {}).get(alias)
+        old = old if isinstance(old, Mapping) else {}
+        new = new if isinstance(new, Mapping) else {}
+        if any(old.get(name) != new.get(name) for name in names):
+            changed.append(str(alias))
+    return changed
 
 
 class STBStore:
-    def __init__(self, path: object = BASE_PATH) -> None:
+    def __init__(self, path: object = BASE_PATH, *, watch: Optional[str] = None) -> None:
         self.path = Path(path)
+        self._watcher = config_watch.create_watcher(self.path, watch)
+        if self._watcher is not None:
+            weakref.finalize(self, self._watcher.close)
         self._data: Dict[str, Any] = {}
         self._file_signature: Optional[tuple[int, int, int, int, int]] = None
         self._generation = 0
         self._external_reloads = 0
+        # (callback, watched row fields or None for every change)
+        self._listeners: List[Tuple[ChangeListener, Optional[FrozenSet[str]]]] = []
+        self._alias_index: Dict[str, str] = {}
+        self._alias_collisions: Dict[str, List[str]] = {}
+        self._effective: Dict[str, FrozenEntry] = {}
+        self._child_hosts: Dict[str, str] = {}
+        # alias -> (merged deferred fields, create)
+        self._pending: Dict[str, Tuple[Dict[str, Any], bool]] = {}
+        self._pending_updates = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        try:
+            coalesce_ms = float(os.getenv("JAMBOREE_BASE_COALESCE_MS", DEFAULT_COALESCE_MS))
+        except ValueError:
+            coalesce_ms = DEFAULT_COALESCE_MS
+        self._coalesce_s = max(coalesce_ms, 0.0) / 1000.0
+        self._write_counts = {
+            "updates": 0,
+            "deferred": 0,
+            "flushes": 0,
+            "coalesced": 0,
+            "patch_bytes": 0,
+            "bytes_written": 0,
+        }
         self.reload()
 
+    def add_change_listener(
+        self, callback: ChangeListener, *, fields: Optional[Iterable[str]] = None
+    ) -> None:
+        """Call ``callback(previous_stbs, current_stbs)`` on every new generation.
+
+        ``fields`` names the row fields the listener depends on; deferred
+        writes touching none of them update the row in place without a new
+        generation. Listeners run while the store lock is held, so they must be
+        cheap and must not block on other threads that may be waiting for the
+        store.
+        """
+        watched = frozenset(fields) if fields is not None else None
+        with _lock:
+            self._listeners = [
+                (cb, cb_fields) for cb, cb_fields in self._listeners if cb != callback
+            ]
+            self._listeners.append((callback, watched))
+
+    def remove_change_listener(self, callback: ChangeListener) -> None:
+        with _lock:
+            self._listeners = [
+                (cb, fields) for cb, fields in self._listeners if cb != callback
+            ]
+
+    def _watches_locked(self, fields: Iterable[str]) -> bool:
+        names = set(fields)
+        return any(watched is None or watched & names for _, watched in self._listeners)
+
+    def _notify_locked(self, previous: Mapping[str, Any]) -> None:
+        current = self._data.get("stbs", {})
+        for callback, _fields in list(self._listeners):
+            try:
+                callback(previous, current)
+            except Exception:
+                LOG.exception("STB configuration change listener failed")
+
     def _stat_signature(self) -> Optional[tuple[int, int, int, int, int]]:
         try:
             stat = self.path.stat()
@@ -61,20 +248,78 @@ class STBStore:
             int(stat.st_ctime_ns),
         )
 
+    def _rebuild_indexes_locked(self) -> None:
+        """Build per-generation lookup tables for the current document."""
+        index: Dict[str, str] = {}
+        collisions: Dict[str, List[str]] = {}
+        for alias in self._data.get("stbs", {}):
+            folded = str(alias).strip().casefold()
+            prior = index.get(folded)
+            if prior is None:
+                index[folded] = str(alias)
+                continue
+            collisions.setdefault(folded, [prior]).append(str(alias))
+        if collisions:
+            LOG.warning(
+                "case-insensitive alias collisions in %s: %s",
+                self.path,
+                sorted(sorted(names) for names in collisions.values()),
+            )
+        self._alias_index = index
+        self._alias_collisions = collisions
+
+        stbs = self._data.get("stbs", {})
+        effective: Dict[str, FrozenEntry] = {}
+        child_hosts: Dict[str, str] = {}
+        for alias, raw in stbs.items():
+            if not isinstance(raw, Mapping):
+                LOG.warning("ignoring non-object STB row %r in %s", alias, self.path)
+                continue
+            entry, host = self._effective_entry(str(alias), raw, stbs)
+            effective[alias] = _freeze(entry)
+            if host:
+                child_hosts[str(alias)] = host
+        self._effective = effective
+        self._child_hosts = child_hosts
+
+    def _refresh_entry_locked(self, alias: str) -> None:
+        """Recompute one existing row's effective entry after an in-place patch."""
+        stbs = self._data.get("stbs", {})
+        entry, host = self._effective_entry(alias, stbs[alias], stbs)
+        self._effective[alias] = _freeze(entry)
+        if host:
+            self._child_hosts[alias] = host
+        else:
+            self._child_hosts.pop(alias, None)
+
     def _read_locked(self) -> Dict[str, Any]:
+        previous = self._data.get("stbs", {})
         self._data = base_io.read_document(self.path)
         self._data.setdefault("stbs", {})
+        if self._pending:
+            # Keep not-yet-flushed deferred fields visible across a reload.
+            self._data = self._overlay(self._data, self._pending)
         self._file_signature = self._stat_signature()
         self._generation += 1
+        self._rebuild_indexes_locked()
+        self._notify_locked(previous)
         return self._data
 
-    def _record_local_write_locked(self, document: Dict[str, Any]) -> None:
+    def _record_local_write_locked(
+        self, document: Dict[str, Any], *, on_disk: bool = True
+    ) -> None:
+        previous = self._data.get("stbs", {})
         self._data = document
         self._data.setdefault("stbs", {})
-        self._file_signature = self._stat_signature()
+        if on_disk:
+            self._file_signature = self._stat_signature()
         self._generation += 1
+        self._rebuild_indexes_locked()
+        self._notify_locked(previous)
 
     def _refresh_if_changed_locked(self, *, force: bool = False) -> bool:
+        if not force and self._watcher is not None and not self._watcher.changed():
+            return False
         current = self._stat_signature()
         changed = current != self._file_signature
         if not force and not changed:
@@ -137,21 +382,14 @@ class STBStore:
             return None
         with _lock:
             self._refresh_if_changed_locked()
-            stbs = self._data.get("stbs", {})
             folded = requested.casefold()
-            matches = [
-                str(alias)
-                for alias in stbs
-                if str(alias).strip().casefold() == folded
-            ]
-            if not matches:
-                return None
-            if len(matches) != 1:
+            colliding = self._alias_collisions.get(folded)
+            if colliding:
                 raise ValueError(
                     "case-insensitive alias collision for "
-                    f"{requested!r}: {sorted(matches)!r}"
+                    f"{requested!r}: {sorted(colliding)!r}"
                 )
-            return matches[0]
+            return self._alias_index.get(folded)
 
     def _looks_like_child(self, name: str, entry: Mapping[str, Any]) -> bool:
         role = str(entry.get("role") or "").strip().lower()
@@ -192,64 +430,83 @@ class STBStore:
 
     @staticmethod
     def _normalized_child(raw: Mapping[str, Any], host_alias: str) -> Dict[str, Any]:
-        entry = copy.deepcopy(dict(raw))
+        entry = dict(raw)
         entry["host"] = host_alias
         entry["role"] = "joey"
         return entry
 
-    def get(self, name: str) -> Optional[Dict[str, Any]]:
+    def _effective_entry(
+        self, name: str, raw: Mapping[str, Any], stbs: Mapping[str, Any]
+    ) -> Tuple[Mapping[str, Any], Optional[str]]:
+        """Return ``(effective_row, host_alias_if_child)`` for one raw row."""
+        alias = str(name).strip()
+        role = str(raw.get("role") or "").strip().lower()
+        explicit_host = str(raw.get("host") or raw.get("master_stb") or "").strip()
+        explicit_child_role = role in _CHILD_ROLE_NAMES or bool(raw.get("master_stb"))
+        alias_child_like = bool(_CHILD_ALIAS_RE.search(alias)) or bool(
+            _CHILD_ALIAS_RE.search(str(raw.get("model") or ""))
+        )
+
+        # Explicitly modelled Joey/client rows should honor their configured host.
+        # This covers nested topologies such as a MoCA Joey whose saved host is a
+        # HopperPlus alias.
+        if explicit_child_role:
+            if explicit_host and explicit_host != alias and explicit_host in stbs:
+                return self._normalized_child(raw, explicit_host), explicit_host
+            inferred = self._infer_legacy_host(alias, raw, stbs)
+            if inferred:
+                return self._normalized_child(raw, inferred), inferred
+            return raw, None
+
+        # Legacy child rows frequently still say role=hopper. Prefer an exact host
+        # encoded in the alias over a stale/default host column. This is what
+        # distinguishes HOPPERPLUS-HOPPER3-PROD4 from a generic host=HOPPER3 value.
+        if alias_child_like:
+            inferred = self._infer_legacy_host(alias, raw, stbs)
+            if inferred:
+                return self._normalized_child(raw, inferred), inferred
+            if explicit_host and explicit_host != alias and explicit_host in stbs:
+                return self._normalized_child(raw, explicit_host), explicit_host
+            return raw, None
+
+        # Old settops UIs could populate host=HOPPER3 on every row. For an ordinary
+        # Hopper/Wally/XIP row that field is not topology; normalize the *runtime*
+        # view back to self-hosting while leaving base.txt untouched.
+        if explicit_host and explicit_host != alias:
+            entry = dict(raw)
+            entry["host"] = alias
+            return entry, None
+
+        return raw, None
+
+    def get(self, name: str) -> Optional[Mapping[str, Any]]:
+        """Return the read-only effective entry for an exact alias."""
         with _lock:
             self._refresh_if_changed_locked()
-            stbs = self._data.get("stbs", {})
-            raw = stbs.get(name)
-            if raw is None:
-                return None
-
-            alias = str(name).strip()
-            role = str(raw.get("role") or "").strip().lower()
-            explicit_host = str(raw.get("host") or raw.get("master_stb") or "").strip()
-            explicit_child_role = role in _CHILD_ROLE_NAMES or bool(raw.get("master_stb"))
-            alias_child_like = bool(_CHILD_ALIAS_RE.search(alias)) or bool(
-                _CHILD_ALIAS_RE.search(str(raw.get("model") or ""))
-            )
+            return self._effective.get(name)
 
-            # Explicitly modelled Joey/client rows should honor their configured host.
-            # This covers nested topologies such as a MoCA Joey whose saved host is a
-            # HopperPlus alias.
-            if explicit_child_role:
-                if explicit_host and explicit_host != alias and explicit_host in stbs:
-                    return self._normalized_child(raw, explicit_host)
-                inferred = self._infer_legacy_host(alias, raw, stbs)
-                if inferred:
-                    return self._normalized_child(raw, inferred)
-                return copy.deepcopy(raw)
-
-            # Legacy child rows frequently still say role=hopper. Prefer an exact host
-            # encoded in the alias over a stale/default host column. This is what
-            # distinguishes HOPPERPLUS-HOPPER3-PROD4 from a generic host=HOPPER3 value.
-            if alias_child_like:
-                inferred = self._infer_legacy_host(alias, raw, stbs)
-                if inferred:
-                    return self._normalized_child(raw, inferred)
-                if explicit_host and explicit_host != alias and explicit_host in stbs:
-                    return self._normalized_child(raw, explicit_host)
-                return copy.deepcopy(raw)
-
-            # Old settops UIs could populate host=HOPPER3 on every row. For an ordinary
-            # Hopper/Wally/XIP row that field is not topology; normalize the *runtime*
-            # view back to self-hosting while leaving base.txt untouched.
-            if explicit_host and explicit_host != alias:
-                entry = copy.deepcopy(raw)
-                entry["host"] = alias
-                return entry
-
-            return raw
+    def child_host(self, name: str) -> Optional[str]:
+        """Return the host alias for a Joey/client row, else ``None``."""
+        with _lock:
+            self._refresh_if_changed_locked()
+            return self._child_hosts.get(name)
 
     def document(self) -> Dict[str, Any]:
         with _lock:
             self._refresh_if_changed_locked()
             return copy.deepcopy(self._data)
 
+    def alias_document(self, name: str) -> Dict[str, Any]:
+        """Return a ``{"stbs": {name: entry}}`` view holding one frozen entry.
+
+        Credential lookups only need a single row; this avoids deep-copying the
+        whole configuration the way ``document()`` does.
+        """
+        with _lock:
+            self._refresh_if_changed_locked()
+            entry = self._effective.get(name)
+        return {"stbs": {name: entry} if entry is not None else {}}
+
     def status(self) -> Dict[str, Any]:
         """Return non-secret runtime/config continuity diagnostics."""
         with _lock:
@@ -259,19 +516,46 @@ class STBStore:
                 "exists": self.path.is_file(),
                 "generation": self._generation,
                 "external_reloads": self._external_reloads,
+                "watch": self._watcher.mode if self._watcher is not None else "stat",
                 "stbs": len(self._data.get("stbs", {})),
+                "writes": self.write_stats(),
             }
 
+    def macros(self) -> Dict[str, Any]:
+        """Return named keypress macros from the top-level ``macros`` table."""
+        with _lock:
+            self._refresh_if_changed_locked()
+            macros = self._data.get("macros")
+            return copy.deepcopy(dict(macros)) if isinstance(macros, Mapping) else {}
+
+    def save_macro(self, name: str, steps: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        requested = str(name or "").strip()
+        if not requested:
+            raise ValueError("macro name is required")
+        return self.save({"macros": {requested: [dict(step) for step in steps]}})
+
     def save(self, patch: Mapping[str, Any]) -> Dict[str, Any]:
         """Additively merge a partial document."""
         with _lock:
+            self._flush_locked()
             document = base_io.merge_document(self.path, patch or {})
             self._record_local_write_locked(document)
             return copy.deepcopy(self._data)
 
     def update_stb(
-        self, alias: str, fields: Mapping[str, Any], *, create: bool = True
+        self,
+        alias: str,
+        fields: Mapping[str, Any],
+        *,
+        create: bool = True,
+        defer: bool = False,
     ) -> Dict[str, Any]:
+        """Merge ``fields`` into one STB row.
+
+        With ``defer`` the change is visible immediately but persisted by the
+        next coalesced flush instead of a rewrite of its own, and only the
+        updated row is returned as ``{"stbs": {alias: row}}``.
+        """
         with _lock:
             requested = str(alias or "").strip()
             if not requested:
@@ -282,12 +566,137 @@ class STBStore:
             # canonicalization has resolved the alias.
             canonical = self.resolve_alias(requested)
             target_alias = canonical or requested
-            document = base_io.update_stb_fields(
-                self.path, target_alias, fields, create=create
+            if not isinstance(fields, Mapping):
+                raise TypeError("fields must be a mapping")
+            row = None
+            if defer:
+                row = self._defer_locked(target_alias, fields, create)
+            else:
+                self._flush_locked((target_alias, dict(fields), create))
+            self._write_counts["updates"] += 1
+            self._write_counts["patch_bytes"] += len(
+                json.dumps(dict(fields), ensure_ascii=False, default=str).encode("utf-8")
             )
-            self._record_local_write_locked(document)
+            if row is not None:
+                return {"stbs": {target_alias: copy.deepcopy(row)}}
             return copy.deepcopy(self._data)
 
+    @staticmethod
+    def _overlay(
+        document: Mapping[str, Any], patches: Mapping[str, Tuple[Dict[str, Any], bool]]
+    ) -> Dict[str, Any]:
+        """Return ``document`` with deferred row patches applied, sharing other rows."""
+        merged = dict(document)
+        stbs = dict(merged.get("stbs") or {})
+        for alias, (fields, create) in patches.items():
+            if alias not in stbs and not create:
+                continue
+            current = stbs.get(alias)
+            row = copy.deepcopy(current) if isinstance(current, dict) else {}
+            base_io.deep_merge(row, copy.deepcopy(fields))
+            stbs[alias] = row
+        merged["stbs"] = stbs
+        return merged
+
+    def _defer_locked(
+        self, alias: str, fields: Mapping[str, Any], create: bool
+    ) -> Dict[str, Any]:
+        stbs = self._data.get("stbs", {})
+        if alias not in stbs and not create:
+            raise KeyError(f"alias {alias!r} not present in {self.path}")
+        patch = copy.deepcopy(dict(fields))
+        queued = self._pending.get(alias)
+        if queued is not None:
+            base_io.deep_merge(queued[0], patch)
+            self._pending[alias] = (queued[0], queued[1] or create)
+        else:
+            self._pending[alias] = (patch, create)
+        self._pending_updates += 1
+        self._write_counts["deferred"] += 1
+        self._schedule_flush_locked(self._coalesce_s)
+        current = stbs.get(alias)
+        row = copy.deepcopy(current) if isinstance(current, dict) else {}
+        base_io.deep_merge(row, copy.deepcopy(patch))
+        if alias not in stbs or _TOPOLOGY_FIELDS & patch.keys() or self._watches_locked(patch):
+            # A new alias or a topology field can change other rows' effective
+            # entries, and listeners diff whole generations, so these still
+            # publish a new one.
+            document = dict(self._data)
+            document["stbs"] = {**stbs, alias: row}
+            self._record_local_write_locked(document, on_disk=False)
+        else:
+            stbs[alias] = row
+            self._refresh_entry_locked(alias)
+        return row
+
+    def _schedule_flush_locked(self, delay_s: float) -> None:
+        if self._flush_timer is not None:
+            return
+        timer = threading.Timer(delay_s, self._flush_from_timer)
+        timer.name = "STBStore-flush"
+        timer.daemon = True
+        self._flush_timer = timer
+        timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with _lock:
+            if self._flush_timer is threading.current_thread():
+                self._flush_timer = None
+            try:
+                self._flush_locked()
+            except Exception:
+                LOG.exception("deferred base.txt flush failed; retrying in %.0fs", FLUSH_RETRY_S)
+                self._schedule_flush_locked(FLUSH_RETRY_S)
+
+    def _flush_locked(
+        self, extra: Optional[Tuple[str, Dict[str, Any], bool]] = None
+    ) -> bool:
+        """Persist deferred patches (plus ``extra``) with one rewrite."""
+        batch = [(alias, fields, create) for alias, (fields, create) in self._pending.items()]
+        if extra is not None:
+            batch.append(extra)
+        if not batch:
+            return False
+        before = base_io.write_stats()["bytes_written"]
+        document, missing = base_io.update_stb_batch(self.path, batch)
+        deferred = set(self._pending)
+        logical = self._pending_updates + (1 if extra is not None else 0)
+        self._pending = {}
+        self._pending_updates = 0
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._write_counts["flushes"] += 1
+        self._write_counts["coalesced"] += logical - 1
+        self._write_counts["bytes_written"] += base_io.write_stats()["bytes_written"] - before
+        self._record_local_write_locked(document)
+        dropped = sorted(deferred.intersection(missing))
+        if dropped:
+            LOG.warning("dropped deferred updates for removed aliases: %s", dropped)
+        if extra is not None and extra[0] in missing:
+            raise KeyError(f"alias {extra[0]!r} not present in {self.path}")
+        return True
+
+    def flush(self) -> bool:
+        """Persist pending deferred updates now; return ``True`` if any were written."""
+        with _lock:
+            return self._flush_locked()
+
+    def write_stats(self) -> Dict[str, Any]:
+        """Return logical vs physical write counters for this store."""
+        with _lock:
+            counts = dict(self._write_counts)
+            counts["pending"] = len(self._pending)
+        counts["rewrites_per_update"] = (
+            round(counts["flushes"] / counts["updates"], 3) if counts["updates"] else None
+        )
+        counts["write_amplification"] = (
+            round(counts["bytes_written"] / counts["patch_bytes"], 1)
+            if counts["patch_bytes"]
+            else None
+        )
+        return counts
+
     def replace_stbs(
         self,
         stbs: Mapping[str, Mapping[str, Any]],
@@ -296,6 +705,7 @@ class STBStore:
     ) -> Dict[str, Any]:
         with _lock:
             self._validate_alias_table(stbs)
+            self._flush_locked()
             document = base_io.replace_stb_table(
                 self.path, stbs, allow_delete=allow_delete
             )
@@ -304,6 +714,7 @@ class STBStore:
 
     def remove(self, aliases: Iterable[str]) -> Dict[str, Any]:
         with _lock:
+            self._flush_locked()
             document = base_io.prune_aliases(self.path, aliases)
             self._record_local_write_locked(document)
             return copy.deepcopy(self._data)
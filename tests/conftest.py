@@ -7,6 +7,8 @@ import tempfile
 import types
 from pathlib import Path
 
+import pytest
+
 BASE_DIR = Path(tempfile.mkdtemp(prefix="jamboree-tests-"))
 BASE_PATH = BASE_DIR / "base.txt"
 BASE_PATH.write_text(json.dumps({"stbs": {}}), encoding="utf-8")
@@ -87,3 +89,31 @@ except ImportError:
     keyring_mod.delete_password = delete_password
     keyring_mod.errors = errors
     sys.modules["keyring"] = keyring_mod
+
+
+@pytest.fixture
+def pairing_frame():
+    """Factory for synthetic 1080p pairing screens with the PIN in a centred dialog.
+
+    ``banner`` adds a second PIN line near the bottom edge, ``seed`` adds
+    capture noise and ``jpeg_quality`` round-trips the frame through JPEG like
+    a capture card stream.
+    """
+    import cv2
+    import numpy as np
+
+    def make(pin="482913", *, banner=None, seed=None, jpeg_quality=None):
+        frame = np.full((1080, 1920, 3), 24, dtype=np.uint8)
+        cv2.rectangle(frame, (480, 324), (1440, 756), (70, 70, 70), -1)
+        cv2.putText(frame, f"Pairing code {pin}", (560, 560), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (240,) * 3, 4)
+        if banner:
+            cv2.putText(frame, banner, (200, 1000), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (240,) * 3, 3)
+        if seed is not None:
+            noise = np.random.default_rng(seed).normal(0, 6, frame.shape)
+            frame = np.clip(frame + noise, 0, 255).astype(np.uint8)
+        if jpeg_quality is not None:
+            encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)])[1]
+            frame = cv2.imdecode(encoded, 1)
+        return frame
+
+    return make
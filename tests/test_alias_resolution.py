@@ -148,3 +148,35 @@ def test_controller_uses_canonical_alias_for_mixed_case_auto_request(monkeypatch
         ("HOPPER3-PROD", "192.168.1.67", "R1956395067-79", "Guide", 240)
     ]
     assert successes == ["HOPPER3-PROD"]
+
+
+def test_alias_index_is_rebuilt_once_per_generation(tmp_path):
+    path = tmp_path / "base.txt"
+    _write_base(path, {"HOPPER3-PROD": {"ip": "192.168.1.10", "stb": "R1"}})
+    store = STBStore(path)
+    index = store._alias_index
+    for _ in range(5):
+        assert store.resolve_alias("hopper3-prod") == "HOPPER3-PROD"
+    assert store._alias_index is index
+
+    store.update_stb("Joey-Kitchen", {"ip": "192.168.1.11"})
+    assert store._alias_index is not index
+    assert store.resolve_alias("JOEY-KITCHEN") == "Joey-Kitchen"
+    assert store.resolve_alias("missing") is None
+
+
+def test_collisions_are_detected_at_load_without_hiding_other_aliases(tmp_path):
+    path = tmp_path / "base.txt"
+    _write_base(
+        path,
+        {
+            "XIP813-PROD": {"ip": "192.168.1.59"},
+            "XIP813-Prod": {"ip": "192.168.1.59"},
+            "HOPPER3-PROD": {"ip": "192.168.1.10"},
+        },
+    )
+    store = STBStore(path)
+    assert sorted(store._alias_collisions["xip813-prod"]) == ["XIP813-PROD", "XIP813-Prod"]
+    assert store.resolve_alias("hopper3-prod") == "HOPPER3-PROD"
+    with pytest.raises(ValueError, match="case-insensitive alias collision"):
+        store.resolve_alias("XIP813-PROD")
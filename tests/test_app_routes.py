@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import os
 
 import pytest
@@ -50,7 +51,14 @@ def test_health_exposes_process_and_config_continuity_metadata():
     assert data["config"]["external_reloads"] >= 0
 
 
-def test_recovery_status_route_exists():
+def test_recovery_status_route_exists(monkeypatch):
+    from jamboree import ip_recovery
+
+    # The status route refreshes identity verdicts in the background; keep
+    # that off the network.
+    cache = ip_recovery.IdentityCache()
+    monkeypatch.setattr(cache, "refresh_async", lambda _ip, _rxid: False)
+    monkeypatch.setattr(ip_recovery, "identity_cache", cache)
     client = app_module.app.test_client()
     response = client.get("/api/ip_recovery/status")
     assert response.status_code == 200
@@ -171,3 +179,56 @@ def test_safe_sgs_status_compatibility_routes(monkeypatch):
     assert data["paired"] is True
     assert data["secure_backend"] == "windows-dpapi-machine"
     assert "secret" not in repr(data).lower()
+
+
+def test_health_exposes_sgs_session_pool_stats():
+    client = app_module.app.test_client()
+    data = client.get("/api/health").get_json()
+    pool = data["sgs"]["pool"]
+    assert {"receivers", "sessions_created", "sessions_reused", "evicted"} <= set(pool)
+
+
+def test_health_exposes_cached_receiver_identity():
+    client = app_module.app.test_client()
+    receiver = client.get("/api/health").get_json()["receiver"]
+    assert receiver["receiver_id"].startswith("XAF")
+    assert {"mac", "computed_ts", "computations", "stale", "watcher"} <= set(receiver)
+
+
+def test_auto_batch_route_validates_and_dispatches(monkeypatch):
+    client = app_module.app.test_client()
+    assert client.post("/auto/batch", json={"button": "guide"}).status_code == 400
+    calls = []
+    monkeypatch.setattr(
+        app_module.ctl,
+        "handle_auto_batch",
+        lambda aliases, button, delay, **kwargs: calls.append((aliases, button, delay, kwargs))
+        or {"ok": True, "results": {}},
+    )
+    response = client.post(
+        "/auto/batch",
+        json={"stbs": ["A", "B"], "button": "guide", "delay": 250, "allow_rf_fallback": False},
+    )
+    assert response.status_code == 200
+    assert calls == [
+        (["A", "B"], "guide", 250, {"force": None, "allow_rf_fallback": False, "recover_ip": True})
+    ]
+
+
+def test_sequence_route_streams_ndjson_progress(monkeypatch):
+    app_module.store.update_stb("SEQ", {"protocol": "RF", "remote": "3"})
+    monkeypatch.setattr(
+        app_module.ctl,
+        "handle_auto_remote",
+        lambda _remote, alias, button, delay, **_kwargs: {"via": "rf"},
+    )
+    client = app_module.app.test_client()
+    assert client.post("/sequence/SEQ", json={}).status_code == 400
+    response = client.post(
+        "/sequence/SEQ?stream=1",
+        json={"steps": [{"button": "guide", "hold_ms": 10}, {"button": "ok", "hold_ms": 10}]},
+    )
+    assert response.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [e["event"] for e in events] == ["start", "step", "step", "end"]
+    assert events[-1]["ok"] is True
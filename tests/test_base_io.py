@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
 
 import pytest
@@ -76,3 +77,141 @@ def test_lock_timeout_fails_closed(tmp_path: Path, monkeypatch):
     entered = lock.__enter__()
     assert entered._locked is True
     lock.__exit__(None, None, None)
+
+
+def test_update_stb_batch_applies_patches_with_one_rewrite(tmp_path: Path):
+    path = tmp_path / "base.txt"
+    path.write_text('{"stbs":{"H":{"ip":"10.0.0.1"}}}', encoding="utf-8")
+    before = base_io.write_stats()["rewrites"]
+    document, missing = base_io.update_stb_batch(
+        path,
+        [
+            ("H", {"mac": "88:b6:ee:de:58:cc"}, False),
+            ("GONE", {"ip": "10.0.0.9"}, False),
+            ("H", {"ip": "10.0.0.2"}, False),
+            ("NEW", {"ip": "10.0.0.3"}, True),
+        ],
+    )
+    assert missing == ["GONE"]
+    assert base_io.write_stats()["rewrites"] == before + 1
+    on_disk = json.loads(path.read_text())["stbs"]
+    assert on_disk == document["stbs"]
+    assert on_disk["H"] == {"ip": "10.0.0.2", "mac": "88:b6:ee:de:58:cc"}
+    assert "GONE" not in on_disk and on_disk["NEW"]["ip"] == "10.0.0.3"
+
+
+def test_deferred_store_updates_coalesce_into_one_rewrite(tmp_path: Path, monkeypatch):
+    from jamboree.stb_store import STBStore
+
+    monkeypatch.setenv("JAMBOREE_BASE_COALESCE_MS", "60000")
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"A": {"ip": "10.0.0.1"}, "B": {"ip": "10.0.0.2"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    before = base_io.write_stats()["rewrites"]
+
+    for index in range(10):
+        store.update_stb("A", {"seen": index}, create=False, defer=True)
+    store.update_stb("B", {"mac": "88:b6:ee:de:58:cc"}, create=False, defer=True)
+    assert store.get("A")["seen"] == 9
+    assert "seen" not in json.loads(path.read_text())["stbs"]["A"]
+    assert base_io.write_stats()["rewrites"] == before
+    with pytest.raises(KeyError):
+        store.update_stb("MISSING", {"ip": "10.0.0.9"}, create=False, defer=True)
+
+    # A synchronous write carries the pending deferred fields in its rewrite.
+    store.update_stb("B", {"ip": "10.0.0.22"})
+    assert base_io.write_stats()["rewrites"] == before + 1
+    on_disk = json.loads(path.read_text())["stbs"]
+    assert on_disk["A"]["seen"] == 9
+    assert on_disk["B"] == {"ip": "10.0.0.22", "mac": "88:b6:ee:de:58:cc"}
+    stats = store.write_stats()
+    assert (stats["updates"], stats["deferred"], stats["flushes"]) == (12, 11, 1)
+    assert stats["coalesced"] == 11 and stats["pending"] == 0
+    assert stats["write_amplification"] > 1
+    assert store.flush() is False
+
+
+def test_deferred_updates_survive_external_reload_until_flushed(tmp_path: Path, monkeypatch):
+    from jamboree.stb_store import STBStore
+
+    monkeypatch.setenv("JAMBOREE_BASE_COALESCE_MS", "60000")
+    path = tmp_path / "base.txt"
+    path.write_text('{"stbs":{"A":{"ip":"10.0.0.1"}}}', encoding="utf-8")
+    store = STBStore(path, watch="stat")
+    store.update_stb("A", {"sgs_endpoint": "http:80"}, create=False, defer=True)
+
+    base_io.update_stb_fields(path, "A", {"remote": "3"})
+    store.refresh_if_changed(force=True)
+    assert store.get("A")["remote"] == "3"
+    assert store.get("A")["sgs_endpoint"] == "http:80"
+
+    assert store.flush() is True
+    on_disk = json.loads(path.read_text())["stbs"]["A"]
+    assert on_disk == {"ip": "10.0.0.1", "remote": "3", "sgs_endpoint": "http:80"}
+
+
+def test_deferred_flush_timer_persists_without_other_writes(tmp_path: Path, monkeypatch):
+    from jamboree.stb_store import STBStore
+
+    monkeypatch.setenv("JAMBOREE_BASE_COALESCE_MS", "20")
+    path = tmp_path / "base.txt"
+    path.write_text('{"stbs":{"A":{"ip":"10.0.0.1"}}}', encoding="utf-8")
+    store = STBStore(path)
+    store.update_stb("A", {"mac": "88:b6:ee:de:58:cc"}, create=False, defer=True)
+    for _ in range(200):
+        if store.write_stats()["pending"] == 0:
+            break
+        time.sleep(0.01)
+    assert json.loads(path.read_text())["stbs"]["A"]["mac"] == "88:b6:ee:de:58:cc"
+
+
+def test_deferred_metadata_patch_touches_one_row_without_a_new_generation(tmp_path: Path, monkeypatch):
+    from jamboree.stb_store import STBStore
+
+    monkeypatch.setenv("JAMBOREE_BASE_COALESCE_MS", "60000")
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"A": {"ip": "10.0.0.1"}, "B": {"ip": "10.0.0.2"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    seen = []
+    store.add_change_listener(lambda prev, cur: seen.append(dict(cur)), fields=("ip",))
+    generation = store.status()["generation"]
+    index, other = store._alias_index, store.get("B")
+
+    result = store.update_stb("A", {"mac": "88:b6:ee:de:58:cc"}, create=False, defer=True)
+    assert result == {"stbs": {"A": {"ip": "10.0.0.1", "mac": "88:b6:ee:de:58:cc"}}}
+    assert store.get("A")["mac"] == "88:b6:ee:de:58:cc"
+    assert store.get("B") is other and store._alias_index is index
+    assert store.status()["generation"] == generation and seen == []
+
+    store.update_stb("A", {"ip": "10.0.0.9"}, create=False, defer=True)
+    assert store.status()["generation"] == generation + 1
+    assert seen[-1]["A"] == {"ip": "10.0.0.9", "mac": "88:b6:ee:de:58:cc"}
+    store.flush()
+    assert json.loads(path.read_text())["stbs"]["A"]["mac"] == "88:b6:ee:de:58:cc"
+
+
+def test_deferred_topology_patch_rebuilds_every_row(tmp_path: Path, monkeypatch):
+    from jamboree.stb_store import STBStore
+
+    monkeypatch.setenv("JAMBOREE_BASE_COALESCE_MS", "60000")
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps(
+            {"stbs": {"H": {"ip": "10.0.0.1"}, "J": {"ip": "10.0.0.2", "role": "joey"}}}
+        ),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    generation = store.status()["generation"]
+    assert store.get("J")["role"] == "joey" and "host" not in store.get("J")
+
+    store.update_stb("J", {"host": "H"}, create=False, defer=True)
+    assert store.status()["generation"] == generation + 1
+    assert store.get("J")["host"] == "H"
+    assert store._child_hosts == {"J": "H"}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+
+import pytest
+
+from jamboree import base_io, config_watch
+from jamboree.stb_store import STBStore
+
+
+def _write(path, ip):
+    path.write_text(json.dumps({"stbs": {"A": {"ip": ip}}}), encoding="utf-8")
+
+
+def _count_stats(monkeypatch, store):
+    calls = []
+    real = store._stat_signature
+    monkeypatch.setattr(store, "_stat_signature", lambda: calls.append(1) or real())
+    return calls
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_reads_skip_stat_until_the_file_changes(monkeypatch, tmp_path):
+    path = tmp_path / "base.txt"
+    _write(path, "10.0.0.1")
+    store = STBStore(path, watch="inotify")
+    assert store.status()["watch"] == "inotify"
+    stats = _count_stats(monkeypatch, store)
+
+    for _ in range(50):
+        assert store.get("A")["ip"] == "10.0.0.1"
+        store.resolve_alias("a")
+    assert stats == []
+
+    (tmp_path / "unrelated.txt").write_text("x", encoding="utf-8")
+    store.all()
+    assert stats == []
+
+    base_io.update_stb_fields(path, "A", {"ip": "10.0.0.44"})
+    assert store.get("A")["ip"] == "10.0.0.44"
+    assert store.status()["external_reloads"] == 1
+
+
+def test_polling_watcher_bounds_stat_frequency(monkeypatch, tmp_path):
+    monkeypatch.setenv("JAMBOREE_CONFIG_POLL_S", "0.05")
+    path = tmp_path / "base.txt"
+    _write(path, "10.0.0.1")
+    store = STBStore(path, watch="poll")
+    stats = _count_stats(monkeypatch, store)
+
+    base_io.update_stb_fields(path, "A", {"ip": "10.0.0.2"})
+    assert store.get("A")["ip"] == "10.0.0.1"  # within the poll interval
+    assert stats == []
+    time.sleep(0.06)
+    assert store.get("A")["ip"] == "10.0.0.2"
+    after_reload = len(stats)
+    assert after_reload > 0
+    for _ in range(20):
+        store.get("A")
+    assert len(stats) == after_reload
+
+
+def test_forced_refresh_bypasses_the_watcher(tmp_path):
+    path = tmp_path / "base.txt"
+    _write(path, "10.0.0.1")
+    store = STBStore(path, watch="poll")
+    base_io.update_stb_fields(path, "A", {"ip": "10.0.0.9"})
+    assert store.refresh_if_changed(force=True) is True
+    assert store.get("A")["ip"] == "10.0.0.9"
+
+
+def test_stat_mode_has_no_watcher(tmp_path):
+    assert config_watch.create_watcher(tmp_path / "base.txt", "stat") is None
+
+
+def test_auto_mode_polls_on_network_filesystems(monkeypatch, tmp_path):
+    path = tmp_path / "base.txt"
+    _write(path, "10.0.0.1")
+    assert config_watch.network_filesystem(path) is None
+
+    monkeypatch.setattr(config_watch, "_fs_magic", lambda _directory: 0x6969)
+    assert config_watch.network_filesystem(path) == "nfs"
+    assert config_watch.create_watcher(path, "auto").mode == "poll"
+    store = STBStore(path)
+    assert store.status()["watch"] == "poll"
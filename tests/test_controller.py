@@ -130,3 +130,69 @@ def test_invalid_protocol_fails_closed(monkeypatch):
     ctl = controller_module.Controller()
     with pytest.raises(ValueError, match="unsupported protocol"):
         ctl.handle_auto_remote("1", "A", "guide", 120)
+
+
+def _batch_store(monkeypatch):
+    store = FakeStore(
+        {
+            "H1": {"ip": "10.0.0.1", "stb": "R1", "protocol": "SGS", "remote": "1", "role": "hopper"},
+            "J1": {"ip": "10.0.0.9", "stb": "R2", "protocol": "SGS", "remote": "2", "role": "joey", "host": "H1"},
+            "H2": {"ip": "10.0.0.2", "stb": "R3", "protocol": "SGS", "remote": "3", "role": "hopper"},
+            "R1": {"protocol": "RF", "remote": "4", "com_port": "COM1"},
+            "R2": {"protocol": "RF", "remote": "5", "com_port": "COM1"},
+        }
+    )
+    monkeypatch.setattr(controller_module, "store", store)
+    monkeypatch.setattr(ip_recovery, "note_sgs_success", lambda _a: None)
+    return store
+
+
+def test_auto_batch_groups_sgs_by_receiver_and_coalesces_rf(monkeypatch):
+    import threading
+
+    _batch_store(monkeypatch)
+    sgs_calls = []
+    barrier = threading.Barrier(2, timeout=2)
+
+    def send(name, ip, *_args, **_kwargs):
+        sgs_calls.append((name, ip))
+        if name in {"H1", "H2"}:
+            barrier.wait()  # the two receivers are driven concurrently
+        return '{"result":1}'
+
+    rf_writes = []
+    monkeypatch.setattr(controller_module, "send_sgs", send)
+    monkeypatch.setattr(
+        controller_module,
+        "send_rf_many",
+        lambda alias, presses: rf_writes.append(list(presses))
+        or [f"{remote} 83 03 120" for remote, _b, _d in presses],
+    )
+
+    result = controller_module.Controller().handle_auto_batch(
+        ["H1", "J1", "H2", "R1", "R2", "missing"], "guide", 120
+    )
+
+    assert result["ok"] is False
+    assert result["results"]["missing"]["ok"] is False
+    assert all(result["results"][a]["ok"] for a in ("H1", "J1", "H2", "R1", "R2"))
+    assert rf_writes == [[("4", "guide", 120), ("5", "guide", 120)]]
+    assert result["results"]["R2"]["rf_line"] == "5 83 03 120"
+    groups = {tuple(g["aliases"]) for g in result["groups"]}
+    assert groups == {("H1", "J1"), ("H2",), ("R1", "R2")}
+    # Joey J1 is sent through its host's receiver after H1, in the same group.
+    assert [ip for name, ip in sgs_calls if name in {"H1", "J1"}] == ["10.0.0.1", "10.0.0.9"]
+    assert "start_offset_ms" in result["results"]["H2"]
+    assert result["skew_ms"] >= 0
+
+
+def test_auto_batch_reports_per_alias_failures(monkeypatch):
+    _batch_store(monkeypatch)
+    monkeypatch.setattr(
+        controller_module,
+        "send_rf_many",
+        lambda *_a, **_k: (_ for _ in ()).throw(RuntimeError("DART port for 'R1' is not open/ready and writable")),
+    )
+    result = controller_module.Controller().handle_auto_batch(["R1", "R2"], "guide", 120)
+    assert result["ok"] is False
+    assert "not open/ready" in result["results"]["R2"]["error"]
@@ -119,3 +119,117 @@ def test_plaintext_opt_in_is_not_reported_as_secure_backend(monkeypatch):
     assert status["stored"] is True
     assert status["secure"] is False
     assert status["backend"] is None
+
+
+class CountingKeyring:
+    def __init__(self):
+        self.values = {}
+        self.reads = 0
+
+    def set_password(self, service, key, value):
+        self.values[(service, key)] = value
+
+    def get_password(self, service, key):
+        self.reads += 1
+        return self.values.get((service, key))
+
+    def delete_password(self, service, key):
+        self.values.pop((service, key), None)
+
+
+def test_credential_cache_serves_repeat_reads_without_keyring(monkeypatch):
+    backend = CountingKeyring()
+    monkeypatch.setattr(credentials_module, "keyring", backend)
+    monkeypatch.setattr(credentials_module, "_is_windows", lambda: False)
+    assert CredentialManager.store_credentials("Cached", "user", "secret")
+    backend.reads = 0
+    documents = []
+
+    def document():
+        documents.append(1)
+        return {"stbs": {}}
+
+    for _ in range(5):
+        assert CredentialManager.get_credentials("Cached", document) == ("user", "secret")
+    assert backend.reads == 2
+    assert len(documents) == 1
+
+
+def test_store_and_clear_invalidate_cached_credentials(monkeypatch):
+    backend = CountingKeyring()
+    monkeypatch.setattr(credentials_module, "keyring", backend)
+    monkeypatch.setattr(credentials_module, "_is_windows", lambda: False)
+    assert CredentialManager.get_credentials("Rotated") == (None, None)
+
+    assert CredentialManager.store_credentials("Rotated", "user", "first")
+    assert CredentialManager.get_credentials("Rotated") == ("user", "first")
+    assert CredentialManager.store_credentials("Rotated", "user", "second")
+    assert CredentialManager.get_credentials("Rotated") == ("user", "second")
+
+    assert CredentialManager.clear_credentials("Rotated")
+    assert CredentialManager.get_credentials("Rotated") == (None, None)
+
+
+def test_read_racing_a_store_does_not_recache_stale_credentials(monkeypatch):
+    backend = CountingKeyring()
+    monkeypatch.setattr(credentials_module, "keyring", backend)
+    monkeypatch.setattr(credentials_module, "_is_windows", lambda: False)
+    assert CredentialManager.store_credentials("Racy", "user", "old")
+    CredentialManager.invalidate_cache("Racy")
+    read = CredentialManager._get_with_backend
+
+    def slow_read(alias, document=None):
+        result = read(alias, document)
+        # Re-pairing finishes while this reader holds the old secret.
+        assert CredentialManager.store_credentials("Racy", "user", "new")
+        return result
+
+    monkeypatch.setattr(CredentialManager, "_get_with_backend", staticmethod(slow_read))
+    assert CredentialManager.get_credentials("Racy") == ("user", "old")
+    monkeypatch.setattr(CredentialManager, "_get_with_backend", staticmethod(read))
+    assert CredentialManager.get_credentials("Racy") == ("user", "new")
+
+
+def test_status_rereads_backend_instead_of_trusting_cache(monkeypatch):
+    backend = CountingKeyring()
+    monkeypatch.setattr(credentials_module, "keyring", backend)
+    monkeypatch.setattr(credentials_module, "_is_windows", lambda: False)
+    assert CredentialManager.store_credentials("External", "user", "secret")
+    assert CredentialManager.get_credentials("External") == ("user", "secret")
+
+    # Another process removes the keyring entry behind our back.
+    backend.values.clear()
+    assert CredentialManager.status("External")["stored"] is False
+    assert CredentialManager.get_credentials("External") == (None, None)
+
+
+def test_plaintext_fallback_reads_one_alias_without_copying_document(monkeypatch, tmp_path):
+    from jamboree.stb_store import STBStore, credential_source
+
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps(
+            {
+                "stbs": {
+                    "Plain": {"ip": "10.0.0.5", "lname": "user", "passwd": "secret"},
+                    "Other": {"ip": "10.0.0.6"},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    monkeypatch.setattr(credentials_module, "keyring", None)
+    monkeypatch.setattr(credentials_module, "_is_windows", lambda: False)
+    monkeypatch.setenv("JAMBOREE_ALLOW_PLAINTEXT_CREDENTIALS", "1")
+
+    def full_copy():
+        raise AssertionError("credential lookup deep-copied the whole document")
+
+    monkeypatch.setattr(store, "document", full_copy)
+
+    source = credential_source(store, "Plain")
+    assert list(source()["stbs"]) == ["Plain"]
+    assert source()["stbs"]["Plain"] is store.get("Plain")
+    assert CredentialManager.status("Plain", source)["password_present"] is True
+    assert credential_source(None, "Plain") is None
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from jamboree import dart_scheduler
+from jamboree import controller as controller_module
+
+
+@pytest.fixture
+def wire(monkeypatch):
+    writes = []
+    lock = threading.Lock()
+
+    def write_line(alias, line, *, strict=True):
+        with lock:
+            writes.append((time.monotonic(), alias, line.strip()))
+        return line.rstrip()
+
+    monkeypatch.setattr(dart_scheduler.serial_bridge, "write_line", write_line)
+    monkeypatch.setattr(dart_scheduler, "RELEASE_PAD_MS", 0)
+    scheduler = dart_scheduler.PressScheduler()
+    yield scheduler, writes
+    scheduler.stop_all()
+
+
+def test_press_returns_before_hold_and_releases_later(wire):
+    scheduler, writes = wire
+    started = time.monotonic()
+    receipt = scheduler.press("A", "1", "guide", 120)
+    assert time.monotonic() - started < 0.05
+    assert not receipt.done.is_set()
+    assert receipt.wait(2)
+    assert receipt.ok is True
+    assert [line for _t, _a, line in writes] == ["1 83 03 120"]
+    assert receipt.as_dict()["state"] == "released"
+    assert receipt.as_dict()["held_ms"] >= 100
+
+
+def test_same_remote_is_serialized_but_other_remotes_interleave(wire):
+    scheduler, writes = wire
+    first = scheduler.press("A", "1", "guide", 150)
+    second = scheduler.press("A", "1", "guide", 80)
+    other = scheduler.press("A", "2", "guide", 80)
+    for receipt in (first, second, other):
+        assert receipt.wait(2)
+    times = {line: t for t, _a, line in writes}
+    assert times["1 83 03 80"] - times["1 83 03 150"] >= 0.14
+    assert times["2 83 03 80"] - times["1 83 03 150"] < 0.1
+    assert second.scheduled_delay_ms >= 140
+
+
+def test_same_remote_waits_for_previous_write_to_complete(monkeypatch, wire):
+    scheduler, writes = wire
+    real = dart_scheduler.serial_bridge.write_line
+    finished = {}
+
+    def slow(alias, line, *, strict=True):
+        result = real(alias, line, strict=strict)
+        if line.startswith("1 83 03 80"):
+            time.sleep(0.2)        # port thread runs late past the hold
+        finished.setdefault(line.strip(), time.monotonic())
+        return result
+
+    monkeypatch.setattr(dart_scheduler.serial_bridge, "write_line", slow)
+    first = scheduler.press("A", "1", "guide", 80)
+    second = scheduler.press("A", "1", "guide", 90)
+    assert first.wait(2) and second.wait(2)
+    times = {line: t for t, _a, line in writes}
+    assert times["1 83 03 90"] - finished["1 83 03 80"] >= 0.08
+    assert second.started >= first.released
+
+
+def test_scheduled_press_uses_firmware_ack_mode(monkeypatch, wire):
+    scheduler, writes = wire
+    acked = []
+
+    class Receipt:
+        ok = True
+        latency_s = 0.1
+        error = None
+
+    def write_with_ack(alias, data, **kwargs):
+        acked.append((data.decode().strip(), kwargs["remote"], tuple(kwargs["keys"])))
+        return Receipt()
+
+    monkeypatch.setenv("JAMBOREE_DART_ACK", "1")
+    monkeypatch.setattr(dart_scheduler.serial_bridge.serial_mgr, "write_with_ack", write_with_ack)
+    receipt = scheduler.press("A", "1", "guide", 120)
+    assert receipt.wait(2) and receipt.ok
+    assert acked == [("1 83 03 120", 1, (0x83, 0x03))]
+    assert writes == []
+
+
+def test_sequence_failure_skips_steps_but_sends_cleanup(monkeypatch, wire):
+    scheduler, writes = wire
+    real = dart_scheduler.serial_bridge.write_line
+
+    def flaky(alias, line, *, strict=True):
+        if line.startswith("1 22 up"):
+            raise RuntimeError("DART port for 'A' is not open/ready and writable")
+        return real(alias, line, strict=strict)
+
+    monkeypatch.setattr(dart_scheduler.serial_bridge, "write_line", flaky)
+    receipt = scheduler.sequence(
+        "A",
+        "1",
+        [(0, "1 22 down\n"), (20, "1 22 up\n"), (40, "1 4 down\n")],
+        hold_ms=10,
+        cleanup="1 86 allup\n",
+    )
+    assert receipt.wait(2)
+    assert receipt.ok is False
+    assert "not open/ready" in receipt.error
+    assert [line for _t, _a, line in writes] == ["1 22 down", "1 86 allup"]
+
+
+class FakeStore:
+    def __init__(self):
+        self.entries = {
+            "A": {"remote": "1", "com_port": "COM1", "protocol": "RF"},
+            "B": {"remote": "2", "com_port": "COM1", "protocol": "RF"},
+        }
+
+    def get(self, alias):
+        return self.entries.get(alias)
+
+    def all(self):
+        return self.entries
+
+    def document(self):
+        return {"stbs": self.entries}
+
+
+def test_controller_bulk_fans_out_without_blocking(monkeypatch, wire):
+    scheduler, writes = wire
+    monkeypatch.setattr(controller_module, "store", FakeStore())
+    monkeypatch.setattr(controller_module, "press_scheduler", scheduler)
+    ctl = controller_module.Controller()
+
+    started = time.monotonic()
+    result = ctl.press_bulk(
+        [
+            {"stb": "A", "button": "guide", "hold_ms": 200},
+            {"stb": "B", "button": "guide", "hold_ms": 200, "at_ms": 20},
+        ]
+    )
+    assert time.monotonic() - started < 0.1
+    assert [r["state"] for r in result["receipts"]] in (
+        ["pending", "pending"],
+        ["holding", "pending"],
+    )
+    done = ctl.press_bulk([{"stb": "A", "button": "guide", "delay": 80}], wait=True)
+    assert done["ok"] is True
+    assert done["receipts"][0]["state"] == "released"
+    assert ctl.press_status(result["receipts"][1]["id"])["receipt"]["alias"] == "B"
+
+
+def test_controller_bulk_validates_every_item_before_queueing(monkeypatch, wire):
+    scheduler, writes = wire
+    monkeypatch.setattr(controller_module, "store", FakeStore())
+    monkeypatch.setattr(controller_module, "press_scheduler", scheduler)
+    with pytest.raises(ValueError, match="unknown button_id"):
+        controller_module.Controller().press_bulk(
+            [
+                {"stb": "A", "button": "guide", "hold_ms": 80},
+                {"stb": "B", "button": "nope", "hold_ms": 80},
+            ]
+        )
+    time.sleep(0.05)
+    assert writes == []
+
+
+def test_unpair_without_wait_returns_scheduled_receipt(monkeypatch, wire):
+    scheduler, writes = wire
+    monkeypatch.setattr(controller_module, "store", FakeStore())
+    monkeypatch.setattr(controller_module, "press_scheduler", scheduler)
+    started = time.monotonic()
+    result = controller_module.Controller().unpair("A", wait=False)
+    assert time.monotonic() - started < 0.1
+    assert result["receipt"]["state"] in {"pending", "holding"}
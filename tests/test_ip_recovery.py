@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import json
+import socket
+import subprocess
+import threading
+import time
 from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from jamboree import ip_recovery
+import requests
+
+from jamboree import ip_recovery, net_sweep
 
 
 class FakeStore:
@@ -123,3 +131,327 @@ def test_auth_failure_at_real_receiver_triggers_pair_not_recovery(monkeypatch):
     ip_recovery.note_sgs_failure("A", PermissionError("HTTP 403"))
     assert paired == ["A"]
     assert recovered == []
+
+
+def _closed_port():
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+
+def test_subnet_sweep_treats_refusal_as_alive_without_spawning_ping(monkeypatch):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    open_port = listener.getsockname()[1]
+    closed_port = _closed_port()
+
+    def no_subprocess(*_args, **_kwargs):
+        raise AssertionError("sweep must not spawn processes")
+
+    monkeypatch.setattr(subprocess, "run", no_subprocess)
+    monkeypatch.setattr(subprocess, "Popen", no_subprocess)
+    try:
+        result = net_sweep.sweep(
+            ["127.0.0.1", "127.0.0.1", "127.0.0.2"],
+            ports=(closed_port, open_port),
+            concurrency=1,
+            host_timeout_s=1.0,
+        )
+    finally:
+        listener.close()
+
+    assert result.alive == ["127.0.0.1", "127.0.0.2"]
+    assert result.hosts == 2
+    assert result.refused >= 2
+    assert result.timed_out == 0 and not result.deadline_hit
+    summary = result.as_dict()
+    assert summary["alive"] == 2 and summary["hosts_per_s"] > 0
+
+
+def test_find_by_mac_records_sweep_summary(monkeypatch):
+    store = FakeStore({"H": {"ip": "10.0.0.5", "stb": "R1234567890-12", "mac": "88:b6:ee:de:58:cc"}})
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    swept = []
+
+    def sweep(hosts, concurrency):
+        swept.append((list(hosts), concurrency))
+        return {"hosts": len(hosts), "alive": 1, "duration_s": 0.01}
+
+    monkeypatch.setattr(ip_recovery, "_sweep_hosts", sweep)
+    monkeypatch.setattr(ip_recovery, "_arp_entries", lambda: {"10.0.0.9": "88:b6:ee:de:58:cc"})
+    monkeypatch.setattr(ip_recovery, "probe_device_identity", exact_identity)
+
+    assert ip_recovery.find_by_mac("H", candidates=["10.0.0.9", "10.0.0.10"]) == "10.0.0.9"
+    assert swept == [(["10.0.0.9", "10.0.0.10"], ip_recovery.net_sweep.DEFAULT_CONCURRENCY)]
+    assert ip_recovery._state("H").last_sweep["alive"] == 1
+
+
+class _FakeSGSHandler(BaseHTTPRequestHandler):
+    delay_s = 0.25
+    rxid = "R1234567890-12"
+    requests_seen: list = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        command = json.loads(self.rfile.read(length) or b"{}").get("command")
+        self.requests_seen.append((self.path, command))
+        time.sleep(self.delay_s)
+        payload = {"result": 1}
+        if command == "get_receiver_id":
+            payload["receiver_id"] = self.rxid
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_identity_probe_runs_endpoints_concurrently_and_short_circuits():
+    # Benchmark against a local fake SGS server: each request takes 250 ms. A
+    # sequential probe of this matrix needs at least 5 requests (1.25 s) before
+    # it sees the RxID; the concurrent probe finds it in ~2 round trips.
+    _FakeSGSHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeSGSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    closed = _closed_port()
+    endpoints = (
+        ("http://{ip}:%d/sgs_noauth" % closed, False),
+        ("http://{ip}:%d/www/sgs" % closed, False),
+        ("http://{ip}:%d/www/sgs" % port, False),
+    )
+    refused = []
+
+    def post(url, **kwargs):
+        if f":{closed}/" in url:
+            refused.append(url)
+        return requests.post(url, **kwargs)
+
+    try:
+        started = time.monotonic()
+        identity = ip_recovery.probe_device_identity(
+            "127.0.0.1", "R1234567890-12", endpoints=endpoints, request_post=post
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert identity["is_stb"] is True
+    assert identity["rxid_match"] is True
+    assert elapsed < 1.0
+    assert "get_version" not in [command for _path, command in _FakeSGSHandler.requests_seen]
+    # The refused port is skipped for its remaining commands and endpoints.
+    assert 1 <= len(refused) <= 2
+
+
+def test_identity_probe_stops_at_non_stb_marker_and_honours_deadline():
+    calls = []
+
+    class Response:
+        status_code = 200
+        headers = {"X-Jenkins": "2.4"}
+        text = ""
+
+        def json(self):
+            return {}
+
+    def post(url, **kwargs):
+        calls.append((url, kwargs["json"]["command"], kwargs["timeout"]))
+        return Response()
+
+    identity = ip_recovery.probe_device_identity(
+        "10.0.0.8", endpoints=(("http://{ip}/a", False),), request_post=post
+    )
+    assert identity["is_stb"] is False and identity["reason"] == "header:x-jenkins"
+    assert len(calls) == 1
+
+    def hang(url, **kwargs):
+        time.sleep(kwargs["timeout"])
+        raise requests.Timeout("read timed out")
+
+    started = time.monotonic()
+    identity = ip_recovery.probe_device_identity(
+        "10.0.0.8", timeout=2.0, deadline_s=0.2, request_post=hang
+    )
+    assert time.monotonic() - started < 0.5
+    assert identity["reason"] == "unreachable"
+
+
+def test_recovery_status_serves_cached_identity_and_refreshes_in_background(monkeypatch):
+    store = FakeStore({"A": {"ip": "10.0.0.41", "stb": "R1234567890-12"}})
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    monkeypatch.setattr(ip_recovery, "_rf_ready", lambda _alias: False)
+    cache = ip_recovery.IdentityCache(ttl_s=60.0)
+    monkeypatch.setattr(ip_recovery, "identity_cache", cache)
+    release = threading.Event()
+    probes = []
+
+    def slow_probe(ip, rxid):
+        probes.append(ip)
+        release.wait(2)
+        return exact_identity(ip, rxid)
+
+    monkeypatch.setattr(ip_recovery, "probe_device_identity", slow_probe)
+
+    started = time.monotonic()
+    first = ip_recovery.get_recovery_status("A")["stored_identity"]
+    again = ip_recovery.get_recovery_status("A")["stored_identity"]
+    assert time.monotonic() - started < 0.5
+    assert first["reason"] == "identity_pending" and first["refreshing"] is True
+    assert again["cached"] is False
+    release.set()
+    for _ in range(200):
+        if cache.status()["refreshing"] == 0:
+            break
+        time.sleep(0.01)
+    assert probes == ["10.0.0.41"]
+
+    verdict = ip_recovery.get_recovery_status("A")["stored_identity"]
+    assert verdict["cached"] is True and verdict["rxid_match"] is True
+    assert verdict["age_s"] is not None and verdict["stale"] is False
+    assert ip_recovery.get_recovery_status()["identity_cache"]["entries"] == 1
+
+
+def test_identity_scan_results_populate_status_cache(monkeypatch):
+    store = FakeStore({"A": {"ip": "10.0.0.42", "stb": "R1234567890-12"}})
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    cache = ip_recovery.IdentityCache(ttl_s=60.0)
+    monkeypatch.setattr(ip_recovery, "identity_cache", cache)
+    ip_recovery.scan_identity_candidates("A", candidates=["10.0.0.42"], probe=exact_identity)
+    assert cache.status()["entries"] == 0
+    monkeypatch.setattr(ip_recovery, "probe_device_identity", exact_identity)
+    ip_recovery.scan_identity_candidates("A", candidates=["10.0.0.42"])
+
+    def no_probe(*_args):
+        raise AssertionError("cached verdict should be served")
+
+    monkeypatch.setattr(ip_recovery, "probe_device_identity", no_probe)
+    verdict = ip_recovery.verify_stored_ip_identity("A", cached=True)
+    assert verdict["cached"] is True and verdict["is_stb"] is True
+    assert cache.status()["refreshes"] == 0
+
+
+def test_identity_cache_evicts_expired_and_oldest_verdicts():
+    cache = ip_recovery.IdentityCache(ttl_s=60.0, max_age_s=600.0, max_entries=2)
+    for last in (1, 2, 3):
+        cache.put(f"10.0.0.{last}", "R1234567890-12", {"is_stb": True})
+    assert cache.status()["entries"] == 2 and cache.status()["evictions"] == 1
+    assert cache.lookup("10.0.0.3", "R1234567890-12")["cached"] is True
+
+    cache.max_age_s = 0.0
+    cache.refresh_async = lambda _ip, _rxid: False
+    assert cache.lookup("10.0.0.3", "R1234567890-12")["cached"] is False
+    assert cache.status()["entries"] == 0 and cache.status()["evictions"] == 3
+
+
+def test_coordinator_merges_overlapping_recoveries_into_one_sweep(monkeypatch):
+    store = FakeStore(
+        {
+            "A": {"ip": "10.0.0.10", "stb": "R1111111111-11", "mac": "aa:aa:aa:aa:aa:aa"},
+            "B": {"ip": "10.0.0.11", "stb": "R2222222222-22", "mac": "bb:bb:bb:bb:bb:bb"},
+            "C": {"ip": "10.0.0.12", "stb": "R3333333333-33"},
+            "D": {"ip": "10.0.1.5", "stb": "R4444444444-44"},
+        }
+    )
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    monkeypatch.setattr(
+        ip_recovery, "_CFG", {"ip_recovery_merge_window_s": 0.2, "ip_recovery_cooldown_s": 0}
+    )
+    coordinator = ip_recovery.RecoveryCoordinator()
+    monkeypatch.setattr(ip_recovery, "recovery_coordinator", coordinator)
+    monkeypatch.setattr(ip_recovery, "identity_cache", ip_recovery.IdentityCache(ttl_s=60.0))
+    sweeps = []
+    monkeypatch.setattr(
+        ip_recovery, "_sweep_hosts", lambda hosts, _c: sweeps.append(len(hosts)) or {}
+    )
+    monkeypatch.setattr(
+        ip_recovery,
+        "_arp_entries",
+        lambda: {"10.0.0.50": "aa:aa:aa:aa:aa:aa", "10.0.0.51": "bb:bb:bb:bb:bb:bb"},
+    )
+    scanned = []
+
+    def probe(ip, rxid):
+        if not rxid:
+            scanned.append(ip)
+        if ip == "10.0.0.52":
+            return {"is_stb": True, "rxids": ["333333333333"], "rxid_match": None}
+        return {"is_stb": True if ip in {"10.0.0.50", "10.0.0.51"} else None, "rxids": []}
+
+    monkeypatch.setattr(ip_recovery, "probe_device_identity", probe)
+    found = {}
+
+    def recover(alias, *, mac_finder=None, identity_finder=None):
+        if mac_finder is None:
+            found[alias] = "solo"
+        else:
+            found[alias] = mac_finder(alias) or identity_finder(alias)[0]
+        return ip_recovery.RecoveryResult(True, alias, "", found[alias])
+
+    monkeypatch.setattr(ip_recovery, "recover_alias", recover)
+
+    for alias in ("A", "B", "C", "D"):
+        assert ip_recovery.recover_alias_async(alias) is True
+    assert ip_recovery.recover_alias_async("A") is False
+    assert coordinator.status()["queue_depth"] == 4
+    for _ in range(300):
+        if len(found) == 4 and not coordinator.status()["running"]:
+            break
+        time.sleep(0.01)
+
+    assert found == {"A": "10.0.0.50", "B": "10.0.0.51", "C": "10.0.0.52", "D": "solo"}
+    assert sweeps == [254]
+    assert len(scanned) == 254
+    stats = coordinator.status()
+    assert (stats["requests"], stats["deduped"], stats["batches"]) == (4, 1, 1)
+    assert (stats["groups"], stats["merged"], stats["queue_depth"]) == (2, 2, 0)
+    assert ip_recovery._state("C").last_result["new_ip"] == "10.0.0.52"
+    assert ip_recovery._state("C").active is False
+
+
+def test_coordinator_runs_unrelated_recoveries_in_parallel(monkeypatch):
+    store = FakeStore(
+        {
+            "A": {"ip": "10.0.0.10", "stb": "R1111111111-11"},
+            "D": {"ip": "10.0.1.5", "stb": "R4444444444-44"},
+        }
+    )
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    monkeypatch.setattr(
+        ip_recovery, "_CFG", {"ip_recovery_merge_window_s": 0.05, "ip_recovery_cooldown_s": 0}
+    )
+    coordinator = ip_recovery.RecoveryCoordinator()
+    monkeypatch.setattr(ip_recovery, "recovery_coordinator", coordinator)
+    release = threading.Event()
+    finished = []
+
+    def recover(alias, **_kwargs):
+        if alias == "A":
+            release.wait(2)
+        finished.append(alias)
+        return ip_recovery.RecoveryResult(True, alias, "")
+
+    monkeypatch.setattr(ip_recovery, "recover_alias", recover)
+    assert ip_recovery.recover_alias_async("A") is True
+    assert ip_recovery.recover_alias_async("D") is True
+    for _ in range(200):
+        if finished:
+            break
+        time.sleep(0.01)
+    assert finished == ["D"]
+    assert coordinator.status()["running"] == ["A"]
+    release.set()
+    for _ in range(200):
+        if not coordinator.status()["running"]:
+            break
+        time.sleep(0.01)
+    assert finished == ["D", "A"]
+    assert coordinator.status()["batches"] == 1
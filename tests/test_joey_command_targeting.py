@@ -58,7 +58,7 @@ def test_joey_attach_uses_child_rid_but_remote_key_uses_host_rid(monkeypatch):
 
     posts = []
 
-    def post(ip, payload, *, creds, timeout=7.0):
+    def post(ip, payload, *, creds, alias=None, timeout=7.0):
         posts.append((ip, dict(payload), creds, timeout))
         return {"result": 1}
 
@@ -111,7 +111,7 @@ def test_hopper_remote_key_still_uses_its_own_rid_without_child_cid(monkeypatch)
 
     posts = []
 
-    def post(ip, payload, *, creds, timeout=7.0):
+    def post(ip, payload, *, creds, alias=None, timeout=7.0):
         posts.append((ip, dict(payload), creds, timeout))
         return {"result": 1}
 
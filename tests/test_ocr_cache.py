@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from functools import partial
+
+from jamboree import ocr_cache, sgs_autopair
+from jamboree.ocr_pool import OCRPool
+
+
+def test_fingerprint_matches_noisy_repeats_but_not_a_new_pin(pairing_frame):
+    capture = partial(pairing_frame, seed=0, jpeg_quality=70)
+    cache = ocr_cache.OCRCache(ttl_s=60.0)
+    slot = ("pin", 0, 2.6, "otsu_inv", "strict", 8)
+    cache.store(slot, ocr_cache.fingerprint(capture("482913", seed=1)), ["482913"])
+
+    assert cache.lookup(slot, ocr_cache.fingerprint(capture("482913", seed=2))) == (
+        True,
+        ["482913"],
+    )
+    # Same layout, one digit changed: the hashes are close, the thumbnails are not.
+    assert cache.lookup(slot, ocr_cache.fingerprint(capture("482918", seed=3)))[0] is False
+    assert cache.lookup(("pin", 1), ocr_cache.fingerprint(capture(seed=4)))[0] is False
+    status = cache.status()
+    assert (status["hits"], status["misses"], status["near_misses"]) == (1, 2, 1)
+    assert status["hit_rate"] == round(1 / 3, 3)
+
+    # Whole 1080p frames too: a single changed digit is a different screen.
+    cache.store(("screen", 11), ocr_cache.fingerprint(capture()), "text")
+    assert cache.lookup(("screen", 11), ocr_cache.fingerprint(capture("482912", seed=5)))[0] is False
+    cache.clear("pin")
+    assert cache.status()["entries"] == 1
+
+
+def test_unchanged_pairing_frames_reuse_votes_without_ocr(monkeypatch, pairing_frame):
+    capture = partial(pairing_frame, seed=0, jpeg_quality=70)
+    pool = OCRPool(workers=2)
+    cache = ocr_cache.OCRCache(ttl_s=60.0)
+    monkeypatch.setattr(sgs_autopair, "ocr_pool", pool)
+    monkeypatch.setattr(sgs_autopair, "ocr_cache", cache)
+    calls = []
+    shown = {"pin": "482913"}
+
+    def fake_ocr(_img, psm=6, digits_only=False, strict=False):
+        calls.append(psm)
+        return shown["pin"] if digits_only else f"Pairing code {shown['pin']}"
+
+    monkeypatch.setattr(sgs_autopair, "_ocr", fake_ocr)
+
+    first = sgs_autopair.score_pin_candidates(capture(seed=1), effort="deep")
+    used = len(calls)
+    assert used > 0
+    second = sgs_autopair.score_pin_candidates(capture(seed=2), effort="deep")
+    assert len(calls) == used
+    assert [(c["pin"], c["score"]) for c in second] == [(c["pin"], c["score"]) for c in first]
+
+    shown["pin"] = "103756"
+    third = sgs_autopair.score_pin_candidates(capture("103756", seed=3), effort="deep")
+    assert len(calls) > used
+    assert third[0]["pin"] == "103756"
+    assert cache.status()["hits"] >= used
+    pool.shutdown()
+
+
+def test_cache_served_polls_do_not_confirm_a_pin(monkeypatch, pairing_frame):
+    pool = OCRPool(workers=2)
+    cache = ocr_cache.OCRCache(ttl_s=60.0)
+    monkeypatch.setattr(sgs_autopair, "ocr_pool", pool)
+    monkeypatch.setattr(sgs_autopair, "ocr_cache", cache)
+    frame = pairing_frame(seed=0, jpeg_quality=70)
+    monkeypatch.setattr(sgs_autopair, "_get_frame", lambda: frame)
+    monkeypatch.setattr(sgs_autopair.time, "sleep", lambda _s: None)
+    calls = []
+
+    def misread(_img, psm=6, digits_only=False, strict=False):
+        calls.append(psm)
+        return "482918" if digits_only else "Pairing code 482918"
+
+    monkeypatch.setattr(sgs_autopair, "_ocr", misread)
+    sgs_autopair.score_pin_candidates(frame, effort="fast")
+    fast_calls = len(calls)
+    stored = cache.status()["stores"]
+    again = sgs_autopair.score_pin_candidates(frame, effort="fast")
+    assert len(calls) == fast_calls and again[0]["fresh_hits"] == 0
+    assert cache.status()["stores"] == stored
+
+    calls.clear()
+    cache = ocr_cache.OCRCache(ttl_s=60.0)
+    monkeypatch.setattr(sgs_autopair, "ocr_cache", cache)
+    assert sgs_autopair.wait_for_pin(timeout_s=30, stable_reads=2) == "482918"
+    # Polls 2-3 repeat the first fast read from the cache; confirmation needs
+    # the deep tier's own passes.
+    assert len(calls) > fast_calls
+    # Only real OCR passes are stored, so cache hits never refresh the TTL.
+    assert cache.status()["hits"] > 0 and cache.status()["stores"] == len(calls)
+    pool.shutdown()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sys
+import threading
+import types
+
+import pytest
+
+from jamboree import ocr_engine, sgs_autopair
+
+
+class FakeTessAPI:
+    created = []
+
+    def __init__(self, lang="eng", psm=3, oem=3):
+        self.psm = psm
+        self.variables = {}
+        self.images = []
+        self.ended = False
+        FakeTessAPI.created.append(self)
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+        return True
+
+    def SetImageBytes(self, data, width, height, depth, bytes_per_line):
+        assert len(data) == height * bytes_per_line
+        self.images.append((width, height, depth))
+
+    def SetSourceResolution(self, dpi):
+        self.dpi = dpi
+
+    def GetUTF8Text(self):
+        return f"psm{self.psm} {self.variables.get('tessedit_char_whitelist')}\n"
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        self.ended = True
+
+
+def _frames(pairing_frame, count=3):
+    """Grayscale crops of the dialog line from ``count`` pairing screens."""
+    import cv2
+
+    return [
+        cv2.cvtColor(pairing_frame(str(482913 + index))[500:590, 540:1400], cv2.COLOR_BGR2GRAY)
+        for index in range(count)
+    ]
+
+
+def test_tesserocr_backend_reuses_pooled_handles_across_threads(monkeypatch, pairing_frame):
+    FakeTessAPI.created = []
+    monkeypatch.setitem(sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeTessAPI))
+    engine = ocr_engine.OCREngine("auto")
+    monkeypatch.setattr(sgs_autopair, "ocr_engine", engine)
+    frame = _frames(pairing_frame, 1)[0]
+
+    for _ in range(5):
+        assert sgs_autopair._ocr(frame, psm=8, digits_only=True, strict=True) == "psm8 0123456789\n"
+        assert engine.image_to_string(frame, psm=6) == "psm6 \n"
+    for _ in range(3):
+        worker = threading.Thread(target=engine.image_to_string, args=(frame,), kwargs={"psm": 6})
+        worker.start()
+        worker.join()
+
+    # Selection probe (psm 6) + psm 8; new threads check out the idle psm 6.
+    assert [api.psm for api in FakeTessAPI.created] == [6, 8]
+    status = engine.status()
+    assert (status["backend"], status["handles"], status["calls"]) == ("tesserocr", 2, 13)
+    engine.reset()
+    assert all(api.ended for api in FakeTessAPI.created)
+
+
+def test_tesserocr_backend_bounds_idle_handles_per_psm(monkeypatch):
+    FakeTessAPI.created = []
+    monkeypatch.setitem(sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeTessAPI))
+    backend = ocr_engine.TesserocrBackend(max_idle=2)
+    held = [backend._checkout(7) for _ in range(4)]
+    assert backend.handles == 5
+    for api in held:
+        backend._release(7, api)
+    assert backend.handles == 3
+    assert [api.ended for api in held] == [False, False, True, True]
+
+    busy = backend._checkout(7)
+    backend.close()
+    assert backend.handles == 1 and not busy.ended
+    backend._release(7, busy)
+    assert backend.handles == 0
+    assert all(api.ended for api in FakeTessAPI.created)
+
+
+def test_auto_backend_falls_back_to_pytesseract(monkeypatch, pairing_frame):
+    import pytesseract
+
+    def broken(**_kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+    monkeypatch.setitem(sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=broken))
+    configs = []
+    monkeypatch.setattr(pytesseract, "get_tesseract_version", lambda: "5.3.0")
+    monkeypatch.setattr(
+        pytesseract, "image_to_string", lambda _img, config="": configs.append(config) or "1234"
+    )
+    engine = ocr_engine.OCREngine("auto")
+
+    assert engine.image_to_string(_frames(pairing_frame, 1)[0], psm=7, whitelist="0123456789") == "1234"
+    assert engine.status()["backend"] == "pytesseract"
+    assert configs == [
+        "--oem 3 --psm 7 -c user_defined_dpi=300 -c tessedit_char_whitelist=0123456789"
+    ]
+
+
+def test_backend_benchmark_on_synthetic_pairing_frames(pairing_frame):
+    results = ocr_engine.compare_backends(_frames(pairing_frame), psms=(6, 7), repeat=2)
+    available = {name: result for name, result in results.items() if "error" not in result}
+    if not available:
+        pytest.skip(f"no OCR backend installed: {results}")
+    for result in available.values():
+        assert result["calls"] == 3 * 2 * 2
+        assert result["calls_per_s"] > 0
+    if len(available) == 2:
+        # The resident engine must beat one process per call.
+        assert available["tesserocr"]["calls_per_s"] > available["pytesseract"]["calls_per_s"]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from jamboree import sgs_autopair
+from jamboree.ocr_prep import FramePrep, VARIANT_NAMES, propose_text_boxes
+
+
+def _legacy_variants(img, scale):
+    """The per-crop pipeline FramePrep replaces (reference for equality/benchmark)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if len(img.shape) == 3 else img
+    scale = max(min(float(scale), sgs_autopair.MAX_OCR_WIDTH / float(gray.shape[1])), 1.0)
+    up = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    out = [("gray", up)]
+    _, otsu = cv2.threshold(up, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    out.append(("otsu", otsu))
+    out.append(("otsu_inv", cv2.bitwise_not(otsu)))
+    _, bright = cv2.threshold(up, 165, 255, cv2.THRESH_BINARY)
+    out.append(("bright_inv", cv2.bitwise_not(bright)))
+    _, blurred = cv2.threshold(
+        cv2.GaussianBlur(up, (3, 3), 0), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
+    )
+    out.append(("blur_otsu_inv", cv2.bitwise_not(blurred)))
+    adap = cv2.adaptiveThreshold(up, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 5)
+    out.append(("adaptive_inv", cv2.bitwise_not(adap)))
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    out.append(("closed_inv", cv2.bitwise_not(cv2.morphologyEx(otsu, cv2.MORPH_CLOSE, kernel))))
+    return out
+
+
+def _legacy_frame(frame, plan):
+    kept = []
+    for region_idx in plan["regions"]:
+        crop = sgs_autopair._crop(frame, sgs_autopair._PIN_REGIONS[region_idx][0])
+        sgs_autopair.has_text_like_content(crop)
+        for scale in plan["scales"]:
+            available = dict(_legacy_variants(crop, scale))
+            kept.extend(available[name] for name in plan["variants"])
+    return kept
+
+
+def _batched_frame(frame, plan):
+    prep = FramePrep(frame, max_width=sgs_autopair.MAX_OCR_WIDTH)
+    kept = []
+    for region_idx in plan["regions"]:
+        box = sgs_autopair._PIN_REGIONS[region_idx][0]
+        sgs_autopair.has_text_like_content(prep.gray_region(box))
+        for scale in plan["scales"]:
+            available = prep.variants(box, scale, plan["variants"])
+            kept.extend(available[name] for name in plan["variants"])
+    return kept, prep
+
+
+def test_frame_prep_variants_match_per_crop_pipeline(pairing_frame):
+    frame = pairing_frame(banner="Code 482913", seed=7)
+    prep = FramePrep(frame, max_width=sgs_autopair.MAX_OCR_WIDTH)
+    for box, _weight in sgs_autopair._PIN_REGIONS:
+        crop = sgs_autopair._crop(frame, box)
+        assert np.shares_memory(prep.gray_region(box), prep.gray)
+        for scale in sgs_autopair._SCALES:
+            expected = dict(_legacy_variants(crop, scale))
+            actual = prep.variants(box, scale)
+            assert list(actual) == list(VARIANT_NAMES)
+            for name in VARIANT_NAMES:
+                assert np.array_equal(actual[name], expected[name]), (box, scale, name)
+    assert dict(sgs_autopair._variants(sgs_autopair._crop(frame, (0.25, 0.3, 0.75, 0.7)), 2.6))
+
+
+def _image_allocations(fn):
+    """Return (live image-sized blocks, peak bytes) allocated by ``fn``."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        snapshot = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(1 for trace in snapshot.traces if trace.size >= 64 * 1024)
+    del result
+    return blocks, peak
+
+
+def test_exhaustive_tier_preprocessing_reuses_scaled_regions(pairing_frame):
+    frame = pairing_frame(banner="Code 482913", seed=7)
+    plan = sgs_autopair._EFFORT_PLANS["exhaustive"]
+
+    legacy_blocks, legacy_peak = _image_allocations(lambda: _legacy_frame(frame, plan))
+    batched_blocks, batched_peak = _image_allocations(lambda: _batched_frame(frame, plan))
+    _kept, prep = _batched_frame(frame, plan)
+
+    # At 1080p MAX_OCR_WIDTH clamps all three scales of every region to one
+    # effective scale, so each region is upscaled and thresholded once.
+    assert prep.stats["resizes"] == len(plan["regions"])
+    assert prep.stats["reused"] == len(plan["regions"]) * (len(plan["scales"]) - 1)
+    assert batched_blocks * 3 < legacy_blocks, (batched_blocks, legacy_blocks)
+    assert batched_peak < legacy_peak
+
+
+@pytest.mark.skipif(
+    not os.getenv("JAMBOREE_BENCHMARK"),
+    reason="set JAMBOREE_BENCHMARK=1 to time preprocessing (run with -s to see it)",
+)
+def test_exhaustive_tier_preprocessing_benchmark(pairing_frame, record_property):
+    """Report legacy-vs-batched preprocessing time; wall clock is not asserted."""
+    frame = pairing_frame(banner="Code 482913", seed=7)
+    plan = sgs_autopair._EFFORT_PLANS["exhaustive"]
+
+    def best_of(fn, runs=5):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    legacy_s = best_of(lambda: _legacy_frame(frame, plan))
+    batched_s = best_of(lambda: _batched_frame(frame, plan))
+    legacy_blocks, legacy_peak = _image_allocations(lambda: _legacy_frame(frame, plan))
+    batched_blocks, batched_peak = _image_allocations(lambda: _batched_frame(frame, plan))
+    report = {
+        "legacy_ms": round(legacy_s * 1000, 2),
+        "batched_ms": round(batched_s * 1000, 2),
+        "speedup": round(legacy_s / batched_s, 2),
+        "legacy_blocks": legacy_blocks,
+        "batched_blocks": batched_blocks,
+        "legacy_peak_kb": legacy_peak // 1024,
+        "batched_peak_kb": batched_peak // 1024,
+    }
+    for name, value in report.items():
+        record_property(name, value)
+    print("exhaustive tier preprocessing:", report)
+
+
+def test_text_boxes_locate_dialog_and_banner_lines_tallest_first(pairing_frame):
+    prep = FramePrep(pairing_frame(banner="Code 482913", seed=7))
+    dialog, banner = prep.text_boxes()
+    # Tight boxes around each line, anywhere on screen, largest text first.
+    assert dialog[0] < 560 / 1920 < 1150 / 1920 < dialog[2] < 0.7
+    assert 0.4 < dialog[1] < 560 / 1080 < dialog[3] < 0.6
+    assert banner[0] < 200 / 1920 and banner[1] > 0.85
+    assert prep.text_boxes(1) == [dialog]
+
+    flat = np.clip(np.random.default_rng(3).normal(60, 6, (1080, 1920)), 0, 255).astype(np.uint8)
+    assert propose_text_boxes(flat) == []
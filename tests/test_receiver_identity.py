@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import errno
+
+import pytest
+
+from jamboree import netlink, sgs_lib
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    macs = iter(["001122334455", "001122334455", "66778899aabb"])
+
+    def lookup():
+        calls.append(1)
+        return next(macs)
+
+    monkeypatch.setattr(sgs_lib, "get_local_iface_mac", lookup)
+    sgs_lib.invalidate_receiver_identity("test")
+    yield calls
+    sgs_lib.invalidate_receiver_identity("test")
+
+
+def test_receiver_id_is_computed_once(lookups):
+    assert sgs_lib.sgs_get_receiver_id() == "XAF001122334455"
+    assert sgs_lib.sgs_get_receiver_id() == "XAF001122334455"
+    assert sgs_lib.cached_local_mac() == "001122334455"
+    assert len(lookups) == 1
+    status = sgs_lib.receiver_identity_status()
+    assert status["receiver_id"] == "XAF001122334455"
+    assert status["stale"] is False
+    assert status["last_refresh_reason"] == "test"
+
+
+def test_interface_change_and_explicit_refresh_recompute(lookups):
+    sgs_lib.sgs_get_receiver_id()
+    sgs_lib.invalidate_receiver_identity("netlink")
+    assert sgs_lib.receiver_identity_status()["stale"] is True
+    assert sgs_lib.sgs_get_receiver_id() == "XAF001122334455"
+    assert len(lookups) == 2
+    assert sgs_lib.refresh_receiver_identity() == "XAF66778899aabb"
+    assert sgs_lib.sgs_get_receiver_id() == "XAF66778899aabb"
+    assert len(lookups) == 3
+
+
+def test_missing_mac_falls_back_to_default_receiver(monkeypatch):
+    monkeypatch.setattr(sgs_lib, "get_local_iface_mac", lambda: "")
+    assert sgs_lib.refresh_receiver_identity() == sgs_lib.DEFAULT_RECEIVER
+    sgs_lib.invalidate_receiver_identity("test")
+
+
+class FakeNetlinkSocket:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def recv(self, _size):
+        result = self.results.pop(0)
+        if isinstance(result, OSError):
+            raise result
+        return result
+
+    def fileno(self):
+        return 3 if self.results else -1
+
+
+def test_netlink_overflow_resyncs_and_keeps_watching(lookups):
+    sgs_lib.sgs_get_receiver_id()
+    state = netlink.new_state()
+    reasons = []
+    sock = FakeNetlinkSocket(
+        OSError(errno.ENOBUFS, "No buffer space available"),
+        b"\x10",
+        OSError(errno.EBADF, "Bad file descriptor"),
+    )
+
+    def overflow():
+        reasons.append("overflow")
+        sgs_lib.invalidate_receiver_identity("netlink overflow")
+        assert sgs_lib.receiver_identity_status()["stale"] is True
+
+    netlink._receive(sock, state, "test", lambda _data: reasons.append("event"), overflow)
+
+    # ENOBUFS resyncs and the loop keeps receiving; only EBADF ends it.
+    assert reasons == ["overflow", "event"]
+    assert (state["overflows"], state["events"]) == (1, 1)
+    assert "Bad file descriptor" in state["error"]
+    assert sgs_lib.sgs_get_receiver_id() == "XAF001122334455"
+    assert sgs_lib.receiver_identity_status()["last_refresh_reason"] == "netlink overflow"
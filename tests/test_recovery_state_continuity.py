@@ -238,11 +238,11 @@ def test_auth_failure_diagnosis_stays_out_of_synchronous_notifier(monkeypatch):
 def test_sgs_dead_endpoint_budget_stays_below_automation_timeout(monkeypatch):
     observed_timeouts: list[float] = []
 
-    def fail(_url, **kwargs):
+    def fail(_session, _url, **kwargs):
         observed_timeouts.append(float(kwargs["timeout"]))
         raise requests.Timeout("timed out")
 
-    monkeypatch.setattr(sgs_bridge.requests, "post", fail)
+    monkeypatch.setattr(sgs_bridge.requests.Session, "post", fail)
 
     with pytest.raises(RuntimeError, match="SGS request failed"):
         sgs_bridge._post(
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from jamboree import controller as controller_module
+from jamboree import sequences
+from jamboree.stb_store import STBStore
+
+
+def test_normalize_steps_fills_defaults_and_rejects_bad_steps():
+    steps = sequences.normalize_steps([{"button": "guide"}, {"button": "ok", "hold_ms": 80, "gap_ms": 500}])
+    assert steps[0] == {"button": "guide", "hold_ms": 120, "gap_ms": 0, "force": None}
+    assert steps[1]["gap_ms"] == 500
+    for bad in ([], [{"hold_ms": 10}], [{"button": "ok", "hold_ms": -1}], [{"button": "ok", "force": "ir"}]):
+        with pytest.raises(ValueError):
+            sequences.normalize_steps(bad)
+
+
+def test_steps_are_scheduled_from_one_monotonic_origin():
+    calls = []
+
+    def press(alias, button, hold_ms, force):
+        calls.append((time.monotonic(), button))
+        time.sleep(0.01)  # transport latency must not push later steps back
+        return {"via": "sgs"}
+
+    run = sequences.SequenceRunner().start(
+        press,
+        "A",
+        [
+            {"button": "guide", "hold_ms": 40, "gap_ms": 20},
+            {"button": "down", "hold_ms": 40, "gap_ms": 20},
+            {"button": "ok", "hold_ms": 40},
+        ],
+    )
+    assert run.wait(2)
+    assert run.state == "completed"
+    assert [r["planned_offset_ms"] for r in run.results] == [0.0, 60.0, 120.0]
+    assert (calls[2][0] - calls[0][0]) == pytest.approx(0.12, abs=0.04)
+    assert all(r["via"] == "sgs" and r["latency_ms"] >= 10 for r in run.results)
+
+
+def test_failed_step_stops_sequence_and_stream_reports_it():
+    def press(alias, button, hold_ms, force):
+        if button == "down":
+            raise RuntimeError("SGS failed")
+        return {"via": "rf"}
+
+    run = sequences.SequenceRunner().start(
+        press, "A", [{"button": "guide"}, {"button": "down"}, {"button": "ok"}]
+    )
+    events = list(run.stream(timeout_s=2))
+    assert [e["event"] for e in events] == ["start", "step", "step", "end"]
+    assert events[2]["error"] == "SGS failed"
+    assert events[-1]["ok"] is False
+    assert run.state == "failed"
+    assert run.as_dict()["ok"] is False
+
+
+def test_controller_runs_named_macro_from_base_file(monkeypatch, tmp_path):
+    path = tmp_path / "base.txt"
+    path.write_text(json.dumps({"stbs": {"A": {"protocol": "RF", "remote": "1"}}}), encoding="utf-8")
+    store = STBStore(path)
+    store.save_macro("menu", [{"button": "menu", "hold_ms": 80, "gap_ms": 10}, {"button": "back"}])
+    assert json.loads(path.read_text(encoding="utf-8"))["macros"]["menu"][1] == {"button": "back"}
+
+    monkeypatch.setattr(controller_module, "store", store)
+    pressed = []
+    ctl = controller_module.Controller()
+    monkeypatch.setattr(
+        ctl,
+        "handle_auto_remote",
+        lambda _remote, alias, button, delay, **kwargs: pressed.append((alias, button, delay, kwargs["force"]))
+        or {"via": "rf"},
+    )
+    run = ctl.run_sequence("a", macro="menu")
+    assert run.wait(2)
+    assert pressed == [("A", "menu", 80, None), ("A", "back", 120, None)]
+    assert ctl.sequence_status(run.id)["sequence"]["state"] == "completed"
+    with pytest.raises(ValueError, match="not found"):
+        ctl.run_sequence("A", macro="missing")
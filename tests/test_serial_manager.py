@@ -36,20 +36,12 @@ def test_submit_waits_for_actual_serial_write():
     worker = serial_manager.SerialPortWorker("COM1")
     worker._ser = FakeSerial()
     worker._ready.set()
-    result = {}
-
-    def submitter():
-        result["ok"] = worker.submit(b"1 4 down\n", completion_timeout_s=1)
-
-    thread = threading.Thread(target=submitter)
-    thread.start()
-    for _ in range(100):
-        if not worker._write_q.empty():
-            break
-        time.sleep(0.001)
-    assert worker._drain_writes() is True
-    thread.join(1)
-    assert result["ok"] is True
+    worker._start_writer()
+    try:
+        assert worker.submit(b"1 4 down\n", completion_timeout_s=1) is True
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
     assert worker._ser.writes == [b"1 4 down\n"]
 
 
@@ -57,18 +49,315 @@ def test_submit_reports_write_failure():
     worker = serial_manager.SerialPortWorker("COM1")
     worker._ser = FakeSerial(fail=True)
     worker._ready.set()
+    worker._start_writer()
+    try:
+        assert worker.submit(b"bad\n", completion_timeout_s=1) is False
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+    assert worker.last_error == "wire failed"
+    assert worker._ser is None
+
+
+def test_write_dequeued_during_reset_waits_for_the_port():
+    worker = serial_manager.SerialPortWorker("COM1")
+    worker._ser = FakeSerial()
+    worker._ready.set()
+    worker._start_writer()
+    try:
+        # The writer is blocked on the queue while a DTR reset begins.
+        with worker._port_lock:
+            worker._ready.clear()
+            assert worker.submit(b"1 4 down\n", require_ready=False, wait=False)
+            time.sleep(0.05)
+            assert worker._ser.writes == []
+        time.sleep(0.05)
+        assert worker._ser.writes == []
+        worker._ready.set()
+        worker._write_q.join()
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+    assert worker._ser.writes == [b"1 4 down\n"]
+
+
+def test_writer_thread_dispatches_without_waiting_for_reader():
+    worker = serial_manager.SerialPortWorker("COM1")
+    worker._ser = FakeSerial()
+    worker._ready.set()
+    worker._start_writer()
+    try:
+        for idx in range(5):
+            assert worker.submit(f"1 {idx} down\n".encode(), completion_timeout_s=1)
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+
+    assert len(worker._ser.writes) == 5
+    timing = worker.timing()
+    assert timing["queue_wait"]["count"] == 5
+    assert timing["write_flush"]["count"] == 5
+    assert timing["queue_wait"]["max_ms"] < serial_manager.READ_TIMEOUT_S * 1000
+    assert timing["queued"] == 0
+
+
+def test_writer_holds_queued_writes_until_port_is_ready():
+    worker = serial_manager.SerialPortWorker("COM1")
+    worker._ser = FakeSerial()
+    worker._start_writer()
+    try:
+        assert worker.submit(b"1 4 down\n", require_ready=False, wait=False)
+        time.sleep(0.05)
+        assert worker._ser.writes == []
+        worker._ready.set()
+        worker._write_q.join()
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+    assert worker._ser.writes == [b"1 4 down\n"]
+
+
+class ReadingSerial(FakeSerial):
+    def __init__(self, on_read):
+        super().__init__()
+        self.on_read = on_read
+
+    def readline(self):
+        return self.on_read(self)
+
+
+def test_reader_reopens_after_writer_closes_the_port(monkeypatch):
+    worker = serial_manager.SerialPortWorker("COM1")
+    lines = []
+
+    def closed_underneath(ser):
+        # A failed write closes the port while the reader is blocked on it.
+        worker._close_serial()
+        raise TypeError("'NoneType' object cannot be interpreted as an integer")
+
+    def healthy(_ser):
+        time.sleep(0.01)
+        return b"[SER] 1 4 down\r\n"
+
+    ports = [ReadingSerial(closed_underneath), ReadingSerial(healthy)]
+
+    def fake_open():
+        worker._ser = ports.pop(0)
+        worker._ready.set()
+        return True
+
+    monkeypatch.setattr(worker, "_open_serial", fake_open)
+    worker._on_rx = lambda line, _com: lines.append(line)
+    worker.start()
+    try:
+        for _ in range(100):
+            if lines:
+                break
+            time.sleep(0.01)
+        assert worker.is_alive()
+    finally:
+        worker.stop()
+        worker.join(1)
+    assert ports == [] and lines
+    assert "NoneType" in worker.last_error
+
+
+def test_latency_stats_histogram_buckets():
+    stats = serial_manager.LatencyStats(buckets_ms=(1, 10))
+    for seconds in (0.0002, 0.005, 0.5):
+        stats.record(seconds)
+    snap = stats.snapshot()
+    assert snap["count"] == 3
+    assert snap["buckets"] == {"<=1ms": 1, "<=10ms": 1, "inf": 1}
+    assert snap["max_ms"] == 500.0
+
+
+FORMAT_A_TRANSCRIPT = [
+    b"[SER] 1 83 03 120\r\n",
+    b"[CMD-A] R1 DOWN=0x83 UP=0x03 delay=120\r\n",
+    b"[TRIG] pin=12 key=0x83 (LOW->HIGH)\r\n",
+    b"[WAIT] timeout; sawTx=0 sawAck=0\r\n",
+    b"[TRIG] pin=12 key=0x83 (LOW->HIGH)\r\n",
+    b"[TRIG] TX+ACK confirmed\r\n",
+    b"[I2C TX @1000us +0us] AF 01 01 83 00 00 00 00 00 00 00 00 00 00 00\r\n",
+    b"[TRIG] pin=12 key=0x03 (LOW->HIGH)\r\n",
+    b"[TRIG] TX+ACK confirmed\r\n",
+]
+
+
+def test_ack_tracker_completes_format_a_on_down_and_up_acks():
+    tracker = serial_manager.DartAckTracker()
+    receipt = tracker.expect("1 83 03 120\n", 1, (0x83, 0x03))
+    tracker.mark_written(receipt)
+    for line in FORMAT_A_TRANSCRIPT[:-1]:
+        tracker.feed(line)
+    assert not receipt.done.is_set()
+    tracker.feed(FORMAT_A_TRANSCRIPT[-1])
+
+    assert receipt.ok is True
+    assert len(receipt.ack_latency_s) == 2
+    assert receipt.retries == 1
+    assert receipt.i2c_tx_us == [1000]
+    stats = tracker.stats()
+    assert (stats["confirmed"], stats["retries"], stats["pending"]) == (1, 1, 0)
+    assert stats["first_ack"]["count"] == 1
+    assert stats["complete"]["count"] == 1
+
+
+def test_ack_tracker_reports_firmware_down_failure():
+    tracker = serial_manager.DartAckTracker()
+    receipt = tracker.expect("2 83 03 80", 2, (0x83, 0x03))
+    for line in (
+        "[SER] 2 83 03 80",
+        "[TRIG] pin=11 key=0x83 (LOW->HIGH)",
+        "[WAIT] timeout; sawTx=1 sawAck=0",
+        "[ERR] DOWN failed",
+    ):
+        tracker.feed(line)
+    assert receipt.done.is_set()
+    assert receipt.ok is False
+    assert "DOWN failed" in receipt.error
+    assert tracker.stats()["failed"] == 1
+
+
+def test_ack_tracker_attributes_interleaved_up_by_remote_pin():
+    tracker = serial_manager.DartAckTracker()
+    first = tracker.expect("1 83 03 500", 1, (0x83, 0x03))
+    second = tracker.expect("2 81 01 80", 2, (0x81, 0x01))
+    for line in (
+        "[SER] 1 83 03 500",
+        "[TRIG] pin=12 key=0x83",
+        "[TRIG] TX+ACK confirmed",
+        "[SER] 2 81 01 80",
+        "[TRIG] pin=11 key=0x81",
+        "[TRIG] TX+ACK confirmed",
+        "[TRIG] pin=11 key=0x01",
+        "[TRIG] TX+ACK confirmed",
+    ):
+        tracker.feed(line)
+    assert second.ok is True
+    assert not first.done.is_set()
+    tracker.feed("[TRIG] pin=12 key=0x03")
+    tracker.feed("[TRIG] TX+ACK confirmed")
+    assert first.ok is True
+
+
+def test_ack_wait_times_out_without_firmware_output():
+    tracker = serial_manager.DartAckTracker()
+    receipt = tracker.wait(tracker.expect("1 1 down", 1, (0x81,)), 0.05)
+    assert receipt.ok is False
+    assert tracker.stats()["timeouts"] == 1
+    assert tracker.stats()["pending"] == 0
+
+
+def test_send_rf_wait_ack_returns_on_firmware_ack_without_sleep(monkeypatch):
+    from jamboree import serial_bridge
+
+    worker = serial_manager.SerialPortWorker("COM1")
+
+    class FirmwareSerial(FakeSerial):
+        def write(self, data):
+            super().write(data)
+            for line in FORMAT_A_TRANSCRIPT:
+                worker.acks.feed(line)
+
+    worker._ser = FirmwareSerial()
+    worker._ready.set()
+    worker._start_writer()
+    monkeypatch.setattr(
+        serial_bridge.serial_mgr,
+        "write_with_ack",
+        lambda _alias, data, **kwargs: worker.submit_with_ack(data, **kwargs),
+    )
+    monkeypatch.setattr(
+        serial_bridge.time,
+        "sleep",
+        lambda _s: (_ for _ in ()).throw(AssertionError("ack mode must not pad with sleep")),
+    )
+    try:
+        assert serial_bridge.send_rf("A", "1", "guide", 120, wait_ack=True) == "1 83 03 120"
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+    assert worker.acks.stats()["confirmed"] == 1
+
+
+def test_send_rf_many_writes_each_line_after_the_previous_is_echoed(monkeypatch):
+    from jamboree import serial_bridge
+
+    worker = serial_manager.SerialPortWorker("COM1")
+    worker._ser = FakeSerial()
+    worker._ready.set()
+    worker._start_writer()
+    monkeypatch.setattr(
+        serial_bridge.serial_mgr,
+        "write_tracked",
+        lambda _alias, data, **kwargs: worker.submit_tracked(data, **kwargs),
+    )
+    monkeypatch.setattr(
+        serial_bridge.serial_mgr,
+        "await_ack",
+        lambda _alias, receipt, timeout_s: worker.acks.wait(receipt, timeout_s),
+    )
+    monkeypatch.setattr(
+        serial_bridge.serial_mgr, "discard_ack", lambda _alias, receipt: worker.acks.discard(receipt)
+    )
     result = {}
+    sender = threading.Thread(
+        target=lambda: result.setdefault(
+            "lines", serial_bridge.send_rf_many("A", [(1, "guide", 120), (2, "guide", 120)], wait_ack=True)
+        )
+    )
+    try:
+        sender.start()
+        time.sleep(0.1)
+        assert worker._ser.writes == [b"1 83 03 120\n"]
+        for line in FORMAT_A_TRANSCRIPT:
+            worker.acks.feed(line)
+        deadline = time.monotonic() + 1
+        while len(worker._ser.writes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert worker._ser.writes[1] == b"2 83 03 120\n"
+        for line in (
+            "[SER] 2 83 03 120",
+            "[TRIG] pin=11 key=0x83",
+            "[TRIG] TX+ACK confirmed",
+            "[TRIG] pin=11 key=0x03",
+            "[TRIG] TX+ACK confirmed",
+        ):
+            worker.acks.feed(line)
+        sender.join(1)
+    finally:
+        worker._stop_event.set()
+        worker._writer.join(1)
+    assert result["lines"] == ["1 83 03 120", "2 83 03 120"]
+    assert worker.acks.stats()["confirmed"] == 2
 
-    def submitter():
-        result["ok"] = worker.submit(b"bad\n", completion_timeout_s=1)
-
-    thread = threading.Thread(target=submitter)
-    thread.start()
-    for _ in range(100):
-        if not worker._write_q.empty():
-            break
-        time.sleep(0.001)
-    assert worker._drain_writes() is False
-    thread.join(1)
-    assert result["ok"] is False
-    assert worker.last_error == "wire failed"
+
+def test_send_rf_many_paces_by_rx_buffer_once_an_echo_is_missing(monkeypatch):
+    from jamboree import serial_bridge
+
+    tracker = serial_manager.DartAckTracker()
+    writes = []
+
+    def write_tracked(_alias, data, *, remote, keys):
+        writes.append(data)
+        receipt = tracker.expect(data.decode("ascii"), remote, keys)
+        tracker.mark_written(receipt)
+        return receipt
+
+    sleeps = []
+    monkeypatch.setattr(serial_bridge.serial_mgr, "write_tracked", write_tracked)
+    monkeypatch.setattr(serial_bridge.serial_mgr, "discard_ack", lambda _alias, r: tracker.discard(r))
+    monkeypatch.setattr(serial_bridge, "DART_ACK_BUDGET_S", 0.05)
+    monkeypatch.setattr(serial_bridge.time, "sleep", sleeps.append)
+
+    started = time.monotonic()
+    presses = [(remote, "guide", 120) for remote in range(1, 8)]
+    lines = serial_bridge.send_rf_many("A", presses, wait_ack=False)
+
+    # One echo timeout, then 12-byte lines go out five at a time (60 bytes).
+    assert len(lines) == len(writes) == 7
+    assert time.monotonic() - started < 0.5
+    assert sleeps[:-1] == [serial_bridge.DART_LINE_GAP_S]
+    assert sum(len(data) for data in writes[1:6]) <= serial_bridge.DART_RX_BUFFER_BYTES
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import time
 from copy import deepcopy
 
 from jamboree import sgs_autopair
 from jamboree.core.credentials import CredentialManager
+from jamboree.ocr_prep import FramePrep
 
 
 class FakeStore:
@@ -112,3 +114,109 @@ def test_auto_pair_explicit_pin_runs_secure_persistence(monkeypatch):
     result = sgs_autopair.auto_pair("H3", pin="123456", verify=False)
     assert result["ok"]
     assert result["steps"]["pin"]["value"] == "******"
+
+
+def test_score_pin_candidates_fans_out_passes_and_cancels_after_clear_winner(monkeypatch, pairing_frame):
+    from jamboree.ocr_cache import OCRCache
+    from jamboree.ocr_pool import OCRPool
+
+    pool = OCRPool(workers=4)
+    monkeypatch.setattr(sgs_autopair, "ocr_pool", pool)
+    monkeypatch.setattr(sgs_autopair, "ocr_cache", OCRCache())
+    # Fixed regions only: the text-localization stage would end the read first.
+    monkeypatch.setattr(FramePrep, "text_boxes", lambda _self, _max_boxes=None: [])
+    seen = []
+
+    def slow_ocr(_img, psm=6, digits_only=False, strict=False):
+        seen.append(psm)
+        time.sleep(0.05)
+        return "482913" if digits_only else "Pairing code 482913"
+
+    monkeypatch.setattr(sgs_autopair, "_ocr", slow_ocr)
+    candidates = sgs_autopair.score_pin_candidates(pairing_frame(), effort="exhaustive")
+
+    assert candidates[0]["pin"] == "482913"
+    assert all(source.endswith("/r0") for source in candidates[0]["sources"])
+    tier = pool.status()["tiers"]["exhaustive"]
+    # Regions 0 and 1 pass the glyph gate and get 70 // 5 = 14 passes each.
+    # Region 1's queued passes are cancelled once region 0 has a clear winner;
+    # at most one pass per worker is still running at that point.
+    assert tier["early_stops"] == 1
+    assert tier["cancelled"] >= 4
+    assert 28 - pool.workers <= tier["calls"] + tier["cancelled"] <= 28
+    assert tier["calls"] <= len(seen) < 28
+    assert tier["calls_per_s"] > 0
+    pool.shutdown()
+
+
+def _banner_frame(text="Enter code 703518 on your device"):
+    import cv2
+    import numpy as np
+
+    frame = np.full((1080, 1920, 3), 40, dtype=np.uint8)
+    cv2.circle(frame, (900, 400), 200, (90, 120, 160), -1)
+    cv2.rectangle(frame, (0, 880), (1920, 1080), (15, 15, 15), -1)
+    cv2.putText(frame, text, (300, 990), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (235, 235, 235), 3)
+    return frame
+
+
+def test_text_proposals_read_banner_and_dialog_pins_at_fast_tier(monkeypatch, pairing_frame):
+    from jamboree.ocr_cache import OCRCache
+    from jamboree.ocr_pool import OCRPool
+
+    pool = OCRPool(workers=2)
+    monkeypatch.setattr(sgs_autopair, "ocr_pool", pool)
+    shown = {}
+    calls = []
+
+    def fake_ocr(_img, psm=6, digits_only=False, strict=False):
+        calls.append(psm)
+        return shown["pin"] if digits_only else f"code {shown['pin']}"
+
+    monkeypatch.setattr(sgs_autopair, "_ocr", fake_ocr)
+
+    def read(frame, pin, proposals=True):
+        monkeypatch.setattr(sgs_autopair, "ocr_cache", OCRCache())
+        if not proposals:
+            monkeypatch.setattr(FramePrep, "text_boxes", lambda _self, _max_boxes=None: [])
+        shown["pin"] = pin
+        calls.clear()
+        return sgs_autopair.score_pin_candidates(frame, effort="fast"), len(calls)
+
+    # The banner layout used to be reachable only at the exhaustive tier.
+    banner, banner_calls = read(_banner_frame(), "703518")
+    dialog, dialog_calls = read(pairing_frame(), "482913")
+    assert banner[0]["pin"] == "703518"
+    assert all(source.endswith("/p0") for source in banner[0]["sources"])
+    assert dialog[0]["pin"] == "482913"
+    assert all(source.endswith("/p0") for source in dialog[0]["sources"])
+    assert pool.status()["tiers"]["fast"]["early_stops"] == 1     # dialog line only
+
+    assert read(_banner_frame(), "703518", proposals=False)[0] == []
+    fixed, fixed_calls = read(pairing_frame(), "482913", proposals=False)
+    assert fixed[0]["pin"] == "482913"
+    assert banner_calls < fixed_calls
+    assert dialog_calls < fixed_calls
+    pool.shutdown()
+
+
+def test_text_proposals_draw_from_the_tier_call_budget(monkeypatch, pairing_frame):
+    from jamboree.ocr_cache import OCRCache
+    from jamboree.ocr_pool import OCRPool
+
+    pool = OCRPool(workers=2)
+    monkeypatch.setattr(sgs_autopair, "ocr_pool", pool)
+    monkeypatch.setattr(sgs_autopair, "ocr_cache", OCRCache())
+    calls = []
+
+    def unreadable(_img, psm=6, digits_only=False, strict=False):
+        calls.append(psm)
+        return ""
+
+    monkeypatch.setattr(sgs_autopair, "_ocr", unreadable)
+    frame = pairing_frame()
+    assert len(FramePrep(frame).text_boxes(2)) == 1
+    assert sgs_autopair.score_pin_candidates(frame, effort="fast") == []
+    # The dialog line takes half the budget; region 0 gets the remaining 6.
+    assert len(calls) == sgs_autopair._EFFORT_PLANS["fast"]["max_calls"] == 12
+    pool.shutdown()
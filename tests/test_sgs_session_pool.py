@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from jamboree import sgs_bridge
+from jamboree.stb_store import STBStore
+
+
+class _Response:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self._data = {"result": 1} if data is None else data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = sgs_bridge.SessionPool()
+    monkeypatch.setattr(sgs_bridge, "session_pool", pool)
+    return pool
+
+
+def test_repeated_keys_reuse_one_session_and_digest_auth(monkeypatch, pool):
+    seen = []
+
+    def post(session, url, **kwargs):
+        seen.append((id(session), id(kwargs["auth"]), url))
+        return _Response()
+
+    monkeypatch.setattr(sgs_bridge.requests.Session, "post", post)
+
+    for _ in range(3):
+        sgs_bridge._post("10.0.0.5", {"command": "remote_key"}, creds=("u", "p"))
+
+    assert len({session for session, _auth, _url in seen}) == 1
+    assert len({auth for _session, auth, _url in seen}) == 1
+    stats = pool.stats()
+    assert stats["sessions_created"] == 1
+    assert stats["sessions_reused"] == 2
+    assert stats["hosts"]["10.0.0.5"]["digest_cached"] is True
+
+
+def test_changed_credentials_replace_cached_digest_auth(pool):
+    _session, first = pool.acquire("10.0.0.5", ("u", "p"))
+    _session, same = pool.acquire("10.0.0.5", ("u", "p"))
+    _session, rotated = pool.acquire("10.0.0.5", ("u", "p2"))
+    assert first is same
+    assert rotated is not first
+
+
+def test_auth_failure_evicts_pooled_receiver(monkeypatch, pool):
+    monkeypatch.setattr(
+        sgs_bridge.requests.Session,
+        "post",
+        lambda _session, _url, **_kwargs: _Response(401, {}),
+    )
+    with pytest.raises(PermissionError):
+        sgs_bridge._post("10.0.0.6", {"command": "remote_key"}, creds=("u", "p"))
+    stats = pool.stats()
+    assert "10.0.0.6" not in stats["hosts"]
+    assert stats["evicted"] == {"auth_failure": 1}
+
+
+def test_store_ip_change_evicts_old_receiver_session(tmp_path, pool):
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"H": {"ip": "10.0.0.7", "stb": "R1234567890-12"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    store.add_change_listener(sgs_bridge._on_store_change)
+    pool.acquire("10.0.0.7", ("u", "p"))
+    pool.acquire("10.0.0.8", None)
+
+    store.update_stb("H", {"mac": "88:b6:ee:de:58:cc"})
+    assert "10.0.0.7" in pool.stats()["hosts"]
+
+    store.update_stb("H", {"ip": "10.0.0.70"})
+    hosts = pool.stats()["hosts"]
+    assert "10.0.0.7" not in hosts
+    assert "10.0.0.8" in hosts
+    assert pool.stats()["evicted"] == {"ip_change": 1}
+
+
+def test_pool_capacity_evicts_least_recently_used():
+    small = sgs_bridge.SessionPool(max_receivers=2)
+    small.acquire("10.0.0.1", None)
+    small.acquire("10.0.0.2", None)
+    small.acquire("10.0.0.1", None)
+    small.acquire("10.0.0.3", None)
+    assert set(small.stats()["hosts"]) == {"10.0.0.1", "10.0.0.3"}
+
+
+def test_learned_endpoint_is_tried_first_after_success(monkeypatch, pool):
+    selector = sgs_bridge.EndpointSelector()
+    monkeypatch.setattr(sgs_bridge, "endpoint_selector", selector)
+    monkeypatch.setattr(sgs_bridge, "_persisted_endpoint", lambda _ip: None)
+    urls = []
+
+    def post(_session, url, **_kwargs):
+        urls.append(url)
+        if url != "http://10.0.0.9/www/sgs":
+            raise sgs_bridge.requests.ConnectionError("connection refused")
+        return _Response()
+
+    monkeypatch.setattr(sgs_bridge.requests.Session, "post", post)
+
+    sgs_bridge._post("10.0.0.9", {"command": "remote_key"}, creds=("u", "p"))
+    assert len(urls) == 3
+    urls.clear()
+    sgs_bridge._post("10.0.0.9", {"command": "remote_key"}, creds=("u", "p"))
+    assert urls == ["http://10.0.0.9/www/sgs"]
+    stats = selector.stats("10.0.0.9")
+    assert stats["preferred"] == "http:80"
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_plaintext_never_displaces_https_once_it_has_worked(monkeypatch, pool, tmp_path):
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"H": {"ip": "10.0.0.16", "stb": "R1234567890-12"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    monkeypatch.setattr(sgs_bridge, "store", store)
+    selector = sgs_bridge.EndpointSelector()
+    monkeypatch.setattr(sgs_bridge, "endpoint_selector", selector)
+    urls = []
+    https_down = [False]
+
+    def post(_session, url, **_kwargs):
+        urls.append(url)
+        if url.startswith("https://") and https_down[0]:
+            raise sgs_bridge.requests.ConnectionError("TLS handshake timed out")
+        return _Response()
+
+    monkeypatch.setattr(sgs_bridge.requests.Session, "post", post)
+    sgs_bridge._post("10.0.0.16", {"command": "remote_key"}, creds=("u", "p"))
+    assert selector.stats("10.0.0.16")["preferred"] == "https"
+
+    # A transient https failure falls through to plaintext for this key only.
+    https_down[0] = True
+    sgs_bridge._post("10.0.0.16", {"command": "remote_key"}, creds=("u", "p"))
+    assert urls[-1] == "http://10.0.0.16:8080/www/sgs"
+    assert selector.stats("10.0.0.16")["preferred"] == "https"
+    assert selector.downgrades_refused == 1
+    assert sgs_bridge._persist_endpoint_async("H", store.get("H"), "10.0.0.16")
+    for _ in range(200):
+        if store.get("H").get("sgs_endpoint"):
+            break
+        time.sleep(0.005)
+    assert store.get("H")["sgs_endpoint"] == "https"
+
+    https_down[0] = False
+    urls.clear()
+    sgs_bridge._post("10.0.0.16", {"command": "remote_key"}, creds=("u", "p"))
+    assert urls == ["https://10.0.0.16/www/sgs"]
+
+
+def test_auth_failure_invalidates_learned_endpoint(monkeypatch, pool):
+    selector = sgs_bridge.EndpointSelector()
+    monkeypatch.setattr(sgs_bridge, "endpoint_selector", selector)
+    selector.record("10.0.0.9", "http:80", first_attempt=False)
+    monkeypatch.setattr(
+        sgs_bridge.requests.Session,
+        "post",
+        lambda _session, _url, **_kwargs: _Response(403, {}),
+    )
+    with pytest.raises(PermissionError):
+        sgs_bridge._post("10.0.0.9", {"command": "remote_key"}, creds=("u", "p"))
+    assert selector.stats("10.0.0.9")["preferred"] is None
+    assert selector.invalidations == 1
+
+
+def test_failed_request_demotes_only_the_endpoint_that_failed(monkeypatch, pool):
+    selector = sgs_bridge.EndpointSelector()
+    monkeypatch.setattr(sgs_bridge, "endpoint_selector", selector)
+    selector.record("10.0.0.9", "http:80", first_attempt=False)
+    selector.record("10.0.0.10", "http:8080", first_attempt=False)
+
+    def post(_session, url, **_kwargs):
+        raise sgs_bridge.requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(sgs_bridge.requests.Session, "post", post)
+    with pytest.raises(RuntimeError):
+        sgs_bridge._post("10.0.0.9", {"command": "remote_key"}, creds=None)
+    assert selector.stats("10.0.0.9")["preferred"] is None
+    assert selector.stats("10.0.0.10")["preferred"] == "http:8080"
+    selector.record_failure("10.0.0.10", "http:80")
+    assert selector.stats("10.0.0.10")["preferred"] == "http:8080"
+
+
+def test_persisted_endpoint_seeds_only_at_the_ip_it_was_learned(monkeypatch, tmp_path):
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps(
+            {
+                "stbs": {
+                    "H": {
+                        "ip": "10.0.0.11",
+                        "stb": "R1234567890-12",
+                        "sgs_endpoint": "http:8080",
+                        "sgs_endpoint_ip": "10.0.0.11",
+                    },
+                    "MOVED": {
+                        "ip": "10.0.0.12",
+                        "stb": "R1234567890-13",
+                        "sgs_endpoint": "http:80",
+                        "sgs_endpoint_ip": "10.0.0.99",
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(sgs_bridge, "store", STBStore(path))
+    selector = sgs_bridge.EndpointSelector()
+    assert selector.preferred("10.0.0.11") == "http:8080"
+    assert selector.preferred("10.0.0.12") is None
+
+
+def test_successful_key_persists_learned_endpoint_on_host_row(monkeypatch, tmp_path):
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"H": {"ip": "10.0.0.13", "stb": "R1234567890-12"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    monkeypatch.setattr(sgs_bridge, "store", store)
+    selector = sgs_bridge.EndpointSelector()
+    selector.record("10.0.0.13", "http:8080", first_attempt=False)
+    monkeypatch.setattr(sgs_bridge, "endpoint_selector", selector)
+
+    assert sgs_bridge._persist_endpoint_async("H", store.get("H"), "10.0.0.13")
+    for _ in range(200):
+        if store.get("H").get("sgs_endpoint"):
+            break
+        time.sleep(0.005)
+    entry = store.get("H")
+    assert entry["sgs_endpoint"] == "http:8080"
+    assert entry["sgs_endpoint_ip"] == "10.0.0.13"
+    assert not sgs_bridge._persist_endpoint_async("H", entry, "10.0.0.13")
+
+
+def test_auth_failure_and_store_generation_invalidate_credential_cache(monkeypatch, tmp_path, pool):
+    invalidations = []
+    monkeypatch.setattr(
+        sgs_bridge.CredentialManager,
+        "invalidate_cache",
+        classmethod(lambda _cls, alias=None: invalidations.append(alias)),
+    )
+    monkeypatch.setattr(
+        sgs_bridge.requests.Session,
+        "post",
+        lambda _session, _url, **_kwargs: _Response(401, {}),
+    )
+    with pytest.raises(PermissionError):
+        sgs_bridge._post("10.0.0.14", {"command": "remote_key"}, creds=("u", "p"), alias="H")
+    assert invalidations == ["H"]
+
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps({"stbs": {"H": {"ip": "10.0.0.14"}, "J": {"ip": "10.0.0.15"}}}),
+        encoding="utf-8",
+    )
+    store = STBStore(path)
+    store.add_change_listener(sgs_bridge._on_store_change)
+    # Metadata that CredentialManager never reads keeps every cached secret.
+    store.update_stb("H", {"remote": "2", "sgs_endpoint": "http:80"})
+    store.update_stb("J", {"mac": "00:11:22:33:44:55"}, defer=True)
+    assert invalidations == ["H"]
+    store.update_stb("J", {"lname": "user", "passwd": "secret"})
+    assert invalidations == ["H", "J"]
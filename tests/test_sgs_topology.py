@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import copy
 import json
+import tracemalloc
+
+import pytest
 
 from jamboree import sgs_autopair, sgs_bridge
 from jamboree.stb_store import STBStore
@@ -105,3 +109,74 @@ def test_autopair_and_sgs_transport_share_effective_hopperplus_host(monkeypatch,
     assert child["stb"] == "R2222222222-22"
     assert host_alias == "HOPPER3-PROD4"
     assert host["ip"] == "10.0.0.10"
+
+
+def _joey_store(tmp_path, watch=None):
+    path = tmp_path / "base.txt"
+    path.write_text(
+        json.dumps(
+            {
+                "stbs": {
+                    "HOPPER3-PROD4": {
+                        "ip": "10.0.0.10",
+                        "stb": "R1111111111-11",
+                        "role": "hopper",
+                    },
+                    "JOEY-PROD4": {
+                        "ip": "10.0.0.30",
+                        "stb": "R3333333333-33",
+                        "role": "joey",
+                        "host": "HOPPER3-PROD4",
+                        "tags": ["lab"],
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    return STBStore(path, watch=watch)
+
+
+def test_effective_entries_are_frozen_and_shared_within_a_generation(tmp_path):
+    store = _joey_store(tmp_path)
+
+    first = store.get("JOEY-PROD4")
+    assert store.get("JOEY-PROD4") is first
+    assert store.child_host("JOEY-PROD4") == "HOPPER3-PROD4"
+    assert store.child_host("HOPPER3-PROD4") is None
+    assert first["tags"] == ("lab",)
+    with pytest.raises(TypeError):
+        first["ip"] = "10.0.0.99"
+    with pytest.raises(TypeError):
+        first.update(ip="10.0.0.99")
+
+    editable = dict(first)
+    editable["ip"] = "10.0.0.99"
+    copied = copy.deepcopy(first)
+    copied["ip"] = "10.0.0.98"
+    assert type(copied) is dict
+    assert json.loads(json.dumps(first))["ip"] == "10.0.0.30"
+
+    store.update_stb("JOEY-PROD4", {"ip": "10.0.0.31"})
+    refreshed = store.get("JOEY-PROD4")
+    assert refreshed is not first
+    assert refreshed["ip"] == "10.0.0.31"
+    assert first["ip"] == "10.0.0.30"
+
+
+def test_repeated_get_does_not_allocate(tmp_path):
+    # Micro-benchmark: the hot read path used to deep-copy the row on every
+    # call; it now returns the memoized entry without allocating.
+    store = _joey_store(tmp_path, watch="poll")
+    store.get("JOEY-PROD4")
+    tracemalloc.start()
+    try:
+        before, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(1000):
+            store.get("JOEY-PROD4")
+            store.get("HOPPER3-PROD4")
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak - before < 1024
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import errno
+import socket
+import struct
+import time
 from copy import deepcopy
 
-from jamboree import ip_recovery, mac_learning, sgs_bridge
+from jamboree import ip_recovery, ip_watch, mac_learning, neighbors, sgs_bridge
 
 
 class FakeStore:
@@ -114,7 +118,7 @@ def test_find_by_mac_recovers_unidentified_receiver_when_mac_is_persisted(monkey
         }
     )
     monkeypatch.setattr(ip_recovery, "_store", store)
-    monkeypatch.setattr(ip_recovery, "_touch_host", lambda *_a, **_k: None)
+    monkeypatch.setattr(ip_recovery, "_sweep_hosts", lambda *_a, **_k: {})
     monkeypatch.setattr(
         ip_recovery,
         "_arp_entries",
@@ -153,7 +157,7 @@ def test_find_by_mac_ignores_same_mac_outside_candidate_scope(monkeypatch):
     )
     candidates = ["192.168.1.67", "192.168.1.90"]
     monkeypatch.setattr(ip_recovery, "_store", store)
-    monkeypatch.setattr(ip_recovery, "_touch_host", lambda *_a, **_k: None)
+    monkeypatch.setattr(ip_recovery, "_sweep_hosts", lambda *_a, **_k: {})
     monkeypatch.setattr(
         ip_recovery,
         "_arp_entries",
@@ -243,3 +247,254 @@ def test_send_sgs_learns_host_mac_for_joey(monkeypatch):
 
     assert '"result": 1' in result
     assert learned == [("H", "192.168.1.67")]
+
+
+_PROC_ARP = """IP address       HW type     Flags       HW address            Mask     Device
+192.168.1.67     0x1         0x2         88:b6:ee:de:58:cc     *        eth0
+192.168.1.90     0x1         0x0         00:00:00:00:00:00     *        eth0
+192.168.1.91     0x1         0x2         00:11:22:33:44:55     *        eth0
+"""
+
+
+def test_neighbor_table_parses_proc_arp_and_caches_reads(tmp_path, monkeypatch):
+    proc = tmp_path / "arp"
+    proc.write_text(_PROC_ARP, encoding="ascii")
+
+    def no_subprocess(*_args, **_kwargs):
+        raise AssertionError("/proc/net/arp reads must not spawn ip/arp")
+
+    monkeypatch.setattr(neighbors.subprocess, "check_output", no_subprocess)
+    table = neighbors.NeighborTable(proc, ttl_s=60.0)
+
+    assert table.entries() == {
+        "192.168.1.67": "88:b6:ee:de:58:cc",
+        "192.168.1.91": "00:11:22:33:44:55",
+    }
+    for _ in range(5):
+        assert table.lookup("192.168.1.67") == "88:b6:ee:de:58:cc"
+    assert table.status()["proc_reads"] == 1
+
+    # A miss rereads a stale-enough cache so just-resolved entries are seen.
+    proc.write_text(_PROC_ARP + "192.168.1.92 0x1 0x2 aa:bb:cc:dd:ee:ff * eth0\n")
+    time.sleep(neighbors.MISS_REFRESH_S)
+    assert table.lookup("192.168.1.92") == "aa:bb:cc:dd:ee:ff"
+    table.invalidate()
+    table.entries()
+    assert table.status()["proc_reads"] == 3
+
+
+def test_neighbor_table_falls_back_to_commands_without_proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        neighbors.subprocess,
+        "check_output",
+        lambda *_a, **_k: "? (192.168.1.67) at 88-B6-EE-DE-58-CC [ether] on eth0\n",
+    )
+    table = neighbors.NeighborTable(tmp_path / "missing", ttl_s=60.0)
+    assert table.entries() == {"192.168.1.67": "88:b6:ee:de:58:cc"}
+    assert table.status()["command_reads"] == 1
+
+
+class FakeNetlinkSocket:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def bind(self, _address):
+        pass
+
+    def recv(self, _size):
+        result = self.results.pop(0)
+        if isinstance(result, OSError):
+            raise result
+        return result
+
+    def fileno(self):
+        return 3 if self.results else -1
+
+
+def test_neighbor_watcher_survives_netlink_overflow(tmp_path, monkeypatch):
+    proc = tmp_path / "arp"
+    proc.write_text(_PROC_ARP, encoding="ascii")
+    table = neighbors.NeighborTable(proc, ttl_s=60.0)
+    table.entries()
+    sock = FakeNetlinkSocket(
+        OSError(errno.ENOBUFS, "No buffer space available"),
+        OSError(errno.ENOBUFS, "No buffer space available"),
+        OSError(errno.EBADF, "Bad file descriptor"),
+    )
+    monkeypatch.setattr(socket, "AF_NETLINK", 16, raising=False)
+    monkeypatch.setattr(neighbors.netlink.socket, "socket", lambda *_a: sock)
+
+    assert table.start_watcher() is True
+    table._watcher["thread"].join(timeout=2)
+
+    # Each overflow drops the cache instead of ending the subscription.
+    status = table.status()
+    assert (status["invalidations"], status["watcher"]["overflows"]) == (2, 2)
+    assert sock.results == [] and "Bad file descriptor" in status["watcher"]["error"]
+    table.entries()
+    assert table.status()["proc_reads"] == 2
+
+
+def _neigh_message(ip, mac, *, family=socket.AF_INET, state=0x02):
+    attrs = b""
+    for attr_type, value in ((1, socket.inet_aton(ip)), (2, bytes.fromhex(mac.replace(":", "")))):
+        attrs += struct.pack("=HH", 4 + len(value), attr_type) + value
+        attrs += b"\0" * (-len(attrs) % 4)
+    body = struct.pack("=BxxxiHBB", family, 2, state, 0, 1) + attrs
+    return struct.pack("=IHHII", 16 + len(body), 28, 0, 0, 0) + body
+
+
+def test_parse_neigh_messages_keeps_resolved_ipv4_entries():
+    data = (
+        _neigh_message("192.168.1.77", "88:b6:ee:de:58:cc")
+        + _neigh_message("192.168.1.78", "00:11:22:33:44:55", state=0x20)
+        + _neigh_message("192.168.1.79", "00:11:22:33:44:66", family=socket.AF_INET6)
+    )
+    assert neighbors.parse_neigh_messages(data) == [("192.168.1.77", "88:b6:ee:de:58:cc")]
+
+
+class FakeTable:
+    def __init__(self, entries):
+        self.table = dict(entries)
+        self.listeners = []
+        self.watching = True
+
+    def entries(self, max_age_s=None):
+        return dict(self.table)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def start_watcher(self):
+        return self.watching
+
+
+class FakeController:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.calls = []
+
+    def handle_auto_remote(self, remote, alias, button, *_args, **_kwargs):
+        self.calls.append((alias, ip_recovery._entry(alias).get("ip")))
+        if not self.ok:
+            raise RuntimeError("connect timeout")
+
+
+def _wait_idle(watcher):
+    for _ in range(200):
+        if not watcher.status()["pending"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError("passive IP watcher did not finish")
+
+
+def test_ip_watcher_repoints_known_mac_and_verifies_over_sgs(monkeypatch):
+    mac = "88:b6:ee:de:58:cc"
+    store = FakeStore(
+        {
+            "H": {"ip": "192.168.1.67", "stb": "R1956395067-79", "remote": "1", "mac": mac},
+            "J": {"ip": "192.168.1.68", "stb": "R1111111111-11", "remote": "2"},
+        }
+    )
+    controller = FakeController()
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    monkeypatch.setattr(ip_recovery, "_ctl", controller)
+    monkeypatch.setattr(ip_recovery, "_get_frame", lambda: None)
+    monkeypatch.setattr(ip_recovery, "_states", {})
+    monkeypatch.setattr(
+        ip_recovery,
+        "probe_device_identity",
+        lambda ip, rxid="", **_k: {"is_stb": True, "rxids": ["R1956395067-79"], "rxid_match": True},
+    )
+    table = FakeTable({"192.168.1.67": mac})
+    watcher = ip_watch.IPChangeWatcher(store, table)
+
+    assert watcher.start() == "netlink"
+    assert table.listeners == [watcher.observe]
+    assert watcher.status()["scheduled"] == 0
+
+    # Unknown MACs and the stored address itself are ignored.
+    assert watcher.observe([("192.168.1.90", "00:11:22:33:44:55"), ("192.168.1.67", mac)]) == []
+    table.table = {"192.168.1.77": mac}
+    assert watcher.observe([("192.168.1.77", mac)]) == ["H"]
+    _wait_idle(watcher)
+
+    assert store.get("H")["ip"] == "192.168.1.77"
+    assert controller.calls == [("H", "192.168.1.77")]
+    status = watcher.status()
+    assert (status["kept"], status["rejected"]) == (1, 0)
+    assert status["last_move"]["ok"] is True
+    assert ip_recovery._state("H").last_result["source"] == "neighbor_watch"
+    assert ip_recovery._state("H").active is False
+
+
+def test_ip_watcher_rolls_back_unverified_move_and_backs_off(monkeypatch):
+    mac = "88:b6:ee:de:58:cc"
+    store = FakeStore(
+        {"H": {"ip": "192.168.1.67", "stb": "R1956395067-79", "remote": "1", "mac": mac}}
+    )
+    monkeypatch.setattr(ip_recovery, "_store", store)
+    monkeypatch.setattr(ip_recovery, "_ctl", FakeController(ok=False))
+    monkeypatch.setattr(ip_recovery, "_get_frame", lambda: None)
+    monkeypatch.setattr(ip_recovery, "_states", {})
+    monkeypatch.setattr(
+        ip_recovery,
+        "probe_device_identity",
+        lambda ip, rxid="", **_k: {"is_stb": True, "rxids": [], "rxid_match": None},
+    )
+    table = FakeTable({"192.168.1.77": mac})
+    watcher = ip_watch.IPChangeWatcher(store, table)
+
+    assert watcher.observe(table.entries().items()) == ["H"]
+    _wait_idle(watcher)
+    assert store.get("H")["ip"] == "192.168.1.67"
+    assert "rolled back" in watcher.status()["last_move"]["reason"]
+
+    # The same move is not retried on every neighbor event.
+    assert watcher.observe([("192.168.1.77", mac)]) == []
+    status = watcher.status()
+    assert (status["scheduled"], status["rejected"], status["cooldown"]) == (1, 1, 1)
+
+
+def test_ip_watcher_polls_once_the_netlink_thread_exits(monkeypatch):
+    mac = "88:b6:ee:de:58:cc"
+    store = FakeStore({"H": {"ip": "192.168.1.67", "mac": mac}})
+    table = FakeTable({"192.168.1.67": mac})
+    monkeypatch.setenv("JAMBOREE_IP_WATCH_POLL_S", "0")
+    watcher = ip_watch.IPChangeWatcher(store, table)
+    moved = []
+    monkeypatch.setattr(watcher, "_schedule", lambda alias, ip, _mac: moved.append((alias, ip)))
+
+    assert watcher.start() == "netlink"
+    table.table = {"192.168.1.77": mac}
+    time.sleep(0.6)
+    assert moved == []
+
+    table.watching = False
+    for _ in range(200):
+        if moved:
+            break
+        time.sleep(0.01)
+    assert watcher.status()["mode"] == "poll"
+    watcher.stop()
+    assert moved[0] == ("H", "192.168.1.77")
+
+
+def test_neighbor_overflow_hands_listeners_the_full_table(tmp_path):
+    proc = tmp_path / "arp"
+    proc.write_text(_PROC_ARP, encoding="ascii")
+    table = neighbors.NeighborTable(proc, ttl_s=60.0)
+    table.entries()
+    seen = []
+    table.add_listener(seen.append)
+
+    table._resync()
+
+    assert table.status()["proc_reads"] == 2
+    assert sorted(seen[0]) == [
+        ("192.168.1.67", "88:b6:ee:de:58:cc"),
+        ("192.168.1.91", "00:11:22:33:44:55"),
+    ]